@@ -91,7 +91,14 @@ CREATE TABLE IF NOT EXISTS code_refactor.git_operations (
 );
 
 -- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_code_standards_embedding ON code_refactor.code_standards USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- Embeddings are stored L2-normalized, so similarity is the inner product; normalize rows
+-- written by older versions and replace their cosine indexes (requires pgvector 0.7+)
+UPDATE code_refactor.code_standards SET embedding = l2_normalize(embedding)
+WHERE embedding IS NOT NULL AND abs(vector_norm(embedding) - 1) > 1e-6;
+DROP INDEX IF EXISTS code_refactor.idx_code_standards_embedding;
+CREATE INDEX IF NOT EXISTS idx_code_standards_embedding_ip ON code_refactor.code_standards USING ivfflat (embedding vector_ip_ops) WITH (lists = 100);
+-- Half-precision copy of the embeddings for VECTOR_EMBEDDING_DTYPE=float16 (requires pgvector 0.7+)
+CREATE INDEX IF NOT EXISTS idx_code_standards_embedding_half_ip ON code_refactor.code_standards USING ivfflat ((embedding::halfvec(384)) halfvec_ip_ops) WITH (lists = 100);
 CREATE INDEX IF NOT EXISTS idx_code_standards_category ON code_refactor.code_standards(category);
 CREATE INDEX IF NOT EXISTS idx_code_standards_language ON code_refactor.code_standards(language);
 CREATE INDEX IF NOT EXISTS idx_analysis_sessions_status ON code_refactor.analysis_sessions(status);
@@ -116,7 +123,8 @@ CREATE TRIGGER update_analysis_sessions_updated_at BEFORE UPDATE ON code_refacto
 CREATE TRIGGER update_file_analysis_updated_at BEFORE UPDATE ON code_refactor.file_analysis FOR EACH ROW EXECUTE FUNCTION code_refactor.update_updated_at_column();
 CREATE TRIGGER update_git_operations_updated_at BEFORE UPDATE ON code_refactor.git_operations FOR EACH ROW EXECUTE FUNCTION code_refactor.update_updated_at_column();
 
--- Create a function for similarity search
+-- Create a function for similarity search; embeddings are unit length, so the negated
+-- inner product (<#>) equals cosine similarity without computing norms per row
 CREATE OR REPLACE FUNCTION code_refactor.find_similar_standards(
     query_embedding vector(384),
     match_threshold float DEFAULT 0.7,
@@ -140,13 +148,47 @@ AS $$
         cs.description,
         cs.category,
         cs.severity,
-        1 - (cs.embedding <=> query_embedding) as similarity
+        -(cs.embedding <#> query_embedding) as similarity
     FROM code_refactor.code_standards cs
     WHERE 
-        (1 - (cs.embedding <=> query_embedding)) > match_threshold
+        -(cs.embedding <#> query_embedding) > match_threshold
         AND (filter_language IS NULL OR cs.language = filter_language)
         AND (filter_category IS NULL OR cs.category = filter_category)
-    ORDER BY cs.embedding <=> query_embedding
+    ORDER BY cs.embedding <#> query_embedding
+    LIMIT match_count;
+$$;
+
+-- Same search over half-precision embeddings: half the index size and memory bandwidth, near-identical ranking
+CREATE OR REPLACE FUNCTION code_refactor.find_similar_standards_half(
+    query_embedding halfvec(384),
+    match_threshold float DEFAULT 0.7,
+    match_count int DEFAULT 10,
+    filter_language text DEFAULT NULL,
+    filter_category text DEFAULT NULL
+)
+RETURNS TABLE (
+    rule_id VARCHAR(100),
+    title VARCHAR(500),
+    description TEXT,
+    category VARCHAR(100),
+    severity VARCHAR(20),
+    similarity FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT 
+        cs.rule_id,
+        cs.title,
+        cs.description,
+        cs.category,
+        cs.severity,
+        -(cs.embedding::halfvec(384) <#> query_embedding) as similarity
+    FROM code_refactor.code_standards cs
+    WHERE 
+        -(cs.embedding::halfvec(384) <#> query_embedding) > match_threshold
+        AND (filter_language IS NULL OR cs.language = filter_language)
+        AND (filter_category IS NULL OR cs.category = filter_category)
+    ORDER BY cs.embedding::halfvec(384) <#> query_embedding
     LIMIT match_count;
 $$;
 
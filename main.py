@@ -4,502 +4,849 @@ Enterprise Code Refactor - Main Application
 CLI interface for the enterprise code refactoring system.
 """
 
+import argparse
 import asyncio
+import atexit
 import logging
+import os
+import queue
 import sys
+import dataclasses
 import json
-from typing import Optional
+from contextlib import contextmanager, redirect_stdout
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
 from pathlib import Path
-import click
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.logging import RichHandler
 from datetime import datetime
 
-# Add src to Python path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Subsystem imports (settings, vector DB, RAG, orchestrator, diff, git) are
+# deferred into the command bodies so each subcommand only loads what it uses.
+
+
+class LazyConsole:
+    """Console proxy that only imports rich when something is rendered."""
+    
+    def __init__(self):
+        self._console = None
+        # Set while --json output is active; plain console output is suppressed
+        self.json_stream = None
+        # Set by the daemon to the client's stdout TTY state
+        self.terminal_override = None
+    
+    def _get_console(self):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+    
+    @property
+    def is_terminal(self) -> bool:
+        if self.terminal_override is not None:
+            return self.terminal_override
+        if self._console is None:
+            return sys.stdout.isatty()
+        return self._console.is_terminal
+    
+    def print(self, *objects, **kwargs):
+        if self.json_stream is not None:
+            return
+        self._get_console().print(*objects, **kwargs)
+    
+    def __getattr__(self, name: str):
+        return getattr(self._get_console(), name)
 
-from src.config.settings import settings
-from src.database.vector_db_manager import vector_db_manager
-from src.analysis.rag_system import rag_system
-from src.agents.master_orchestrator import master_orchestrator
-from src.diff.diff_generator import diff_generator
-from src.git.git_manager import GitManager
 
 # Initialize console for rich output
-console = Console()
+console = LazyConsole()
+
+# Column layouts for result tables as (header, style) pairs, defined once per process
+_METRIC_COLUMNS = (("Metric", "cyan"), ("Value", "magenta"))
+_SESSION_COLUMNS = (("Property", "cyan"), ("Value", "magenta"))
+_FILE_RESULT_COLUMNS = (("File", "cyan"), ("Status", "magenta"), ("Violations", "yellow"))
+_SESSION_LIST_COLUMNS = (
+    ("ID", "cyan"),
+    ("Name", "magenta"),
+    ("Type", "yellow"),
+    ("Status", "green"),
+    ("Files", "blue"),
+    ("Created", "dim")
+)
+_STATUS_COLUMNS = (("Component", "cyan"), ("Status", "magenta"), ("Details", "yellow"))
+_VIOLATION_COLUMNS = (("Rule ID", "cyan"), ("Count", "magenta"))
+
+
+_logging_configured = False
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """Queue handler for a listener in the same process: records are passed through unformatted."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting (and rich tracebacks) are left to the listener's handler
+        return record
 
 
-def setup_logging(verbose: bool = False):
-    """Setup logging configuration."""
+def setup_logging(verbose: bool = False, json_output: bool = False):
+    """Setup logging configuration once per process."""
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    
     log_level = logging.DEBUG if verbose else logging.INFO
     
-    logging.basicConfig(
-        level=log_level,
-        format="%(message)s",
-        datefmt="[%X]",
-        handlers=[RichHandler(console=console, rich_tracebacks=True)]
-    )
+    if json_output or not sys.stderr.isatty():
+        # Keep stdout clean for JSON and skip rich/pygments setup in non-interactive runs
+        handler = logging.StreamHandler(sys.stderr)
+    else:
+        from rich.logging import RichHandler
+        handler = RichHandler(console=console._get_console(), rich_tracebacks=True)
+    
+    handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    
+    # Records are written by a background thread so worker coroutines never block on terminal I/O
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    logging.basicConfig(level=log_level, handlers=[_InProcessQueueHandler(log_queue)])
+
+
+def setup_event_loop(use_uvloop: bool = True):
+    """Install uvloop as the asyncio event loop policy when available."""
+    if not use_uvloop:
+        return
+    
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logging.getLogger(__name__).debug("Using uvloop event loop policy")
+    except ImportError:
+        # Fall back to the default asyncio event loop
+        pass
+
+
+@contextmanager
+def _json_output_mode(enabled: bool):
+    """Route diagnostic prints to stderr so stdout only carries the JSON result."""
+    if not enabled:
+        yield
+        return
+    
+    console.json_stream = sys.stdout
+    try:
+        with redirect_stdout(sys.stderr):
+            yield
+    finally:
+        console.json_stream = None
+
+
+def _emit_json(data: Any):
+    """Write a command result as JSON (dataclasses are serialized natively by orjson)."""
+    if orjson is not None:
+        payload = orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+        ).decode("utf-8")
+    else:
+        if dataclasses.is_dataclass(data):
+            data = data.to_dict()
+        payload = json.dumps(data, default=str) + "\n"
+    console.json_stream.write(payload)
 
 
-@click.group()
-@click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
-@click.option('--config', '-c', type=click.Path(exists=True), help='Path to configuration file')
-def cli(verbose: bool, config: Optional[str]):
-    """Enterprise Code Refactor - AI-powered code analysis and refactoring tool."""
-    setup_logging(verbose)
+def _forward_to_daemon(method: str, **params) -> bool:
+    """Run a command through the local daemon if one is listening."""
+    from src.config.settings import settings
+    from src.daemon.daemon_server import send_request
     
-    if config:
-        # Load custom configuration
-        console.print(f"📁 Loading configuration from: {config}")
-        # In a real implementation, you'd load the config file here
+    params["json_output"] = console.json_stream is not None
+    params["terminal"] = sys.stdout.isatty()
+    response = send_request(settings.app.daemon_socket, method, params)
+    if response is None:
+        return False
     
-    console.print("🚀 [bold blue]Enterprise Code Refactor[/bold blue] - Version 1.0.0")
+    (console.json_stream or sys.stdout).write(response.get("output", ""))
+    if not response.get("ok"):
+        print(f"Error: {response.get('error') or 'Daemon request failed'}", file=sys.stderr)
+        sys.exit(1)
+    
+    return True
+
+
+def _resolve_output_dir(output_dir: Optional[str]) -> str:
+    """Absolute output directory, resolved against the client's working directory rather than the daemon's."""
+    from src.config.settings import settings
+    
+    return str(Path(output_dir or settings.app.output_dir).resolve())
 
 
-@cli.command()
-@click.option('--file', '-f', type=click.Path(exists=True), help='Standards file path')
-@click.option('--url', '-u', type=str, help='Standards file URL')
-@click.option('--format', '-fmt', type=click.Choice(['json', 'csv', 'txt']), default='json', help='File format')
-def load_standards(file: Optional[str], url: Optional[str], format: str):
+def load_standards(args: argparse.Namespace):
     """Load code standards into the vector database."""
+    asyncio.run(_load_standards(args.file, args.url, args.batch_size))
+
+
+async def _load_standards(file: Optional[str], url: Optional[str], batch_size: int):
+    """Load standards from a file or URL and print the resulting database summary."""
+    from src.database.vector_db_manager import vector_db_manager
     
-    async def _load_standards():
-        try:
-            console.print("🔧 Initializing vector database...")
-            await vector_db_manager.initialize()
-            
-            if file:
-                console.print(f"📁 Loading standards from file: {file}")
-                count = await vector_db_manager.load_standards_from_file(file)
-                console.print(f"✅ Loaded {count} standards from file")
-            
-            elif url:
-                console.print(f"🌐 Loading standards from URL: {url}")
-                count = await vector_db_manager.load_standards_from_url(url)
-                console.print(f"✅ Loaded {count} standards from URL")
-            
-            else:
-                console.print("❌ Please provide either --file or --url option")
-                return
-            
-            # Show summary
-            total_count = await vector_db_manager.get_standards_count()
-            categories = await vector_db_manager.get_all_categories()
-            
-            table = Table(title="Standards Database Summary")
-            table.add_column("Metric", style="cyan")
-            table.add_column("Value", style="magenta")
-            
-            table.add_row("Total Standards", str(total_count))
-            table.add_row("Categories", ", ".join(categories))
-            
-            console.print(table)
-            
-        except Exception as e:
-            console.print(f"❌ Error loading standards: {e}")
-            raise
-        finally:
-            await vector_db_manager.close()
+    try:
+        console.print("🔧 Initializing vector database...")
+        await vector_db_manager.initialize()
+        
+        if file:
+            console.print(f"📁 Loading standards from file: {file}")
+            count = await vector_db_manager.load_standards_from_file(file, batch_size)
+            console.print(f"✅ Loaded {count} standards from file")
+        
+        elif url:
+            console.print(f"🌐 Loading standards from URL: {url}")
+            count = await vector_db_manager.load_standards_from_url(url, batch_size)
+            console.print(f"✅ Loaded {count} standards from URL")
+        
+        else:
+            console.print("❌ Please provide either --file or --url option")
+            return
+        
+        # Show summary
+        stats = await vector_db_manager.get_system_stats()
+        total_count = stats["standards_count"]
+        categories = stats["categories"]
+        
+        if console.json_stream is not None:
+            _emit_json({"loaded": count, "total_standards": total_count, "categories": categories})
+            return
+        
+        _print_table("Standards Database Summary", _METRIC_COLUMNS, [
+            ("Total Standards", str(total_count)),
+            ("Categories", ", ".join(categories))
+        ])
+    
+    except Exception as e:
+        console.print(f"❌ Error loading standards: {e}")
+        raise
+    finally:
+        await vector_db_manager.close()
+
+
+def analyze_folder(args: argparse.Namespace):
+    """Analyze Python files in a folder."""
+    params = dict(
+        path=str(Path(args.path).resolve()),
+        recursive=args.recursive,
+        session_name=args.session_name,
+        output_dir=_resolve_output_dir(args.output_dir),
+        create_git_branch=args.create_git_branch,
+        create_pr=args.create_pr,
+        max_concurrency=args.max_concurrency
+    )
+    if _forward_to_daemon("analyze_folder", **params):
+        return
     
-    asyncio.run(_load_standards())
+    asyncio.run(_analyze_folder(**params))
 
 
-@cli.command()
-@click.argument('path', type=click.Path(exists=True))
-@click.option('--recursive', '-r', is_flag=True, default=True, help='Recursive search')
-@click.option('--session-name', '-s', type=str, help='Custom session name')
-@click.option('--output-dir', '-o', type=click.Path(), help='Output directory for results')
-@click.option('--create-git-branch', is_flag=True, help='Create Git branch for changes')
-@click.option('--create-pr', is_flag=True, help='Create pull request after analysis')
-def analyze_folder(
+async def _analyze_folder(
     path: str,
     recursive: bool,
     session_name: Optional[str],
     output_dir: Optional[str],
     create_git_branch: bool,
-    create_pr: bool
+    create_pr: bool,
+    max_concurrency: Optional[int] = None,
+    standalone: bool = True
 ):
-    """Analyze Python files in a folder."""
+    """Run folder analysis; systems are initialized and closed here only when standalone."""
+    from src.config.settings import settings
+    from src.analysis.rag_system import rag_system
+    from src.agents.master_orchestrator import master_orchestrator
+    from src.diff.diff_generator import diff_generator
+    from src.git.git_manager import GitManager
+    
+    git_manager = None
     
-    async def _analyze_folder():
-        git_manager = None
+    try:
+        console.print(f"📁 Starting folder analysis: {path}")
         
-        try:
-            console.print(f"📁 Starting folder analysis: {path}")
-            
-            # Initialize systems
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console
-            ) as progress:
-                init_task = progress.add_task("Initializing systems...", total=None)
-                
-                await master_orchestrator.initialize()
-                await rag_system.initialize()
-                
-                progress.update(init_task, description="✅ Systems initialized")
-                progress.stop()
-            
-            # Initialize Git if requested
-            if create_git_branch or create_pr:
-                git_manager = GitManager()
-                if git_manager.initialize_repo(path):
-                    console.print("✅ Git repository initialized")
-                else:
-                    console.print("❌ Failed to initialize Git repository")
-                    git_manager = None
-            
-            # Run analysis
-            session = await master_orchestrator.analyze_folder(
-                folder_path=path,
-                session_name=session_name,
-                recursive=recursive
-            )
-            
-            # Generate diffs
-            output_path = output_dir or settings.app.output_dir
-            diff_files = diff_generator.generate_diffs(
-                session.worker_results,
-                output_path
-            )
-            
-            # Create combined diff
-            if diff_files:
-                combined_diff_path = Path(output_path) / f"combined_diff_{session.id[:8]}.diff"
-                diff_generator.create_combined_diff(diff_files, str(combined_diff_path))
-                
-                # Create summary report
-                summary_path = Path(output_path) / f"summary_{session.id[:8]}.json"
-                summary = diff_generator.create_summary_report(diff_files, str(summary_path))
-                
-                # Display summary
-                _display_analysis_summary(session, summary)
-                
-                # Git operations
-                if git_manager and diff_files:
-                    if create_git_branch:
-                        branch_name = git_manager.create_refactor_branch(session.id)
-                        console.print(f"🌿 Created branch: {branch_name}")
-                        
-                        # Apply diffs
-                        for diff_file in diff_files:
-                            if git_manager.apply_diff_file(diff_file.file_path):
-                                console.print(f"✅ Applied diff: {diff_file.file_path}")
-                        
-                        # Commit changes
-                        commit_hash = git_manager.commit_changes(session.id)
-                        if commit_hash:
-                            console.print(f"📝 Committed changes: {commit_hash[:8]}")
-                        
-                        # Create PR
-                        if create_pr:
-                            pr_url = git_manager.create_pull_request(
-                                session.id,
-                                f"Code refactoring - Session {session.id[:8]}",
-                                f"Automated code refactoring based on standards analysis.\n\nSession: {session.id}\nFiles modified: {len(diff_files)}\nTotal fixes: {summary['summary']['total_fixes_applied']}"
-                            )
-                            
-                            if pr_url:
-                                console.print(f"🔀 Pull request created: {pr_url}")
-            
+        # Initialize systems
+        if standalone:
+            await _initialize_systems(master_orchestrator, rag_system)
+        
+        # Initialize Git if requested
+        if create_git_branch or create_pr:
+            git_manager = GitManager()
+            if git_manager.initialize_repo(path):
+                console.print("✅ Git repository initialized")
             else:
-                console.print("ℹ️  No violations found or no diffs generated")
-            
-        except Exception as e:
-            console.print(f"❌ Analysis failed: {e}")
-            raise
-        finally:
-            if git_manager:
-                git_manager.cleanup()
+                console.print("❌ Failed to initialize Git repository")
+                git_manager = None
+        
+        # Run analysis
+        session = await master_orchestrator.analyze_folder(
+            folder_path=path,
+            session_name=session_name,
+            recursive=recursive,
+            concurrency=max_concurrency
+        )
+        
+        output_path = output_dir or settings.app.output_dir
+        diff_files = await diff_generator.generate_diffs_async(session.worker_results, output_path)
+        
+        # Create combined diff
+        if diff_files:
+            combined_diff_path = Path(output_path) / f"combined_diff_{session.id[:8]}.diff"
+            await asyncio.to_thread(diff_generator.create_combined_diff, diff_files, str(combined_diff_path))
+            
+            # Create summary report
+            summary_path = Path(output_path) / f"summary_{session.id[:8]}.json"
+            summary = await asyncio.to_thread(diff_generator.create_summary_report, diff_files, str(summary_path))
+            
+            # Display summary
+            _display_analysis_summary(session, summary)
+            
+            # Git operations
+            if git_manager and diff_files:
+                if create_git_branch:
+                    branch_name = git_manager.create_refactor_branch(session.id)
+                    console.print(f"🌿 Created branch: {branch_name}")
+                    
+                    # Apply diffs
+                    applied = await asyncio.gather(*[
+                        asyncio.to_thread(git_manager.apply_diff_file, diff_file.file_path)
+                        for diff_file in diff_files
+                    ])
+                    for diff_file, ok in zip(diff_files, applied):
+                        if ok:
+                            console.print(f"✅ Applied diff: {diff_file.file_path}")
+                    
+                    # Commit changes
+                    commit_hash = git_manager.commit_changes(session.id)
+                    if commit_hash:
+                        console.print(f"📝 Committed changes: {commit_hash[:8]}")
+                    
+                    # Create PR
+                    if create_pr:
+                        pr_url = git_manager.create_pull_request(
+                            session.id,
+                            f"Code refactoring - Session {session.id[:8]}",
+                            f"Automated code refactoring based on standards analysis.\n\nSession: {session.id}\nFiles modified: {len(diff_files)}\nTotal fixes: {summary['summary']['total_fixes_applied']}"
+                        )
+                        
+                        if pr_url:
+                            console.print(f"🔀 Pull request created: {pr_url}")
+        
+        else:
+            _display_analysis_summary(session, None)
+    
+    except Exception as e:
+        console.print(f"❌ Analysis failed: {e}")
+        raise
+    finally:
+        if git_manager:
+            git_manager.cleanup()
+        if standalone:
             await master_orchestrator.close()
             await rag_system.close()
+            diff_generator.close()
+
+
+def analyze_repo(args: argparse.Namespace):
+    """Analyze Python files in a Git repository."""
+    params = dict(
+        repo_url=args.repo_url,
+        branch=args.branch,
+        session_name=args.session_name,
+        output_dir=_resolve_output_dir(args.output_dir),
+        create_pr=args.create_pr,
+        max_concurrency=args.max_concurrency
+    )
+    if _forward_to_daemon("analyze_repo", **params):
+        return
     
-    asyncio.run(_analyze_folder())
+    asyncio.run(_analyze_repo(**params))
 
 
-@cli.command()
-@click.argument('repo_url', type=str)
-@click.option('--branch', '-b', type=str, default='main', help='Git branch to analyze')
-@click.option('--session-name', '-s', type=str, help='Custom session name')
-@click.option('--output-dir', '-o', type=click.Path(), help='Output directory for results')
-@click.option('--create-pr', is_flag=True, help='Create pull request after analysis')
-def analyze_repo(
+async def _analyze_repo(
     repo_url: str,
     branch: str,
     session_name: Optional[str],
     output_dir: Optional[str],
-    create_pr: bool
+    create_pr: bool,
+    max_concurrency: Optional[int] = None,
+    standalone: bool = True
 ):
-    """Analyze Python files in a Git repository."""
+    """Run repository analysis; systems are initialized and closed here only when standalone."""
+    from src.config.settings import settings
+    from src.analysis.rag_system import rag_system
+    from src.agents.master_orchestrator import master_orchestrator
+    from src.diff.diff_generator import diff_generator
     
-    async def _analyze_repo():
-        try:
-            console.print(f"🌐 Starting repository analysis: {repo_url}")
-            
-            # Initialize systems
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console
-            ) as progress:
-                init_task = progress.add_task("Initializing systems...", total=None)
-                
-                await master_orchestrator.initialize()
-                await rag_system.initialize()
-                
-                progress.update(init_task, description="✅ Systems initialized")
-                progress.stop()
-            
-            # Run analysis
-            session = await master_orchestrator.analyze_git_repo(
-                repo_url=repo_url,
-                branch=branch,
-                session_name=session_name
-            )
-            
-            # Generate diffs
-            output_path = output_dir or settings.app.output_dir
-            diff_files = diff_generator.generate_diffs(
-                session.worker_results,
-                output_path
-            )
+    try:
+        console.print(f"🌐 Starting repository analysis: {repo_url}")
+        
+        # Initialize systems
+        if standalone:
+            await _initialize_systems(master_orchestrator, rag_system)
+        
+        # Run analysis
+        session = await master_orchestrator.analyze_git_repo(
+            repo_url=repo_url,
+            branch=branch,
+            session_name=session_name,
+            concurrency=max_concurrency
+        )
+        
+        output_path = output_dir or settings.app.output_dir
+        diff_files = await diff_generator.generate_diffs_async(session.worker_results, output_path)
+        
+        # Create combined diff and summary
+        if diff_files:
+            combined_diff_path = Path(output_path) / f"combined_diff_{session.id[:8]}.diff"
+            await asyncio.to_thread(diff_generator.create_combined_diff, diff_files, str(combined_diff_path))
             
-            # Create combined diff and summary
-            if diff_files:
-                combined_diff_path = Path(output_path) / f"combined_diff_{session.id[:8]}.diff"
-                diff_generator.create_combined_diff(diff_files, str(combined_diff_path))
-                
-                summary_path = Path(output_path) / f"summary_{session.id[:8]}.json"
-                summary = diff_generator.create_summary_report(diff_files, str(summary_path))
-                
-                _display_analysis_summary(session, summary)
-                
-                if create_pr:
-                    console.print("ℹ️  Pull request creation for remote repos is not yet implemented")
-                    console.print(f"📄 Use the generated diff file: {combined_diff_path}")
+            summary_path = Path(output_path) / f"summary_{session.id[:8]}.json"
+            summary = await asyncio.to_thread(diff_generator.create_summary_report, diff_files, str(summary_path))
             
-            else:
-                console.print("ℹ️  No violations found or no diffs generated")
+            _display_analysis_summary(session, summary)
             
-        except Exception as e:
-            console.print(f"❌ Repository analysis failed: {e}")
-            raise
-        finally:
+            if create_pr:
+                console.print("ℹ️  Pull request creation for remote repos is not yet implemented")
+                console.print(f"📄 Use the generated diff file: {combined_diff_path}")
+        
+        else:
+            _display_analysis_summary(session, None)
+    
+    except Exception as e:
+        console.print(f"❌ Repository analysis failed: {e}")
+        raise
+    finally:
+        if standalone:
             await master_orchestrator.close()
             await rag_system.close()
+            diff_generator.close()
+
+
+def _size_default_executor():
+    """Size the loop's default thread pool, used by asyncio.to_thread for parsing and embedding, to the CPU count."""
+    from concurrent.futures import ThreadPoolExecutor
     
-    asyncio.run(_analyze_repo())
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=os.cpu_count() or 1))
 
 
-@cli.command()
-@click.argument('session_id', type=str)
-def show_results(session_id: str):
+async def _initialize_systems(master_orchestrator, rag_system):
+    """Initialize the orchestrator and RAG system concurrently, with a spinner when interactive."""
+    _size_default_executor()
+    
+    if console.json_stream is not None or not console.is_terminal:
+        await asyncio.gather(master_orchestrator.initialize(), rag_system.initialize())
+        return
+    
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        console=console._get_console(),
+        refresh_per_second=2
+    ) as progress:
+        init_task = progress.add_task("Initializing systems...", total=None)
+        
+        await asyncio.gather(master_orchestrator.initialize(), rag_system.initialize())
+        
+        progress.update(init_task, description="✅ Systems initialized")
+        progress.stop()
+
+
+def show_results(args: argparse.Namespace):
     """Show results of a previous analysis session."""
+    if _forward_to_daemon("show_results", session_id=args.session_id):
+        return
     
-    async def _show_results():
-        try:
+    asyncio.run(_show_results(args.session_id))
+
+
+async def _show_results(session_id: str, standalone: bool = True):
+    """Display a stored analysis session."""
+    from src.agents.master_orchestrator import master_orchestrator
+    
+    try:
+        if standalone:
             await master_orchestrator.initialize()
-            
-            session = await master_orchestrator.get_session_results(session_id)
-            
-            if not session:
-                console.print(f"❌ Session not found: {session_id}")
-                return
-            
-            # Display session info
-            table = Table(title=f"Analysis Session: {session.name}")
-            table.add_column("Property", style="cyan")
-            table.add_column("Value", style="magenta")
-            
-            table.add_row("Session ID", session.id)
-            table.add_row("Source Type", session.source_type)
-            table.add_row("Source Path", session.source_path)
-            table.add_row("Status", session.status)
-            table.add_row("Total Files", str(session.total_files))
-            table.add_row("Processed Files", str(session.processed_files))
-            table.add_row("Failed Files", str(session.failed_files))
-            table.add_row("Start Time", session.start_time.strftime("%Y-%m-%d %H:%M:%S"))
-            
-            if session.end_time:
-                duration = (session.end_time - session.start_time).total_seconds()
-                table.add_row("Duration", f"{duration:.2f} seconds")
-            
-            console.print(table)
-            
-            # Display file results
-            if session.worker_results:
-                file_table = Table(title="File Analysis Results")
-                file_table.add_column("File", style="cyan")
-                file_table.add_column("Status", style="magenta")
-                file_table.add_column("Violations", style="yellow")
-                
-                for result in session.worker_results:
-                    status = "✅ Success" if result.success else "❌ Failed"
-                    violations = str(len(result.violations)) if result.success else "N/A"
-                    file_table.add_row(result.file_path, status, violations)
-                
-                console.print(file_table)
-            
-        except Exception as e:
-            console.print(f"❌ Failed to show results: {e}")
-            raise
-        finally:
-            await master_orchestrator.close()
+        
+        session = await master_orchestrator.get_session_results(session_id)
+        
+        if not session:
+            console.print(f"❌ Session not found: {session_id}")
+            return
+        
+        if console.json_stream is not None:
+            _emit_json(session)
+            return
+        
+        # Display session info
+        rows = [
+            ("Session ID", session.id),
+            ("Source Type", session.source_type),
+            ("Source Path", session.source_path),
+            ("Status", session.status),
+            ("Total Files", str(session.total_files)),
+            ("Processed Files", str(session.processed_files)),
+            ("Failed Files", str(session.failed_files)),
+            ("Start Time", _format_datetime(session.start_time, seconds=True))
+        ]
+        
+        if session.end_time:
+            duration = (session.end_time - session.start_time).total_seconds()
+            rows.append(("Duration", f"{duration:.2f} seconds"))
+        
+        _print_table(f"Analysis Session: {session.name}", _SESSION_COLUMNS, rows)
+        
+        # Display file results
+        if session.worker_results:
+            file_rows = [
+                (
+                    result.file_path,
+                    "✅ Success" if result.success else "❌ Failed",
+                    str(len(result.violations)) if result.success else "N/A"
+                )
+                for result in session.worker_results
+            ]
+            _print_table("File Analysis Results", _FILE_RESULT_COLUMNS, file_rows)
     
-    asyncio.run(_show_results())
+    except Exception as e:
+        console.print(f"❌ Failed to show results: {e}")
+        raise
+    finally:
+        if standalone:
+            await master_orchestrator.close()
 
 
-@cli.command()
-def list_sessions():
+def list_sessions(args: argparse.Namespace):
     """List all analysis sessions."""
+    if _forward_to_daemon("list_sessions", limit=args.limit):
+        return
     
-    async def _list_sessions():
-        try:
-            await vector_db_manager.initialize()
-            
-            async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
-                
-                query = text("""
-                    SELECT id, session_name, source_type, source_path, status, 
-                           total_files, processed_files, failed_files, created_at
-                    FROM code_refactor.analysis_sessions 
-                    ORDER BY created_at DESC
-                    LIMIT 20
-                """)
-                
-                result = await db_session.execute(query)
-                sessions = result.fetchall()
-                
-                if not sessions:
-                    console.print("ℹ️  No analysis sessions found")
-                    return
-                
-                table = Table(title="Recent Analysis Sessions")
-                table.add_column("ID", style="cyan")
-                table.add_column("Name", style="magenta")
-                table.add_column("Type", style="yellow")
-                table.add_column("Status", style="green")
-                table.add_column("Files", style="blue")
-                table.add_column("Created", style="dim")
-                
-                for session in sessions:
-                    short_id = session.id[:8]
-                    files_info = f"{session.processed_files}/{session.total_files}"
-                    if session.failed_files > 0:
-                        files_info += f" ({session.failed_files} failed)"
-                    
-                    created_str = session.created_at.strftime("%Y-%m-%d %H:%M")
-                    
-                    table.add_row(
-                        short_id,
-                        session.session_name,
-                        session.source_type,
-                        session.status,
-                        files_info,
-                        created_str
-                    )
-                
-                console.print(table)
-            
-        except Exception as e:
-            console.print(f"❌ Failed to list sessions: {e}")
-            raise
-        finally:
-            await vector_db_manager.close()
+    asyncio.run(_list_sessions(args.limit))
+
+
+async def _list_sessions(limit: Optional[int] = None, standalone: bool = True):
+    """Print analysis sessions, newest first, streaming rows from the database."""
+    from src.database.vector_db_manager import vector_db_manager
+    
+    try:
+        if standalone:
+            await vector_db_manager.initialize(pool_size=1)
+        
+        sessions = vector_db_manager.iter_sessions(limit)
+        
+        if console.json_stream is not None:
+            _emit_json([dict(session._mapping) async for session in sessions])
+            return
+        
+        rows = []
+        async for session in sessions:
+            short_id = session.id[:8]
+            files_info = f"{session.processed_files}/{session.total_files}"
+            if session.failed_files > 0:
+                files_info += f" ({session.failed_files} failed)"
+            
+            created_str = _format_datetime(session.created_at)
+            
+            rows.append((
+                short_id,
+                session.session_name,
+                session.source_type,
+                session.status,
+                files_info,
+                created_str
+            ))
+        
+        if not rows:
+            console.print("ℹ️  No analysis sessions found")
+            return
+        
+        _print_table("Recent Analysis Sessions", _SESSION_LIST_COLUMNS, rows)
     
-    asyncio.run(_list_sessions())
+    except Exception as e:
+        console.print(f"❌ Failed to list sessions: {e}")
+        raise
+    finally:
+        if standalone:
+            await vector_db_manager.close()
 
 
-@cli.command()
-def status():
+def status(args: argparse.Namespace):
     """Show system status and statistics."""
+    if _forward_to_daemon("status"):
+        return
     
-    async def _status():
+    asyncio.run(_status())
+
+
+async def _status(standalone: bool = True):
+    """Print system status and statistics."""
+    from src.config.settings import settings
+    from src.database.vector_db_manager import vector_db_manager
+    
+    try:
+        console.print("🔍 Checking system status...")
+        
+        if standalone:
+            await vector_db_manager.initialize(pool_size=1)
+        
+        # Get database and session statistics in a single round-trip
+        stats = await vector_db_manager.get_system_stats()
+        standards_count = stats["standards_count"]
+        categories = stats["categories"]
+        session_stats = stats["session_stats"]
+        cache_stats = vector_db_manager.embedding_cache.stats()
+        
+        if console.json_stream is not None:
+            _emit_json({**stats, "embedding_cache": cache_stats, "llm_provider": settings.llm.default_provider})
+            return
+        
+        # Display status
+        _print_table("System Status", _STATUS_COLUMNS, [
+            ("Database", "✅ Connected", "PostgreSQL with pgvector"),
+            ("Vector DB", "✅ Ready", f"{standards_count} standards loaded"),
+            ("Categories", "📊 Available", f"{len(categories)} categories"),
+            ("Embedding Cache", "🗄️  Local", f"{cache_stats['entries']} vectors, {cache_stats['hits']} hits / {cache_stats['misses']} misses"),
+            ("LLM Provider", "🤖 Configured", settings.llm.default_provider),
+            ("Sessions", "📈 History", f"{sum(session_stats.values())} total")
+        ])
+        
+        # Show categories
+        if categories:
+            console.print(f"\n📂 Available categories: {', '.join(categories)}")
+        
+        # Show session breakdown
+        if session_stats:
+            console.print(f"\n📊 Session breakdown: {dict(session_stats)}")
+    
+    except Exception as e:
+        console.print(f"❌ Failed to get system status: {e}")
+        raise
+    finally:
+        if standalone:
+            await vector_db_manager.close()
+
+
+def serve(args: argparse.Namespace):
+    """Run a local daemon that keeps systems initialized between commands."""
+    asyncio.run(_serve())
+
+
+def _daemon_handler(command):
+    """Adapt a command coroutine for the daemon, honouring the client's --json flag."""
+    async def handler(json_output: bool = False, terminal: bool = False, **params):
+        console.terminal_override = terminal
         try:
-            console.print("🔍 Checking system status...")
-            
-            await vector_db_manager.initialize()
-            
-            # Get database statistics
-            standards_count = await vector_db_manager.get_standards_count()
-            categories = await vector_db_manager.get_all_categories()
-            
-            # Get session statistics
-            async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
-                
-                session_query = text("""
-                    SELECT status, COUNT(*) as count
-                    FROM code_refactor.analysis_sessions 
-                    GROUP BY status
-                """)
-                
-                session_result = await db_session.execute(session_query)
-                session_stats = dict(session_result.fetchall())
-            
-            # Display status
-            table = Table(title="System Status")
-            table.add_column("Component", style="cyan")
-            table.add_column("Status", style="magenta")
-            table.add_column("Details", style="yellow")
-            
-            table.add_row("Database", "✅ Connected", f"PostgreSQL with pgvector")
-            table.add_row("Vector DB", "✅ Ready", f"{standards_count} standards loaded")
-            table.add_row("Categories", "📊 Available", f"{len(categories)} categories")
-            table.add_row("LLM Provider", "🤖 Configured", settings.llm.default_provider)
-            table.add_row("Sessions", "📈 History", f"{sum(session_stats.values())} total")
-            
-            console.print(table)
-            
-            # Show categories
-            if categories:
-                console.print(f"\n📂 Available categories: {', '.join(categories)}")
-            
-            # Show session breakdown
-            if session_stats:
-                console.print(f"\n📊 Session breakdown: {dict(session_stats)}")
-            
-        except Exception as e:
-            console.print(f"❌ Failed to get system status: {e}")
-            raise
+            with _json_output_mode(json_output):
+                await command(standalone=False, **params)
         finally:
-            await vector_db_manager.close()
+            console.terminal_override = None
     
-    asyncio.run(_status())
+    return handler
 
 
-def _display_analysis_summary(session, summary: dict):
-    """Display analysis summary in a formatted table."""
+async def _serve():
+    """Initialize systems once and serve CLI commands over a Unix socket."""
+    from src.config.settings import settings
+    from src.analysis.rag_system import rag_system
+    from src.agents.master_orchestrator import master_orchestrator
+    from src.daemon.daemon_server import DaemonServer
+    from src.diff.diff_generator import diff_generator
     
-    # Main summary table
-    table = Table(title="Analysis Summary")
-    table.add_column("Metric", style="cyan")
-    table.add_column("Value", style="magenta")
+    handlers = {
+        "analyze_folder": _daemon_handler(_analyze_folder),
+        "analyze_repo": _daemon_handler(_analyze_repo),
+        "show_results": _daemon_handler(_show_results),
+        "list_sessions": _daemon_handler(_list_sessions),
+        "status": _daemon_handler(_status)
+    }
     
-    summary_data = summary['summary']
-    table.add_row("Files Modified", str(summary_data['total_files_modified']))
-    table.add_row("Total Fixes", str(summary_data['total_fixes_applied']))
-    table.add_row("Average Confidence", f"{summary_data['average_confidence_score']:.3f}")
-    table.add_row("Processing Time", f"{(session.end_time - session.start_time).total_seconds():.2f}s")
+    try:
+        console.print("🛰️  Starting daemon...")
+        
+        # Handlers run with standalone=False, so the reranker must be loaded here as well
+        await _initialize_systems(master_orchestrator, rag_system)
+        
+        server = DaemonServer(settings.app.daemon_socket, handlers)
+        await server.serve_forever()
+    
+    finally:
+        await master_orchestrator.close()
+        await rag_system.close()
+        diff_generator.close()
+
+
+def _format_datetime(dt: datetime, seconds: bool = False) -> str:
+    """Format a timestamp as 'YYYY-MM-DD HH:MM[:SS]' without strftime's per-call format parsing."""
+    text = f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+    return f"{text}:{dt.second:02d}" if seconds else text
+
+
+@lru_cache(maxsize=None)
+def _tsv_header(columns: tuple) -> str:
+    """Tab-separated header line for a column layout."""
+    return "\t".join(name for name, _ in columns)
+
+
+def _print_table(title: str, columns: tuple, rows: list):
+    """Print rows as a rich table, or as tab-separated text when stdout is not a terminal."""
+    if not console.is_terminal:
+        lines = [_tsv_header(columns)]
+        lines.extend("\t".join(row) for row in rows)
+        print("\n".join(lines))
+        return
+    
+    from rich.table import Table
+    
+    table = Table(title=title)
+    for name, style in columns:
+        table.add_column(name, style=style)
+    for row in rows:
+        table.add_row(*row)
     
     console.print(table)
+
+
+def _display_analysis_summary(session, summary: Optional[dict]):
+    """Display analysis summary in a formatted table."""
+    processing_time = (session.end_time - session.start_time).total_seconds()
+    
+    if console.json_stream is not None:
+        _emit_json({
+            "session_id": session.id,
+            "processing_time": processing_time,
+            "summary": summary['summary'] if summary else None
+        })
+        return
+    
+    if not summary:
+        console.print("ℹ️  No violations found or no diffs generated")
+        return
+    
+    # Main summary table
+    summary_data = summary['summary']
+    _print_table("Analysis Summary", _METRIC_COLUMNS, [
+        ("Files Modified", str(summary_data['total_files_modified'])),
+        ("Total Fixes", str(summary_data['total_fixes_applied'])),
+        ("Average Confidence", f"{summary_data['average_confidence_score']:.3f}"),
+        ("Processing Time", f"{processing_time:.2f}s")
+    ])
     
     # Top violations table
     if summary_data['most_common_violations']:
-        violations_table = Table(title="Most Common Violations")
-        violations_table.add_column("Rule ID", style="cyan")
-        violations_table.add_column("Count", style="magenta")
+        _print_table("Most Common Violations", _VIOLATION_COLUMNS, [
+            (rule_id, str(count))
+            for rule_id, count in list(summary_data['most_common_violations'].items())[:5]
+        ])
+
+
+def _existing_path(value: str) -> str:
+    """argparse type that requires the path to exist."""
+    if not Path(value).exists():
+        raise argparse.ArgumentTypeError(f"Path '{value}' does not exist.")
+    return value
+
+
+def _positive_int(value: str) -> int:
+    """argparse type that requires a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not an integer.")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"'{value}' must be at least 1.")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    from src import __version__
+    
+    parser = argparse.ArgumentParser(
+        prog="code-refactor",
+        description="Enterprise Code Refactor - AI-powered code analysis and refactoring tool."
+    )
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
+    parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--config', '-c', type=_existing_path, help='Path to configuration file')
+    parser.add_argument('--no-uvloop', action='store_true', help='Use the default asyncio event loop instead of uvloop')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON instead of formatted tables')
+    
+    subparsers = parser.add_subparsers(dest="cmd", metavar="COMMAND")
+    subparsers.required = True
+    
+    sp = subparsers.add_parser('load-standards', help='Load code standards into the vector database.')
+    sp.add_argument('--file', '-f', type=_existing_path, help='Standards file path')
+    sp.add_argument('--url', '-u', type=str, help='Standards file URL')
+    sp.add_argument('--format', '-fmt', choices=['json', 'csv', 'txt'], default='json', help='File format')
+    sp.add_argument('--batch-size', type=_positive_int, default=64, help='Standards embedded and stored per batch')
+    sp.set_defaults(func=load_standards)
+    
+    sp = subparsers.add_parser('analyze-folder', help='Analyze Python files in a folder.')
+    sp.add_argument('path', type=_existing_path)
+    sp.add_argument('--recursive', '-r', action='store_true', default=True, help='Recursive search')
+    sp.add_argument('--session-name', '-s', type=str, help='Custom session name')
+    sp.add_argument('--output-dir', '-o', type=str, help='Output directory for results')
+    sp.add_argument('--create-git-branch', action='store_true', help='Create Git branch for changes')
+    sp.add_argument('--create-pr', action='store_true', help='Create pull request after analysis')
+    sp.add_argument('--max-concurrency', type=_positive_int, help='Maximum files analyzed at once (default: APP_MAX_WORKERS)')
+    sp.set_defaults(func=analyze_folder)
+    
+    sp = subparsers.add_parser('analyze-repo', help='Analyze Python files in a Git repository.')
+    sp.add_argument('repo_url', type=str)
+    sp.add_argument('--branch', '-b', type=str, default='main', help='Git branch to analyze')
+    sp.add_argument('--session-name', '-s', type=str, help='Custom session name')
+    sp.add_argument('--output-dir', '-o', type=str, help='Output directory for results')
+    sp.add_argument('--create-pr', action='store_true', help='Create pull request after analysis')
+    sp.add_argument('--max-concurrency', type=_positive_int, help='Maximum files analyzed at once (default: APP_MAX_WORKERS)')
+    sp.set_defaults(func=analyze_repo)
+    
+    sp = subparsers.add_parser('show-results', help='Show results of a previous analysis session.')
+    sp.add_argument('session_id', type=str)
+    sp.set_defaults(func=show_results)
+    
+    sp = subparsers.add_parser('list-sessions', help='List all analysis sessions.')
+    sp.add_argument('--limit', '-n', type=int, help='Only show the N most recent sessions')
+    sp.set_defaults(func=list_sessions)
+    
+    sp = subparsers.add_parser('status', help='Show system status and statistics.')
+    sp.set_defaults(func=status)
+    
+    sp = subparsers.add_parser('serve', help='Run a local daemon that keeps systems initialized between commands.')
+    sp.set_defaults(func=serve)
+    
+    return parser
+
+
+def main(argv: Optional[list] = None):
+    """Parse arguments and dispatch to the selected command."""
+    args = build_parser().parse_args(argv)
+    
+    setup_logging(args.verbose, args.json)
+    setup_event_loop(not args.no_uvloop)
+    
+    with _json_output_mode(args.json):
+        if args.config:
+            # Load custom configuration
+            console.print(f"📁 Loading configuration from: {args.config}")
+            # In a real implementation, you'd load the config file here
         
-        for rule_id, count in list(summary_data['most_common_violations'].items())[:5]:
-            violations_table.add_row(rule_id, str(count))
+        console.print("🚀 [bold blue]Enterprise Code Refactor[/bold blue] - Version 1.0.0")
         
-        console.print(violations_table)
+        args.func(args)
 
 
 if __name__ == "__main__":
-    cli()
-
+    main()
@@ -0,0 +1,3 @@
+"""
+Agent implementations: master orchestrator and worker agents.
+"""
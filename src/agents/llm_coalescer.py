@@ -0,0 +1,23 @@
+"""
+Coalesces concurrent LLM requests from worker agents into batched calls.
+"""
+
+from typing import Any, List, Tuple
+
+from ..config.settings import settings
+from ..utils.micro_batcher import MicroBatcher
+
+
+async def _invoke_batch(requests: List[Tuple[Any, str]]) -> List[Any]:
+    """Send one LLM client's prompts as a single abatch() call."""
+    llm = requests[0][0]
+    return await llm.abatch([prompt for _, prompt in requests], return_exceptions=True)
+
+
+# Global LLM request coalescer instance; requests are (llm, prompt) and grouped by LLM client
+llm_coalescer = MicroBatcher(
+    _invoke_batch,
+    window_ms=settings.llm.batch_window_ms,
+    max_batch=settings.llm.batch_max_size,
+    key=lambda request: id(request[0])
+)
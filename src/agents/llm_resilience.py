@@ -0,0 +1,107 @@
+"""
+Retries transient LLM errors with backoff and fails fast while the provider is down.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+
+import openai
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+try:
+    import anthropic
+except ImportError:  # pragma: no cover - only needed for the Anthropic provider
+    anthropic = None
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Rate limits, timeouts, dropped connections and 5xx responses usually succeed on retry; only
+# these count toward opening the circuit, since other errors do not mean the provider is down
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    TimeoutError,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+if anthropic is not None:
+    TRANSIENT_ERRORS += (
+        anthropic.RateLimitError,
+        anthropic.APIConnectionError,
+        anthropic.InternalServerError
+    )
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+
+class LLMCircuitBreaker:
+    """Retries transient LLM errors and stops calling the provider after repeated transient failures."""
+    
+    def __init__(
+        self,
+        fail_max: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.fail_max = fail_max or settings.llm.circuit_breaker_fail_max
+        self.reset_timeout = reset_timeout or settings.llm.circuit_breaker_reset_seconds
+        self.max_attempts = max_attempts or settings.llm.retry_attempts
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently refused; once reset_timeout passes, one probe call is let through."""
+        if self.opened_at is None:
+            return False
+        return self.probing or time.monotonic() - self.opened_at < self.reset_timeout
+    
+    def _record_failure(self):
+        self.failures += 1
+        # Failures are only reset by a success, so a failed half-open probe re-opens the circuit
+        if self.failures >= self.fail_max:
+            if self.opened_at is None:
+                logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+    
+    def _record_success(self):
+        if self.opened_at is not None:
+            logger.info("LLM circuit closed")
+        self.failures = 0
+        self.opened_at = None
+    
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func(), retrying transient errors with jittered exponential backoff unless the circuit is open."""
+        if self.is_open:
+            raise CircuitOpenError("LLM provider unavailable; circuit breaker is open")
+        
+        # Half-open: this call is the single probe, made without retries, and others fail fast until it finishes
+        probe = self.opened_at is not None
+        self.probing = probe
+        try:
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception_type(TRANSIENT_ERRORS),
+                wait=wait_exponential_jitter(initial=0.5, max=8),
+                stop=stop_after_attempt(1 if probe else self.max_attempts),
+                reraise=True
+            ):
+                with attempt:
+                    result = await func()
+        except TRANSIENT_ERRORS:
+            self._record_failure()
+            raise
+        finally:
+            if probe:
+                self.probing = False
+        
+        self._record_success()
+        return result
+
+
+# Global LLM circuit breaker instance
+llm_circuit_breaker = LLMCircuitBreaker()
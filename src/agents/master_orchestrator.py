@@ -3,21 +3,195 @@ Master orchestrator agent that coordinates worker agents for parallel code analy
 """
 
 import asyncio
+import contextlib
+import json
 import logging
+import os
+import secrets
+import shutil
 import uuid
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import git
+from sqlalchemy import text
 
+from ..agents.semantic_cache import semantic_prompt_cache
 from ..agents.worker_agent import WorkerAgent, WorkerResult
 from ..analysis.code_parser import code_parser
+from ..analysis.file_hash import hash_bytes
+from ..analysis.fingerprint_cache import fingerprint_cache
+from ..analysis.rag_system import ANALYSIS_PROMPT_PREFIX
 from ..database.vector_db_manager import vector_db_manager
 from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+_INSERT_SESSION_QUERY = text("""
+    INSERT INTO code_refactor.analysis_sessions 
+    (id, session_name, source_type, source_path, status, total_files, processed_files, failed_files)
+    VALUES (:id, :session_name, :source_type, :source_path, :status, :total_files, :processed_files, :failed_files)
+""")
+
+_INSERT_FILE_ANALYSIS_QUERY = text("""
+    INSERT INTO code_refactor.file_analysis 
+    (session_id, file_path, file_hash, analysis_status)
+    VALUES (:session_id, :file_path, :file_hash, :analysis_status)
+""")
+
+_UPDATE_FILE_HASHES_QUERY = text("""
+    UPDATE code_refactor.file_analysis AS fa
+    SET file_hash = v.file_hash
+    FROM unnest(CAST(:file_paths AS TEXT[]), CAST(:file_hashes AS TEXT[])) AS v(file_path, file_hash)
+    WHERE fa.session_id = :session_id AND fa.file_path = v.file_path
+""")
+
+_UPDATE_SESSION_PROGRESS_QUERY = text("""
+    UPDATE code_refactor.analysis_sessions 
+    SET processed_files = :processed_files,
+        failed_files = :failed_files,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = :session_id
+""")
+
+_UPDATE_SESSION_STATUS_QUERY = text("""
+    UPDATE code_refactor.analysis_sessions 
+    SET status = :status,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = :session_id
+""")
+
+_INSERT_GIT_OPERATION_QUERY = text("""
+    INSERT INTO code_refactor.git_operations 
+    (session_id, operation_type, metadata, status)
+    VALUES (:session_id, :operation_type, CAST(:metadata AS JSONB), :status)
+""")
+
+_SELECT_SESSION_QUERY = text("""
+    SELECT * FROM code_refactor.analysis_sessions 
+    WHERE id = :session_id
+""")
+
+# Violations are aggregated per file so the whole session loads in one round trip
+_SELECT_SESSION_FILES_QUERY = text("""
+    SELECT fa.*, COUNT(cv.id) as violation_count,
+           COALESCE(
+               json_agg(json_build_object(
+                   'rule_id', cv.rule_id,
+                   'line_number', cv.line_number,
+                   'column_number', cv.column_number,
+                   'violation_description', cv.violation_description,
+                   'severity', cv.severity,
+                   'suggested_fix', cv.suggested_fix,
+                   'confidence_score', cv.confidence_score
+               ) ORDER BY cv.line_number) FILTER (WHERE cv.id IS NOT NULL),
+               '[]'::json
+           ) AS violations
+    FROM code_refactor.file_analysis fa
+    LEFT JOIN code_refactor.code_violations cv ON fa.id = cv.file_analysis_id
+    WHERE fa.session_id = :session_id
+    GROUP BY fa.id
+    ORDER BY fa.created_at
+""")
+
+# Digest of the stored standards' content, part of the analysis fingerprint
+_STANDARDS_DIGEST_QUERY = text("""
+    SELECT md5(COALESCE(string_agg(
+        concat_ws(chr(31), rule_id, title, description, category, severity, language), chr(30) ORDER BY rule_id
+    ), ''))
+    FROM code_refactor.code_standards
+""")
+
+# Latest completed analysis for each content hash made with the same fingerprint, with its violations;
+# rule-based fallback results carry no fingerprint and never match
+_SELECT_PRIOR_ANALYSES_QUERY = text("""
+    SELECT prior.id, prior.file_hash, prior.worker_agent_id, v.violations
+    FROM (
+        SELECT DISTINCT ON (file_hash) id, file_hash, worker_agent_id
+        FROM code_refactor.file_analysis
+        WHERE analysis_status = 'completed' AND file_hash = ANY(CAST(:file_hashes AS TEXT[]))
+          AND analysis_metadata->>'fingerprint' = :fingerprint
+        ORDER BY file_hash, updated_at DESC
+    ) prior
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(
+            json_agg(json_build_object(
+                'rule_id', cv.rule_id,
+                'line_number', cv.line_number,
+                'column_number', cv.column_number,
+                'violation_description', cv.violation_description,
+                'severity', cv.severity,
+                'suggested_fix', cv.suggested_fix,
+                'confidence_score', cv.confidence_score
+            ) ORDER BY cv.line_number),
+            '[]'::json
+        ) AS violations
+        FROM code_refactor.code_violations cv
+        WHERE cv.file_analysis_id = prior.id
+    ) v
+""")
+
+# Marks this session's rows for unchanged files as completed and copies the prior violations
+_COPY_PRIOR_ANALYSES_QUERY = text("""
+    WITH reused AS (
+        UPDATE code_refactor.file_analysis AS fa
+        SET file_hash = v.file_hash,
+            worker_agent_id = prior.worker_agent_id,
+            analysis_status = 'completed',
+            violations_found = prior.violations_found,
+            analysis_metadata = prior.analysis_metadata,
+            updated_at = CURRENT_TIMESTAMP
+        FROM unnest(
+            CAST(:file_paths AS TEXT[]), CAST(:file_hashes AS TEXT[]), CAST(:prior_ids AS UUID[])
+        ) AS v(file_path, file_hash, prior_id)
+        JOIN code_refactor.file_analysis prior ON prior.id = v.prior_id
+        WHERE fa.session_id = :session_id AND fa.file_path = v.file_path
+        RETURNING fa.id, v.prior_id
+    )
+    INSERT INTO code_refactor.code_violations
+    (file_analysis_id, rule_id, line_number, column_number,
+     violation_description, severity, suggested_fix, confidence_score)
+    SELECT reused.id, cv.rule_id, cv.line_number, cv.column_number,
+           cv.violation_description, cv.severity, cv.suggested_fix, cv.confidence_score
+    FROM reused
+    JOIN code_refactor.code_violations cv ON cv.file_analysis_id = reused.prior_id
+""")
+
+# Directory names never descended into when discovering Python files
+SKIP_DIRECTORIES = frozenset({
+    ".git", ".hg", ".svn", ".venv", "venv", "__pycache__", "node_modules", "site-packages",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".nox", ".eggs", "build", "dist"
+})
+
+# Columns written when registering a session's files
+FILE_RECORD_COLUMNS = ("session_id", "file_path", "file_hash", "analysis_status")
+
+# Rows per executemany when registering a session's files without COPY support
+FILE_RECORD_BATCH_SIZE = 500
+
+# Seconds between background flushes of session progress counters
+PROGRESS_FLUSH_INTERVAL = 2.0
+
+
+def _decode_json(value: Any) -> Any:
+    """Decode a json column, which asyncpg returns as text unless a codec is registered."""
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _scan_directory(directory: Path) -> Tuple[List[Path], List[Path]]:
+    """List one directory's .py files and its subdirectories (symlinked and SKIP_DIRECTORIES are not followed)."""
+    python_files = []
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRECTORIES:
+                    subdirs.append(Path(entry.path))
+            elif entry.name.endswith(".py") and entry.is_file():
+                python_files.append(Path(entry.path))
+    return python_files, subdirs
+
 
 @dataclass
 class AnalysisSession:
@@ -36,11 +210,20 @@ class AnalysisSession:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        result = asdict(self)
-        result['worker_results'] = [result.to_dict() for result in self.worker_results]
-        result['start_time'] = self.start_time.isoformat()
-        result['end_time'] = self.end_time.isoformat() if self.end_time else None
-        return result
+        # Built field by field: asdict() would deep-copy every worker result only to be replaced
+        return {
+            'id': self.id,
+            'name': self.name,
+            'source_type': self.source_type,
+            'source_path': self.source_path,
+            'status': self.status,
+            'total_files': self.total_files,
+            'processed_files': self.processed_files,
+            'failed_files': self.failed_files,
+            'worker_results': [worker_result.to_dict() for worker_result in self.worker_results],
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat() if self.end_time else None
+        }
 
 
 class MasterOrchestrator:
@@ -69,7 +252,8 @@ class MasterOrchestrator:
         self,
         folder_path: str,
         session_name: Optional[str] = None,
-        recursive: bool = True
+        recursive: bool = True,
+        concurrency: Optional[int] = None
     ) -> AnalysisSession:
         """Analyze all Python files in a folder."""
         try:
@@ -81,27 +265,24 @@ class MasterOrchestrator:
                 raise FileNotFoundError(f"Folder not found: {folder_path}")
             
             # Find Python files
-            if recursive:
-                python_files = list(folder.rglob("*.py"))
-            else:
-                python_files = list(folder.glob("*.py"))
+            python_files = await self._find_python_files(folder, recursive)
             
             print(f"📄 Found {len(python_files)} Python files")
             
             if not python_files:
                 raise ValueError("No Python files found in the specified folder")
             
-            # Create analysis session
+            # Create analysis session and its file records
+            file_paths = [str(f) for f in python_files]
             session = await self._create_session(
                 session_name or f"folder_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 "folder",
                 str(folder_path),
-                len(python_files)
+                file_paths
             )
             
             # Process files
-            file_paths = [str(f) for f in python_files]
-            await self._process_files(session, file_paths)
+            await self._process_files(session, file_paths, concurrency)
             
             return session
             
@@ -113,42 +294,38 @@ class MasterOrchestrator:
         self,
         repo_url: str,
         branch: str = "main",
-        session_name: Optional[str] = None
+        session_name: Optional[str] = None,
+        concurrency: Optional[int] = None
     ) -> AnalysisSession:
         """Analyze Python files in a Git repository."""
         try:
             print(f"🌐 Starting Git repository analysis: {repo_url}")
             
             # Clone repository to temp directory
-            temp_dir = Path(self.settings.app.temp_dir) / f"repo_{uuid.uuid4().hex[:8]}"
+            temp_dir = self._clone_root() / f"repo_{secrets.token_hex(4)}"
             temp_dir.mkdir(parents=True, exist_ok=True)
             
             print(f"📥 Cloning repository to: {temp_dir}")
-            repo = git.Repo.clone_from(repo_url, temp_dir)
-            
-            # Checkout specified branch
-            if branch != "main" and branch in [ref.name.split('/')[-1] for ref in repo.refs]:
-                repo.git.checkout(branch)
-                print(f"🔄 Switched to branch: {branch}")
+            await asyncio.to_thread(self._shallow_clone, repo_url, temp_dir, branch)
             
             # Find Python files
-            python_files = list(temp_dir.rglob("*.py"))
+            python_files = await self._find_python_files(temp_dir)
             print(f"📄 Found {len(python_files)} Python files")
             
             if not python_files:
                 raise ValueError("No Python files found in the repository")
             
-            # Create analysis session
+            # Create analysis session and its file records
+            file_paths = [str(f) for f in python_files]
             session = await self._create_session(
                 session_name or f"git_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 "git",
                 repo_url,
-                len(python_files)
+                file_paths
             )
             
             # Process files
-            file_paths = [str(f) for f in python_files]
-            await self._process_files(session, file_paths)
+            await self._process_files(session, file_paths, concurrency)
             
             # Store git operation
             await self._store_git_operation(session.id, "clone", repo_url, branch)
@@ -161,36 +338,76 @@ class MasterOrchestrator:
         finally:
             # Clean up temp directory
             if 'temp_dir' in locals() and temp_dir.exists():
-                import shutil
                 try:
                     shutil.rmtree(temp_dir)
                     print(f"🧹 Cleaned up temp directory: {temp_dir}")
                 except Exception as e:
                     logger.warning(f"Failed to clean up temp directory: {e}")
     
+    async def _find_python_files(self, root: Path, recursive: bool = True) -> List[Path]:
+        """Find .py files, scanning subdirectories concurrently in worker threads."""
+        python_files, subdirs = await asyncio.to_thread(_scan_directory, root)
+        
+        if recursive and subdirs:
+            nested = await asyncio.gather(*[self._find_python_files(subdir) for subdir in subdirs])
+            for found in nested:
+                python_files.extend(found)
+        
+        return python_files
+    
+    def _clone_root(self) -> Path:
+        """Directory to clone into: the configured tmpfs path when it has room, else temp_dir."""
+        tmpfs_path = self.settings.app.clone_tmpfs_path
+        if tmpfs_path:
+            try:
+                free_mb = shutil.disk_usage(tmpfs_path).free // (1024 * 1024)
+                if free_mb >= self.settings.app.clone_tmpfs_min_free_mb:
+                    return Path(tmpfs_path)
+                logger.warning(f"Only {free_mb} MB free in {tmpfs_path}, cloning to {self.settings.app.temp_dir}")
+            except OSError as e:
+                logger.warning(f"Clone tmpfs path {tmpfs_path} unavailable: {e}")
+        
+        return Path(self.settings.app.temp_dir)
+    
+    def _shallow_clone(self, repo_url: str, temp_dir: Path, branch: str):
+        """Clone only the tip of one branch, without history or other branches."""
+        clone_options = {"depth": 1, "single_branch": True, "multi_options": ["--filter=blob:none"]}
+        try:
+            git.Repo.clone_from(repo_url, temp_dir, branch=branch, **clone_options)
+            print(f"🔄 Cloned branch: {branch}")
+        except git.exc.GitCommandError as e:
+            # Like before, fall back to the default branch when the requested one does not exist;
+            # other failures (authentication, network, disk) are not hidden behind a different branch
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if self._remote_has_ref(repo_url, branch):
+                raise
+            logger.warning(f"Branch '{branch}' does not exist, using the default branch: {e}")
+            git.Repo.clone_from(repo_url, temp_dir, **clone_options)
+    
+    def _remote_has_ref(self, repo_url: str, ref: str) -> bool:
+        """Whether the remote has a branch or tag named ref; True if the remote cannot be queried."""
+        try:
+            return bool(git.cmd.Git().ls_remote("--heads", "--tags", repo_url, ref).strip())
+        except git.exc.GitCommandError as e:
+            logger.warning(f"Could not list refs of {repo_url}: {e}")
+            return True
+    
     async def _create_session(
         self,
         session_name: str,
         source_type: str,
         source_path: str,
-        total_files: int
+        file_paths: List[str]
     ) -> AnalysisSession:
-        """Create a new analysis session."""
+        """Create a new analysis session and its file records in a single transaction."""
         try:
             session_id = str(uuid.uuid4())
+            total_files = len(file_paths)
             
-            # Store session in database
+            # Store session and file records in database with one commit
             async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
-                
-                query = text("""
-                    INSERT INTO code_refactor.analysis_sessions 
-                    (id, session_name, source_type, source_path, status, total_files, processed_files, failed_files)
-                    VALUES (:id, :session_name, :source_type, :source_path, :status, :total_files, :processed_files, :failed_files)
-                """)
-                
                 await db_session.execute(
-                    query,
+                    _INSERT_SESSION_QUERY,
                     {
                         "id": session_id,
                         "session_name": session_name,
@@ -203,6 +420,8 @@ class MasterOrchestrator:
                     }
                 )
                 
+                await self._insert_file_analysis_records(db_session, session_id, file_paths)
+                
                 await db_session.commit()
             
             # Create session object
@@ -220,7 +439,7 @@ class MasterOrchestrator:
             )
             
             self.current_session = session
-            print(f"📋 Created analysis session: {session_name} ({session_id})")
+            logger.info(f"Created analysis session: {session_name} ({session_id})")
             
             return session
             
@@ -228,59 +447,94 @@ class MasterOrchestrator:
             logger.error(f"Failed to create session: {e}")
             raise
     
-    async def _process_files(self, session: AnalysisSession, file_paths: List[str]):
-        """Process files using worker agents in parallel."""
+    async def _process_files(
+        self,
+        session: AnalysisSession,
+        file_paths: List[str],
+        concurrency: Optional[int] = None
+    ):
+        """Process files with a fixed pool of worker agents consuming a shared queue."""
         try:
-            print(f"🚀 Starting parallel processing of {len(file_paths)} files")
-            print(f"👥 Using {self.settings.app.max_workers} worker agents")
-            
-            # Create file analysis records in database
-            await self._create_file_analysis_records(session.id, file_paths)
-            
-            # Create worker agents
-            workers = []
-            for i in range(self.settings.app.max_workers):
-                worker_id = f"worker_{i+1:02d}"
-                worker = WorkerAgent(worker_id, session.id)
-                await worker.initialize()
-                workers.append(worker)
-                print(f"🤖 Created worker: {worker_id}")
-            
-            # Process files in batches
-            batch_size = self.settings.app.batch_size
-            all_results = []
+            results: List[Optional[WorkerResult]] = [None] * len(file_paths)
+            
+            # Violations are already persisted per file by the workers; only a running
+            # total is kept here for the summary
+            total_violations = 0
+            
+            # Files whose content matches a completed analysis from an earlier session are not re-analyzed
+            fingerprint = await self._analysis_fingerprint()
+            reused = {}
+            if self.settings.app.reuse_prior_analyses and fingerprint is not None:
+                reused = await self._reuse_prior_analyses(session, file_paths, fingerprint)
+            for index, file_path in enumerate(file_paths):
+                if (result := reused.get(file_path)) is not None:
+                    results[index] = result
+                    session.processed_files += 1
+                    total_violations += len(result.violations)
+            
+            pending = [(index, file_path) for index, file_path in enumerate(file_paths) if results[index] is None]
+            concurrency = max(1, min(concurrency or self.settings.app.max_workers, len(pending))) if pending else 0
+            logger.info(
+                f"Starting parallel processing of {len(pending)} files with {concurrency} worker agents "
+                f"({len(reused)} unchanged files reused)"
+            )
             
-            for i in range(0, len(file_paths), batch_size):
-                batch_files = file_paths[i:i + batch_size]
-                print(f"📦 Processing batch {i//batch_size + 1}: {len(batch_files)} files")
-                
-                # Create tasks for this batch
-                tasks = []
-                for j, file_path in enumerate(batch_files):
-                    worker_idx = j % len(workers)
-                    worker = workers[worker_idx]
-                    task = asyncio.create_task(worker.process_file(file_path))
-                    tasks.append(task)
-                
-                # Wait for batch completion
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Process batch results
-                for result in batch_results:
-                    if isinstance(result, Exception):
-                        logger.error(f"Worker task failed: {result}")
-                        session.failed_files += 1
+            # Create worker agents, never more than there are files, and initialize them concurrently;
+            # they share results by content hash so duplicate files in this run are analyzed once
+            shared_analyses: Dict[str, asyncio.Future] = {}
+            workers = [
+                WorkerAgent(f"worker_{i+1:02d}", session.id, shared_analyses, fingerprint)
+                for i in range(concurrency)
+            ]
+            await asyncio.gather(*(worker.initialize() for worker in workers))
+            logger.debug(f"Created {len(workers)} workers")
+            
+            # Each worker pulls files from a shared queue until it drains, so a slow file
+            # only occupies its own worker; progress is reported every batch_size files
+            batch_size = self.settings.app.batch_size
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in pending:
+                queue.put_nowait(item)
+            for _ in workers:
+                queue.put_nowait(None)
+            
+            async def worker_loop(worker: WorkerAgent):
+                nonlocal total_violations
+                while (item := await queue.get()) is not None:
+                    index, file_path = item
+                    try:
+                        result = await worker.process_file(file_path)
+                    except Exception as e:
+                        logger.error(f"Worker task failed: {e}")
+                        result = None
+                    
+                    results[index] = result
+                    if result is not None and result.success:
+                        session.processed_files += 1
+                        total_violations += len(result.violations)
                     else:
-                        all_results.append(result)
-                        if result.success:
-                            session.processed_files += 1
-                        else:
-                            session.failed_files += 1
-                
-                # Update session progress
+                        session.failed_files += 1
+                    
+                    completed = session.processed_files + session.failed_files
+                    if completed % batch_size == 0 or completed == len(file_paths):
+                        logger.debug(f"Progress: {session.processed_files}/{session.total_files} files processed")
+            
+            # Counters are persisted by a debounced background task rather than per file
+            flusher = asyncio.create_task(self._progress_flusher(session))
+            try:
+                async with asyncio.TaskGroup() as task_group:
+                    for worker in workers:
+                        task_group.create_task(worker_loop(worker))
+            finally:
+                flusher.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await flusher
+                # Cached responses are scoped to this session; drop them so a daemon does not accumulate them
+                semantic_prompt_cache.clear_session(session.id)
                 await self._update_session_progress(session)
-                
-                print(f"✅ Batch {i//batch_size + 1} completed: {session.processed_files}/{session.total_files} files processed")
+            
+            all_results = [result for result in results if result is not None]
+            await self._store_file_hashes(session.id, all_results)
             
             # Finalize session
             session.worker_results = all_results
@@ -290,18 +544,13 @@ class MasterOrchestrator:
             await self._update_session_status(session, "completed")
             
             # Generate summary
-            total_violations = sum(len(result.violations) for result in all_results if result.success)
             processing_time = (session.end_time - session.start_time).total_seconds()
             
-            print(f"""
-🎉 Analysis completed successfully!
-📊 Summary:
-   - Total files: {session.total_files}
-   - Processed: {session.processed_files}
-   - Failed: {session.failed_files}
-   - Total violations: {total_violations}
-   - Processing time: {processing_time:.2f} seconds
-            """)
+            logger.info(
+                "Analysis completed: total=%d processed=%d failed=%d violations=%d time=%.2fs",
+                session.total_files, session.processed_files, session.failed_files,
+                total_violations, processing_time
+            )
             
         except Exception as e:
             logger.error(f"Failed to process files: {e}")
@@ -310,60 +559,153 @@ class MasterOrchestrator:
             await self._update_session_status(session, "failed")
             raise
     
-    async def _create_file_analysis_records(self, session_id: str, file_paths: List[str]):
-        """Create file analysis records in database."""
+    async def _insert_file_analysis_records(self, db_session, session_id: str, file_paths: List[str]):
+        """Insert file analysis records within the caller's transaction."""
+        # Hashes are filled in after analysis from the workers' own reads (see _store_file_hashes)
+        records = [
+            (uuid.UUID(session_id), file_path, None, "pending")
+            for file_path in file_paths
+        ]
+        
+        connection = await db_session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        
+        if hasattr(driver_connection, "copy_records_to_table"):
+            # asyncpg: stream all rows with COPY instead of planning an INSERT per row
+            await driver_connection.copy_records_to_table(
+                "file_analysis",
+                schema_name="code_refactor",
+                columns=list(FILE_RECORD_COLUMNS),
+                records=records
+            )
+        else:
+            # A list of parameter sets runs as a single executemany per chunk
+            params = [
+                {**dict(zip(FILE_RECORD_COLUMNS, record)), "session_id": session_id}
+                for record in records
+            ]
+            for i in range(0, len(params), FILE_RECORD_BATCH_SIZE):
+                await db_session.execute(_INSERT_FILE_ANALYSIS_QUERY, params[i:i + FILE_RECORD_BATCH_SIZE])
+    
+    async def _store_file_hashes(self, session_id: str, results: List[WorkerResult]):
+        """Record the file hashes computed by workers with a single UPDATE."""
+        hashed = [result for result in results if result.file_hash]
+        if not hashed:
+            return
+        
         try:
             async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
+                await db_session.execute(
+                    _UPDATE_FILE_HASHES_QUERY,
+                    {
+                        "session_id": session_id,
+                        "file_paths": [result.file_path for result in hashed],
+                        "file_hashes": [result.file_hash for result in hashed]
+                    }
+                )
                 
-                for file_path in file_paths:
-                    # Calculate file hash
-                    import hashlib
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        file_hash = hashlib.sha256(content.encode()).hexdigest()
-                    except Exception:
-                        file_hash = None
-                    
-                    query = text("""
-                        INSERT INTO code_refactor.file_analysis 
-                        (session_id, file_path, file_hash, analysis_status)
-                        VALUES (:session_id, :file_path, :file_hash, :analysis_status)
-                    """)
-                    
-                    await db_session.execute(
-                        query,
-                        {
-                            "session_id": session_id,
-                            "file_path": file_path,
-                            "file_hash": file_hash,
-                            "analysis_status": "pending"
-                        }
-                    )
+                await db_session.commit()
+                
+        except Exception as e:
+            logger.error(f"Failed to store file hashes: {e}")
+    
+    async def _analysis_fingerprint(self) -> Optional[str]:
+        """Hash of the standards, models and prompt an analysis depends on, or None if the standards cannot be read."""
+        try:
+            async with vector_db_manager.session_factory() as db_session:
+                standards_digest = (await db_session.execute(_STANDARDS_DIGEST_QUERY)).scalar()
+        except Exception as e:
+            logger.error(f"Failed to compute analysis fingerprint: {e}")
+            return None
+        
+        llm_settings = self.settings.llm
+        vector_settings = self.settings.vector_db
+        return hash_bytes(json.dumps([
+            standards_digest,
+            vector_db_manager.embedding_model_key,
+            vector_settings.similarity_threshold,
+            vector_settings.max_similar_rules,
+            vector_settings.rerank_model,
+            llm_settings.default_provider,
+            llm_settings.default_model,
+            llm_settings.light_model,
+            llm_settings.light_model_max_complexity,
+            llm_settings.light_model_max_elements,
+            llm_settings.temperature,
+            ANALYSIS_PROMPT_PREFIX
+        ]).encode())
+    
+    async def _reuse_prior_analyses(
+        self,
+        session: AnalysisSession,
+        file_paths: List[str],
+        fingerprint: str
+    ) -> Dict[str, WorkerResult]:
+        """Carry over completed analyses of files whose content hash was already analyzed with the same fingerprint."""
+        try:
+            hashes = await asyncio.to_thread(fingerprint_cache.hash_files, file_paths)
+            if not hashes:
+                return {}
+            
+            async with vector_db_manager.session_factory() as db_session:
+                prior_result = await db_session.execute(
+                    _SELECT_PRIOR_ANALYSES_QUERY,
+                    {"file_hashes": list(set(hashes.values())), "fingerprint": fingerprint}
+                )
+                prior = {row.file_hash: row for row in prior_result}
+                matched = [
+                    (file_path, file_hash, prior[file_hash])
+                    for file_path, file_hash in hashes.items()
+                    if file_hash in prior
+                ]
+                if not matched:
+                    return {}
+                
+                await db_session.execute(
+                    _COPY_PRIOR_ANALYSES_QUERY,
+                    {
+                        "session_id": session.id,
+                        "file_paths": [file_path for file_path, _, _ in matched],
+                        "file_hashes": [file_hash for _, file_hash, _ in matched],
+                        "prior_ids": [row.id for _, _, row in matched]
+                    }
+                )
                 
                 await db_session.commit()
                 
         except Exception as e:
-            logger.error(f"Failed to create file analysis records: {e}")
-            raise
+            logger.error(f"Failed to reuse prior analyses: {e}")
+            return {}
+        
+        return {
+            file_path: WorkerResult(
+                worker_id=row.worker_agent_id or "unknown",
+                file_path=file_path,
+                success=True,
+                violations=_decode_json(row.violations),
+                processing_time=0.0,
+                file_hash=file_hash
+            )
+            for file_path, file_hash, row in matched
+        }
+    
+    async def _progress_flusher(self, session: AnalysisSession, interval: float = PROGRESS_FLUSH_INTERVAL):
+        """Persist session progress every `interval` seconds, only when the counters changed."""
+        last_flushed = (session.processed_files, session.failed_files)
+        while True:
+            await asyncio.sleep(interval)
+            current = (session.processed_files, session.failed_files)
+            if current != last_flushed:
+                await self._update_session_progress(session)
+                last_flushed = current
     
     async def _update_session_progress(self, session: AnalysisSession):
         """Update session progress in database."""
         try:
             async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
-                
-                query = text("""
-                    UPDATE code_refactor.analysis_sessions 
-                    SET processed_files = :processed_files,
-                        failed_files = :failed_files,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = :session_id
-                """)
-                
                 await db_session.execute(
-                    query,
+                    _UPDATE_SESSION_PROGRESS_QUERY,
                     {
                         "processed_files": session.processed_files,
                         "failed_files": session.failed_files,
@@ -380,17 +722,8 @@ class MasterOrchestrator:
         """Update session status in database."""
         try:
             async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
-                
-                query = text("""
-                    UPDATE code_refactor.analysis_sessions 
-                    SET status = :status,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = :session_id
-                """)
-                
                 await db_session.execute(
-                    query,
+                    _UPDATE_SESSION_STATUS_QUERY,
                     {"status": status, "session_id": session.id}
                 )
                 
@@ -409,21 +742,13 @@ class MasterOrchestrator:
         """Store git operation in database."""
         try:
             async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
-                
-                query = text("""
-                    INSERT INTO code_refactor.git_operations 
-                    (session_id, operation_type, metadata, status)
-                    VALUES (:session_id, :operation_type, :metadata, :status)
-                """)
-                
-                metadata = {
+                metadata = json.dumps({
                     "repo_url": repo_url,
                     "branch": branch
-                }
+                })
                 
                 await db_session.execute(
-                    query,
+                    _INSERT_GIT_OPERATION_QUERY,
                     {
                         "session_id": session_id,
                         "operation_type": operation_type,
@@ -441,16 +766,9 @@ class MasterOrchestrator:
         """Get analysis session results."""
         try:
             async with vector_db_manager.session_factory() as db_session:
-                from sqlalchemy import text
-                
                 # Get session info
-                session_query = text("""
-                    SELECT * FROM code_refactor.analysis_sessions 
-                    WHERE id = :session_id
-                """)
-                
                 session_result = await db_session.execute(
-                    session_query,
+                    _SELECT_SESSION_QUERY,
                     {"session_id": session_id}
                 )
                 
@@ -459,17 +777,8 @@ class MasterOrchestrator:
                     return None
                 
                 # Get file analysis results
-                files_query = text("""
-                    SELECT fa.*, COUNT(cv.id) as violation_count
-                    FROM code_refactor.file_analysis fa
-                    LEFT JOIN code_refactor.code_violations cv ON fa.id = cv.file_analysis_id
-                    WHERE fa.session_id = :session_id
-                    GROUP BY fa.id
-                    ORDER BY fa.created_at
-                """)
-                
                 files_result = await db_session.execute(
-                    files_query,
+                    _SELECT_SESSION_FILES_QUERY,
                     {"session_id": session_id}
                 )
                 
@@ -480,9 +789,10 @@ class MasterOrchestrator:
                         worker_id=file_row.worker_agent_id or "unknown",
                         file_path=file_row.file_path,
                         success=file_row.analysis_status == "completed",
-                        violations=[],  # Simplified for now
+                        violations=_decode_json(file_row.violations),
                         processing_time=0.0,  # Would need to calculate
-                        error_message=file_row.error_message
+                        error_message=file_row.error_message,
+                        file_hash=file_row.file_hash
                     )
                     worker_results.append(result)
                 
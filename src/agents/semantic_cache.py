@@ -0,0 +1,113 @@
+"""
+Semantic cache of LLM responses keyed by prompt embedding similarity.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..analysis.rag_system import CODE_SECTION_HEADER, RULES_SECTION_HEADER
+from ..database.vector_db_manager import vector_db_manager
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Random hyperplanes per LSH signature
+LSH_PLANES = 16
+
+# Entries per scope above which lookups only scan the prompt's LSH bucket
+LSH_MIN_ENTRIES = 10_000
+
+
+class SemanticPromptCache:
+    """In-memory cache returning a stored LLM response for any prompt whose embedding is close enough."""
+    
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else settings.llm.semantic_cache_threshold
+        self._vectors: Dict[str, List[np.ndarray]] = {}
+        self._responses: Dict[str, List[str]] = {}
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[str, int], List[int]] = {}
+        self._planes: Optional[np.ndarray] = None
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _cache_text(prompt: str) -> str:
+        """The per-file part of an analysis prompt, code before rules.
+        
+        The embedding model truncates long input, so the instructions every prompt shares are
+        dropped and the code section goes first; otherwise all prompts embed almost identically.
+        """
+        rules_start = prompt.find(RULES_SECTION_HEADER)
+        code_start = prompt.find(CODE_SECTION_HEADER)
+        if rules_start < 0 or code_start < rules_start:
+            return prompt
+        return prompt[code_start:] + "\n" + prompt[rules_start:code_start]
+    
+    def _embed(self, prompt: str) -> np.ndarray:
+        """Prompt embedding; generate_embedding returns unit-length vectors, so cosine similarity is a dot product."""
+        return np.asarray(vector_db_manager.generate_embedding(self._cache_text(prompt)), dtype=np.float32)
+    
+    def _signature(self, vector: np.ndarray) -> int:
+        """Random-projection LSH bucket of a vector."""
+        if self._planes is None:
+            self._planes = np.random.default_rng(0).standard_normal((LSH_PLANES, vector.shape[0])).astype(np.float32)
+        bits = (self._planes @ vector) > 0
+        return int.from_bytes(np.packbits(bits).tobytes(), "little")
+    
+    def _best_match(self, scope: str, vector: np.ndarray) -> Optional[str]:
+        vectors = self._vectors.get(scope)
+        if not vectors:
+            return None
+        
+        if len(vectors) > LSH_MIN_ENTRIES:
+            candidates = self._buckets.get((scope, self._signature(vector)), [])
+            if not candidates:
+                return None
+            similarities = np.stack([vectors[i] for i in candidates]) @ vector
+            best = int(np.argmax(similarities))
+            index = candidates[best]
+        else:
+            if scope not in self._matrices:
+                self._matrices[scope] = np.stack(vectors)
+            similarities = self._matrices[scope] @ vector
+            best = index = int(np.argmax(similarities))
+        
+        if similarities[best] >= self.threshold:
+            return self._responses[scope][index]
+        return None
+    
+    async def lookup(self, scope: str, prompt: str) -> Tuple[Optional[str], np.ndarray]:
+        """Return (cached response or None, prompt embedding) for a prompt within a scope."""
+        vector = await asyncio.to_thread(self._embed, prompt)
+        response = self._best_match(scope, vector)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response, vector
+    
+    def store(self, scope: str, vector: np.ndarray, response: str):
+        """Remember the response for a prompt embedding returned by lookup()."""
+        vectors = self._vectors.setdefault(scope, [])
+        self._buckets.setdefault((scope, self._signature(vector)), []).append(len(vectors))
+        vectors.append(vector)
+        self._responses.setdefault(scope, []).append(response)
+        self._matrices.pop(scope, None)
+    
+    def clear_session(self, session_id: str):
+        """Forget every response cached for an analysis session (scopes are "<session_id>:<model>")."""
+        prefix = f"{session_id}:"
+        for scope in [scope for scope in self._vectors if scope.startswith(prefix)]:
+            del self._vectors[scope]
+            self._responses.pop(scope, None)
+            self._matrices.pop(scope, None)
+        for key in [key for key in self._buckets if key[0].startswith(prefix)]:
+            del self._buckets[key]
+
+
+# Global semantic prompt cache instance
+semantic_prompt_cache = SemanticPromptCache()
@@ -1,40 +1,79 @@
 """
-Worker agents for parallel code analysis using LangGraph and LangChain.
+Worker agents for parallel code analysis using LangChain.
 """
 
 import asyncio
 import logging
 import json
+import re
+import time
 import uuid
-from typing import Dict, List, Any, Optional, TypedDict
-from datetime import datetime
-from dataclasses import dataclass, asdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
 
+import httpx
+import openai
 from langchain.llms.base import BaseLLM
 from langchain_openai import ChatOpenAI
 from langchain_community.llms import Anthropic
-from langgraph.graph import StateGraph, END
-# from langgraph.checkpoint.sqlite import SqliteSaver  # Not available in langgraph 0.6.5
+from sqlalchemy import text
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 from ..analysis.code_parser import CodeAnalysis, code_parser
+from ..analysis.prompt_compressor import prompt_compressor
 from ..analysis.rag_system import RAGContext, rag_system
+from .llm_coalescer import llm_coalescer
+from .llm_resilience import llm_circuit_breaker
+from .semantic_cache import semantic_prompt_cache
 from ..database.vector_db_manager import vector_db_manager
 from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+_UPDATE_FILE_STATUS_BY_PATH_QUERY = text("""
+    UPDATE code_refactor.file_analysis 
+    SET analysis_status = :status,
+        violations_found = :violations_count,
+        error_message = :error_message,
+        analysis_metadata = CAST(:analysis_metadata AS JSONB),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE session_id = :session_id AND file_path = :file_path
+    RETURNING id
+""")
 
-class WorkerState(TypedDict):
-    """State for worker agent."""
-    worker_id: str
-    file_path: str
-    analysis_status: str
-    code_analysis: Optional[Dict[str, Any]]
-    rag_context: Optional[Dict[str, Any]]
-    llm_response: Optional[str]
-    violations: Optional[List[Dict[str, Any]]]
-    error_message: Optional[str]
-    processing_time: Optional[float]
+_UPDATE_FILE_STATUS_BY_ID_QUERY = text("""
+    UPDATE code_refactor.file_analysis 
+    SET analysis_status = :status,
+        violations_found = :violations_count,
+        error_message = :error_message,
+        analysis_metadata = CAST(:analysis_metadata AS JSONB),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = :file_analysis_id
+""")
+
+_INSERT_VIOLATIONS_QUERY = text("""
+    INSERT INTO code_refactor.code_violations 
+    (file_analysis_id, rule_id, line_number, column_number, 
+     violation_description, severity, suggested_fix, confidence_score)
+    SELECT fa.id, v.rule_id, v.line_number, v.column_number,
+           v.violation_description, v.severity, v.suggested_fix, v.confidence_score
+    FROM code_refactor.file_analysis fa
+    CROSS JOIN unnest(
+        CAST(:rule_ids AS TEXT[]), CAST(:line_numbers AS INTEGER[]), CAST(:column_numbers AS INTEGER[]),
+        CAST(:descriptions AS TEXT[]), CAST(:severities AS TEXT[]), CAST(:suggested_fixes AS TEXT[]),
+        CAST(:confidence_scores AS FLOAT8[])
+    ) AS v(rule_id, line_number, column_number, violation_description, severity, suggested_fix, confidence_score)
+    WHERE fa.session_id = :session_id AND fa.file_path = :file_path
+""")
+
+# Bullet lines of a non-JSON response, with an optional trailing "(severity)"
+_BULLET_RE = re.compile(r'^[ \t]*[-*][ \t]+(.+?)(?:[ \t]*\((high|medium|low)\))?[ \t\r]*$', re.MULTILINE)
 
 
 @dataclass
@@ -46,330 +85,343 @@ class WorkerResult:
     violations: List[Dict[str, Any]]
     processing_time: float
     error_message: Optional[str] = None
+    file_hash: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
-        return asdict(self)
+        """Convert to dictionary; violations are shared with the result, not copied."""
+        # Built field by field: asdict() would deep-copy the whole violations list
+        return {
+            'worker_id': self.worker_id,
+            'file_path': self.file_path,
+            'success': self.success,
+            'violations': self.violations,
+            'processing_time': self.processing_time,
+            'error_message': self.error_message,
+            'file_hash': self.file_hash
+        }
+
+
+@lru_cache(maxsize=None)
+def _get_shared_llm(provider: str, model: str, temperature: float) -> BaseLLM:
+    """Create one LLM client per (provider, model, temperature), shared by every worker agent."""
+    llm_settings = settings.llm
+    
+    if provider == "openai":
+        if not llm_settings.openai_api_key:
+            raise ValueError("OpenAI API key not provided")
+        
+        # Workers share one keep-alive connection pool instead of one per client; retries are
+        # left to llm_circuit_breaker so they are not multiplied by the client's own
+        async_client = openai.AsyncOpenAI(
+            api_key=llm_settings.openai_api_key,
+            timeout=llm_settings.timeout,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=llm_settings.max_connections,
+                    max_keepalive_connections=llm_settings.max_keepalive_connections
+                ),
+                timeout=llm_settings.timeout
+            )
+        ).chat.completions
+        
+        return ChatOpenAI(
+            openai_api_key=llm_settings.openai_api_key,
+            model_name=model,
+            temperature=temperature,
+            max_tokens=llm_settings.max_tokens,
+            timeout=llm_settings.timeout,
+            async_client=async_client
+        )
+        
+    elif provider == "anthropic":
+        if not llm_settings.anthropic_api_key:
+            raise ValueError("Anthropic API key not provided")
+        
+        return Anthropic(
+            anthropic_api_key=llm_settings.anthropic_api_key,
+            model=model,
+            temperature=temperature,
+            max_tokens_to_sample=llm_settings.max_tokens,
+            timeout=llm_settings.timeout,
+            max_retries=0
+        )
+        
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def _response_text(response: Any) -> str:
+    """Extract text from a chat message, a plain string or any other LLM response."""
+    if hasattr(response, 'content'):
+        return response.content
+    elif isinstance(response, str):
+        return response
+    return str(response)
+
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Return the first brace-balanced object in text, skipping braces inside string literals."""
+    start = text.find('{')
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    return None
+
+
+class ViolationStreamScanner:
+    """Counts violation objects in a streamed JSON response as soon as each one closes."""
+    
+    def __init__(self):
+        self.completed = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, text: str) -> int:
+        """Consume a chunk and return how many violation objects it completed."""
+        before = self.completed
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._stack:
+                    self._in_string = True
+            elif char in '{[':
+                self._stack.append(char)
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                # Objects directly inside the root object's array are violations
+                if char == '}' and self._stack == ['{', '[']:
+                    self.completed += 1
+        return self.completed - before
 
 
 class WorkerAgent:
     """Individual worker agent for analyzing a single file."""
     
-    def __init__(self, worker_id: str, session_id: str):
+    def __init__(
+        self,
+        worker_id: str,
+        session_id: str,
+        shared_analyses: Optional[Dict[str, asyncio.Future]] = None,
+        analysis_fingerprint: Optional[str] = None
+    ):
         self.worker_id = worker_id
         self.session_id = session_id
+        # Content hash -> (violations, analysis metadata) of whichever worker analyzed that content first
+        self.shared_analyses = shared_analyses
+        # Recorded with LLM results so later sessions only reuse analyses made with the same
+        # standards, models and prompt; rule-based fallback results are never recorded
+        self.analysis_fingerprint = analysis_fingerprint
         self.llm = None
-        self.graph = None
-        self.checkpointer = None
+        self.light_llm = None
+        self._file_analysis_ids: Dict[str, Any] = {}
+        self._current_session = None
         
     async def initialize(self):
         """Initialize the worker agent."""
         try:
-            print(f"🤖 Worker {self.worker_id}: Initializing...")
+            logger.debug("Worker %s: Initializing...", self.worker_id)
             
             # Initialize LLM
-            self.llm = self._create_llm()
-            
-            # Initialize checkpointer for state persistence
-            # self.checkpointer = SqliteSaver.from_conn_string(":memory:")  # Not available in langgraph 0.6.5
-            self.checkpointer = None
-            
-            # Create the workflow graph
-            self.graph = self._create_workflow()
+            llm_settings = settings.llm
+            self.llm = _get_shared_llm(
+                llm_settings.default_provider,
+                llm_settings.default_model,
+                llm_settings.temperature
+            )
+            if llm_settings.light_model:
+                self.light_llm = _get_shared_llm(
+                    llm_settings.default_provider,
+                    llm_settings.light_model,
+                    llm_settings.temperature
+                )
             
-            print(f"✅ Worker {self.worker_id}: Initialized successfully")
+            logger.debug("Worker %s: Initialized successfully", self.worker_id)
             
         except Exception as e:
             logger.error(f"Worker {self.worker_id}: Failed to initialize: {e}")
             raise
     
-    def _create_llm(self) -> BaseLLM:
-        """Create LLM instance based on configuration."""
+    def _llm_for(self, code_analysis: CodeAnalysis) -> BaseLLM:
+        """Pick the light model for simple files when one is configured, else the default model."""
         llm_settings = settings.llm
-        
-        if llm_settings.default_provider == "openai":
-            if not llm_settings.openai_api_key:
-                raise ValueError("OpenAI API key not provided")
-            
-            return ChatOpenAI(
-                openai_api_key=llm_settings.openai_api_key,
-                model_name=llm_settings.default_model,
-                temperature=llm_settings.temperature,
-                max_tokens=llm_settings.max_tokens,
-                timeout=llm_settings.timeout
-            )
-            
-        elif llm_settings.default_provider == "anthropic":
-            if not llm_settings.anthropic_api_key:
-                raise ValueError("Anthropic API key not provided")
-            
-            return Anthropic(
-                anthropic_api_key=llm_settings.anthropic_api_key,
-                model=llm_settings.default_model,
-                temperature=llm_settings.temperature,
-                max_tokens_to_sample=llm_settings.max_tokens,
-                timeout=llm_settings.timeout
-            )
-            
-        else:
-            raise ValueError(f"Unsupported LLM provider: {llm_settings.default_provider}")
+        if (
+            self.light_llm is not None
+            and code_analysis.complexity_score <= llm_settings.light_model_max_complexity
+            and len(code_analysis.elements) <= llm_settings.light_model_max_elements
+        ):
+            return self.light_llm
+        return self.llm
     
-    def _create_workflow(self) -> StateGraph:
-        """Create the workflow graph for code analysis."""
-        workflow = StateGraph(WorkerState)
-        
-        # Add nodes
-        workflow.add_node("parse_code", self._parse_code_node)
-        workflow.add_node("generate_context", self._generate_context_node)
-        workflow.add_node("analyze_with_llm", self._analyze_with_llm_node)
-        workflow.add_node("process_results", self._process_results_node)
-        workflow.add_node("handle_error", self._handle_error_node)
-        
-        # Set entry point
-        workflow.set_entry_point("parse_code")
-        
-        # Add edges
-        workflow.add_edge("parse_code", "generate_context")
-        workflow.add_edge("generate_context", "analyze_with_llm")
-        workflow.add_edge("analyze_with_llm", "process_results")
-        workflow.add_edge("process_results", END)
-        workflow.add_edge("handle_error", END)
-        
-        # Add conditional edges for error handling
-        workflow.add_conditional_edges(
-            "parse_code",
-            lambda state: "generate_context" if state.get("error_message") is None else "handle_error"
-        )
+    async def _analyze_prompt(self, code_analysis: CodeAnalysis, prompt: str) -> str:
+        """Run the analysis prompt on the model suited to the file, escalating unparseable light-model output."""
+        llm = self._llm_for(code_analysis)
+        llm_response_text = await self._invoke_llm(prompt, llm)
         
-        workflow.add_conditional_edges(
-            "generate_context",
-            lambda state: "analyze_with_llm" if state.get("error_message") is None else "handle_error"
-        )
+        if llm is not self.llm and llm_response_text.strip() and _extract_json_object(llm_response_text) is None:
+            logger.debug("Worker %s: Light model output unparseable, retrying with default model", self.worker_id)
+            llm_response_text = await self._invoke_llm(prompt, self.llm)
         
-        workflow.add_conditional_edges(
-            "analyze_with_llm",
-            lambda state: "process_results" if state.get("error_message") is None else "handle_error"
-        )
-        
-        return workflow.compile(checkpointer=self.checkpointer)
+        return llm_response_text
     
-    async def _parse_code_node(self, state: WorkerState) -> WorkerState:
-        """Parse the code file using AST."""
-        try:
-            print(f"🔍 Worker {self.worker_id}: Parsing code file: {state['file_path']}")
-            
-            # Update status in database
-            await self._update_file_status("analyzing")
-            
-            # Parse the file
-            code_analysis = code_parser.parse_file(state["file_path"])
-            
-            # Store analysis in state
-            state["code_analysis"] = code_analysis.to_dict()
-            state["analysis_status"] = "parsed"
-            
-            print(f"✅ Worker {self.worker_id}: Code parsed successfully - {len(code_analysis.elements)} elements found")
-            
-        except Exception as e:
-            error_msg = f"Failed to parse code: {str(e)}"
-            print(f"❌ Worker {self.worker_id}: {error_msg}")
-            state["error_message"] = error_msg
-            state["analysis_status"] = "parse_failed"
-        
-        return state
-    
-    async def _generate_context_node(self, state: WorkerState) -> WorkerState:
-        """Generate RAG context for analysis."""
-        try:
-            print(f"🧠 Worker {self.worker_id}: Generating RAG context...")
-            
-            # Convert dict back to CodeAnalysis object
-            code_analysis_dict = state["code_analysis"]
-            code_analysis = self._dict_to_code_analysis(code_analysis_dict)
-            
-            # Generate RAG context
-            rag_context = await rag_system.generate_analysis_context(code_analysis)
-            
-            # Store context in state
-            state["rag_context"] = rag_context.to_dict()
-            state["analysis_status"] = "context_generated"
-            
-            print(f"✅ Worker {self.worker_id}: RAG context generated with {len(rag_context.relevant_rules)} relevant rules")
-            
-        except Exception as e:
-            error_msg = f"Failed to generate context: {str(e)}"
-            print(f"❌ Worker {self.worker_id}: {error_msg}")
-            state["error_message"] = error_msg
-            state["analysis_status"] = "context_failed"
+    async def _invoke_llm(self, prompt: str, llm: Optional[BaseLLM] = None) -> str:
+        """Call the LLM, answering from the semantic cache when a near-identical prompt was seen this session."""
+        llm = llm or self.llm
+        cache_enabled = settings.llm.semantic_cache_enabled
+        if cache_enabled:
+            # Responses are cached per model so an escalated retry never gets the light model's answer
+            cache_scope = f"{self.session_id}:{getattr(llm, 'model_name', None) or getattr(llm, 'model', '')}"
+            cached, prompt_vector = await semantic_prompt_cache.lookup(cache_scope, prompt)
+            if cached is not None:
+                logger.debug("Worker %s: Semantic cache hit", self.worker_id)
+                return cached
         
-        return state
-    
-    async def _analyze_with_llm_node(self, state: WorkerState) -> WorkerState:
-        """Analyze code using LLM."""
-        try:
-            print(f"🤖 Worker {self.worker_id}: Analyzing with LLM...")
-            
-            # Get the analysis prompt
-            rag_context_dict = state["rag_context"]
-            analysis_prompt = rag_context_dict["analysis_prompt"]
-            
-            # Call LLM
-            response = await self.llm.agenerate([analysis_prompt])
-            llm_response = response.generations[0][0].text
-            
-            # Store response in state
-            state["llm_response"] = llm_response
-            state["analysis_status"] = "llm_analyzed"
-            
-            print(f"✅ Worker {self.worker_id}: LLM analysis completed")
-            
-        except Exception as e:
-            error_msg = f"Failed LLM analysis: {str(e)}"
-            print(f"❌ Worker {self.worker_id}: {error_msg}")
-            state["error_message"] = error_msg
-            state["analysis_status"] = "llm_failed"
+        # Transient errors are retried here; while the circuit is open this raises at once
+        if settings.llm.stream_responses:
+            llm_response_text = await llm_circuit_breaker.call(lambda: self._stream_llm(prompt, llm))
+        else:
+            llm_response_text = _response_text(
+                await llm_circuit_breaker.call(lambda: llm_coalescer.submit((llm, prompt)))
+            )
         
-        return state
-    
-    async def _process_results_node(self, state: WorkerState) -> WorkerState:
-        """Process LLM response and extract violations."""
-        try:
-            print(f"📊 Worker {self.worker_id}: Processing results...")
-            
-            # Parse LLM response
-            llm_response = state["llm_response"]
-            violations = self._parse_llm_response(llm_response)
-            
-            # Store violations in state
-            state["violations"] = violations
-            state["analysis_status"] = "completed"
-            
-            # Update database with results
-            await self._store_violations(violations, state["file_path"])
-            await self._update_file_status("completed", len(violations))
-            
-            print(f"✅ Worker {self.worker_id}: Found {len(violations)} violations")
-            
-        except Exception as e:
-            error_msg = f"Failed to process results: {str(e)}"
-            print(f"❌ Worker {self.worker_id}: {error_msg}")
-            state["error_message"] = error_msg
-            state["analysis_status"] = "processing_failed"
+        if cache_enabled:
+            semantic_prompt_cache.store(cache_scope, prompt_vector, llm_response_text)
         
-        return state
+        return llm_response_text
     
-    async def _handle_error_node(self, state: WorkerState) -> WorkerState:
-        """Handle errors in processing."""
-        try:
-            error_message = state.get("error_message", "Unknown error")
-            print(f"❌ Worker {self.worker_id}: Handling error: {error_message}")
-            
-            # Update database with error status
-            await self._update_file_status("failed", 0, error_message)
-            
-            # Set empty violations
-            state["violations"] = []
-            
-        except Exception as e:
-            logger.error(f"Worker {self.worker_id}: Error in error handler: {e}")
+    async def _stream_llm(self, prompt: str, llm: BaseLLM) -> str:
+        """Stream the LLM response, reporting each violation object as soon as it is complete."""
+        scanner = ViolationStreamScanner()
+        parts = []
+        async for chunk in llm.astream(prompt):
+            text = _response_text(chunk)
+            parts.append(text)
+            if scanner.feed(text):
+                logger.debug("Worker %s: %d violations received so far", self.worker_id, scanner.completed)
         
-        return state
+        return "".join(parts)
     
     def _parse_llm_response(self, response: str) -> List[Dict[str, Any]]:
         """Parse LLM response to extract violations."""
         try:
-            # Try to extract JSON from response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                parsed_response = json.loads(json_str)
+            # Try to extract the first balanced JSON object, ignoring any prose around it
+            json_str = _extract_json_object(response)
+            if json_str is not None:
+                try:
+                    parsed_response = orjson.loads(json_str) if orjson is not None else json.loads(json_str)
+                except ValueError:
+                    parsed_response = None
                 
-                if "violations" in parsed_response:
+                if isinstance(parsed_response, dict) and "violations" in parsed_response:
                     return parsed_response["violations"]
             
             # If JSON parsing fails, try to extract violations manually
-            violations = []
-            lines = response.split('\n')
-            
-            current_violation = {}
-            for line in lines:
-                line = line.strip()
-                if line.startswith('- ') or line.startswith('* '):
-                    if current_violation:
-                        violations.append(current_violation)
-                    current_violation = {
-                        "rule_id": "manual_extract",
-                        "violation_description": line[2:],
-                        "severity": "medium",
-                        "confidence_score": 0.7
-                    }
-            
-            if current_violation:
-                violations.append(current_violation)
-            
-            return violations
+            return [
+                {
+                    "rule_id": "manual_extract",
+                    "violation_description": match.group(1),
+                    "severity": match.group(2) or "medium",
+                    "confidence_score": 0.7
+                }
+                for match in _BULLET_RE.finditer(response)
+            ]
             
         except Exception as e:
             logger.warning(f"Failed to parse LLM response: {e}")
             return []
     
-    def _dict_to_code_analysis(self, analysis_dict: Dict[str, Any]) -> CodeAnalysis:
-        """Convert dictionary back to CodeAnalysis object."""
-        from ..analysis.code_parser import CodeAnalysis, CodeElement
+    @asynccontextmanager
+    async def _db_txn(self):
+        """Yield the ambient session, or open one that commits on exit and rolls back on error."""
+        if self._current_session is not None:
+            yield self._current_session
+            return
         
-        elements = []
-        for elem_dict in analysis_dict.get("elements", []):
-            element = CodeElement(**elem_dict)
-            elements.append(element)
-        
-        return CodeAnalysis(
-            file_path=analysis_dict["file_path"],
-            file_hash=analysis_dict["file_hash"],
-            total_lines=analysis_dict["total_lines"],
-            code_lines=analysis_dict["code_lines"],
-            comment_lines=analysis_dict["comment_lines"],
-            blank_lines=analysis_dict["blank_lines"],
-            elements=elements,
-            imports=analysis_dict["imports"],
-            syntax_errors=analysis_dict["syntax_errors"],
-            complexity_score=analysis_dict["complexity_score"]
-        )
+        async with vector_db_manager.session_factory() as session:
+            self._current_session = session
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                self._current_session = None
     
-    async def _update_file_status(self, status: str, violations_count: int = 0, error_message: str = None):
-        """Update file analysis status in database."""
+    async def _update_file_status(
+        self,
+        file_path: str,
+        status: str,
+        violations_count: int = 0,
+        error_message: str = None,
+        analysis_metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Update file analysis status in database; errors propagate inside an enclosing _db_txn."""
+        ambient = self._current_session is not None
         try:
-            async with vector_db_manager.session_factory() as session:
-                from sqlalchemy import text
-                
-                query = text("""
-                    UPDATE code_refactor.file_analysis 
-                    SET analysis_status = :status,
-                        violations_found = :violations_count,
-                        error_message = :error_message,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE session_id = :session_id AND file_path = :file_path
-                """)
-                
-                await session.execute(
-                    query,
-                    {
-                        "status": status,
-                        "violations_count": violations_count,
-                        "error_message": error_message,
-                        "session_id": self.session_id,
-                        "file_path": None  # Will be set when processing
-                    }
-                )
-                
-                await session.commit()
+            params = {
+                "status": status,
+                "violations_count": violations_count,
+                "error_message": error_message,
+                "analysis_metadata": json.dumps(analysis_metadata) if analysis_metadata is not None else None
+            }
+            
+            async with self._db_txn() as session:
+                # The row id is resolved on the first update and reused for the rest of the file
+                file_analysis_id = self._file_analysis_ids.get(file_path)
+                if file_analysis_id is None:
+                    result = await session.execute(
+                        _UPDATE_FILE_STATUS_BY_PATH_QUERY,
+                        {**params, "session_id": self.session_id, "file_path": file_path}
+                    )
+                    file_analysis_id = result.scalar()
+                    if file_analysis_id is not None:
+                        self._file_analysis_ids[file_path] = file_analysis_id
+                else:
+                    await session.execute(
+                        _UPDATE_FILE_STATUS_BY_ID_QUERY,
+                        {**params, "file_analysis_id": file_analysis_id}
+                    )
+            
+            if status in ("completed", "failed"):
+                self._file_analysis_ids.pop(file_path, None)
                 
         except Exception as e:
+            # Inside a shared transaction the caller must see the failure so everything rolls back
+            if ambient:
+                raise
             logger.error(f"Failed to update file status: {e}")
     
     async def _store_violations(self, violations: List[Dict[str, Any]], file_path: str = None):
-        """Store violations in database."""
+        """Store violations in database; errors propagate inside an enclosing _db_txn."""
+        ambient = self._current_session is not None
         try:
             if not violations:
                 return
@@ -381,122 +433,158 @@ class WorkerAgent:
                 logger.error("Cannot store violations: file_path not provided")
                 return
                 
-            async with vector_db_manager.session_factory() as session:
-                from sqlalchemy import text
-                
-                # First get the file_analysis_id
-                query = text("""
-                    SELECT id FROM code_refactor.file_analysis 
-                    WHERE session_id = :session_id AND file_path = :file_path
-                """)
-                
-                result = await session.execute(
-                    query,
-                    {"session_id": self.session_id, "file_path": file_path}
+            async with self._db_txn() as session:
+                # One statement resolves the file_analysis row and inserts every violation
+                await session.execute(
+                    _INSERT_VIOLATIONS_QUERY,
+                    {
+                        "session_id": self.session_id,
+                        "file_path": file_path,
+                        "rule_ids": [violation.get("rule_id", "unknown") for violation in violations],
+                        "line_numbers": [violation.get("line_number") for violation in violations],
+                        "column_numbers": [violation.get("column_number") for violation in violations],
+                        "descriptions": [violation.get("violation_description", "") for violation in violations],
+                        "severities": [violation.get("severity", "medium") for violation in violations],
+                        "suggested_fixes": [violation.get("suggested_fix") for violation in violations],
+                        "confidence_scores": [violation.get("confidence_score", 0.0) for violation in violations]
+                    }
                 )
                 
-                file_analysis_id = result.scalar()
-                
-                if not file_analysis_id:
-                    return
-                
-                # Insert violations
-                for violation in violations:
-                    insert_query = text("""
-                        INSERT INTO code_refactor.code_violations 
-                        (file_analysis_id, rule_id, line_number, column_number, 
-                         violation_description, severity, suggested_fix, confidence_score)
-                        VALUES (:file_analysis_id, :rule_id, :line_number, :column_number,
-                                :violation_description, :severity, :suggested_fix, :confidence_score)
-                    """)
-                    
-                    await session.execute(
-                        insert_query,
-                        {
-                            "file_analysis_id": file_analysis_id,
-                            "rule_id": violation.get("rule_id", "unknown"),
-                            "line_number": violation.get("line_number"),
-                            "column_number": violation.get("column_number"),
-                            "violation_description": violation.get("violation_description", ""),
-                            "severity": violation.get("severity", "medium"),
-                            "suggested_fix": violation.get("suggested_fix"),
-                            "confidence_score": violation.get("confidence_score", 0.0)
-                        }
-                    )
-                
-                await session.commit()
-                
         except Exception as e:
+            if ambient:
+                raise
             logger.error(f"Failed to store violations: {e}")
     
-    async def process_file(self, file_path: str) -> WorkerResult:
-        """Process a single file using direct function calls (bypassing LangGraph)."""
-        start_time = datetime.now()
-        violations = []
-        error_message = None
+    async def _step_parse(self, file_path: str) -> CodeAnalysis:
+        """Mark the file as in progress and parse it."""
+        logger.debug("Worker %s: Parsing code file: %s", self.worker_id, file_path)
+        await self._update_file_status(file_path, "analyzing")
+        # AST parsing is CPU-bound; run it off the event loop so other workers keep making progress
+        code_analysis = await asyncio.to_thread(code_parser.parse_file, file_path)
+        logger.debug("Worker %s: Code parsed successfully - %d elements found", self.worker_id, len(code_analysis.elements))
+        return code_analysis
+    
+    async def _step_context(self, code_analysis: CodeAnalysis) -> RAGContext:
+        """Retrieve relevant rules and build the analysis prompt."""
+        logger.debug("Worker %s: Generating RAG context...", self.worker_id)
+        rag_context = await rag_system.generate_analysis_context(code_analysis)
+        logger.debug("Worker %s: RAG context generated with %d relevant rules", self.worker_id, len(rag_context.relevant_rules))
+        return rag_context
+    
+    async def _step_llm(self, code_analysis: CodeAnalysis, rag_context: RAGContext) -> List[Dict[str, Any]]:
+        """Analyze the file with the LLM and extract violations from its response."""
+        logger.debug("Worker %s: Analyzing with LLM...", self.worker_id)
+        analysis_prompt = prompt_compressor.compress(rag_context.analysis_prompt)
+        llm_response_text = await self._analyze_prompt(code_analysis, analysis_prompt)
+        logger.debug("Worker %s: LLM analysis completed", self.worker_id)
         
+        logger.debug("Worker %s: Processing results...", self.worker_id)
+        return self._parse_llm_response(llm_response_text)
+    
+    def _rule_based_violations(self, rag_context: RAGContext) -> List[Dict[str, Any]]:
+        """Fallback violations derived from the retrieved rules when the LLM is unavailable."""
+        return [
+            {
+                "rule_id": rule.rule_id,
+                "violation_description": f"Potential violation of: {rule.title}",
+                "severity": rule.severity,
+                "suggested_fix": rule.description,
+                "confidence_score": rule.similarity,
+                "line_number": None,
+                "column_number": None
+            }
+            for rule in rag_context.relevant_rules
+        ]
+    
+    async def _step_process(
+        self,
+        file_path: str,
+        violations: List[Dict[str, Any]],
+        analysis_metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Persist violations and mark the file as completed in one transaction; neither is kept if either fails."""
         try:
-            print(f"🚀 Worker {self.worker_id}: Starting analysis of {file_path}")
-            
-            # Step 1: Parse code
-            print(f"🔍 Worker {self.worker_id}: Parsing code file: {file_path}")
-            await self._update_file_status("analyzing")
-            code_analysis = code_parser.parse_file(file_path)
-            print(f"✅ Worker {self.worker_id}: Code parsed successfully - {len(code_analysis.elements)} elements found")
-            
-            # Step 2: Generate RAG context
-            print(f"🧠 Worker {self.worker_id}: Generating RAG context...")
-            rag_context = await rag_system.generate_analysis_context(code_analysis)
-            print(f"✅ Worker {self.worker_id}: RAG context generated with {len(rag_context.relevant_rules)} relevant rules")
-            
-            # Step 3: Analyze with LLM
-            print(f"🤖 Worker {self.worker_id}: Analyzing with LLM...")
-            analysis_prompt = rag_context.analysis_prompt
-            
-            # Call LLM using invoke method (more compatible)
-            try:
-                llm_response = await self.llm.ainvoke(analysis_prompt)
-                # Handle different response formats
-                if hasattr(llm_response, 'content'):
-                    llm_response_text = llm_response.content
-                elif isinstance(llm_response, str):
-                    llm_response_text = llm_response
-                else:
-                    llm_response_text = str(llm_response)
-                    
-                print(f"✅ Worker {self.worker_id}: LLM analysis completed")
-                
-                # Step 4: Parse results
-                print(f"📊 Worker {self.worker_id}: Processing results...")
-                violations = self._parse_llm_response(llm_response_text)
-                
-                # Store violations in database
-                await self._store_violations(violations, file_path)
-                await self._update_file_status("completed", len(violations))
-                
-                print(f"✅ Worker {self.worker_id}: Found {len(violations)} violations")
-                
-            except Exception as llm_error:
-                logger.warning(f"LLM analysis failed: {llm_error}. Falling back to rule-based analysis...")
-                # Fallback: use rule-based violations from RAG context
-                violations = []
-                for rule in rag_context.relevant_rules:
-                    violations.append({
-                        "rule_id": rule.rule_id,
-                        "violation_description": f"Potential violation of: {rule.title}",
-                        "severity": rule.severity,
-                        "suggested_fix": rule.description,
-                        "confidence_score": rule.similarity,
-                        "line_number": None,
-                        "column_number": None
-                    })
-                
+            async with self._db_txn():
                 await self._store_violations(violations, file_path)
-                await self._update_file_status("completed", len(violations))
-                print(f"✅ Worker {self.worker_id}: Found {len(violations)} potential violations (rule-based)")
+                await self._update_file_status(file_path, "completed", len(violations), analysis_metadata=analysis_metadata)
+        except Exception as e:
+            logger.error(f"Failed to persist results for {file_path}: {e}")
+            raise
+    
+    async def _shared_violations(self, file_hash: str) -> Optional[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Wait for the results of identical content analyzed by another worker, or claim the hash and return None."""
+        if self.shared_analyses is None:
+            return None
+        
+        future = self.shared_analyses.get(file_hash)
+        if future is None:
+            self.shared_analyses[file_hash] = asyncio.get_running_loop().create_future()
+            return None
+        return await asyncio.shield(future)
+    
+    def _publish_violations(
+        self,
+        file_hash: str,
+        shared: Optional[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]
+    ):
+        """Hand claimed content's results (None if analysis failed) to workers waiting on the same hash."""
+        if self.shared_analyses is None:
+            return
+        
+        future = self.shared_analyses.get(file_hash)
+        if future is not None and not future.done():
+            future.set_result(shared)
+    
+    async def _step_analyze(
+        self,
+        file_path: str,
+        code_analysis: CodeAnalysis
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Retrieve context, analyze with the LLM (or rules as a fallback), store and return the violations and metadata."""
+        rag_context = await self._step_context(code_analysis)
+        analysis_metadata = None
+        
+        try:
+            violations = await self._step_llm(code_analysis, rag_context)
+            logger.debug("Worker %s: Found %d violations", self.worker_id, len(violations))
+            if self.analysis_fingerprint is not None:
+                analysis_metadata = {"fingerprint": self.analysis_fingerprint}
+            
+        except Exception as llm_error:
+            logger.warning(f"LLM analysis failed: {llm_error}. Falling back to rule-based analysis...")
+            violations = self._rule_based_violations(rag_context)
+            logger.debug("Worker %s: Found %d potential violations (rule-based)", self.worker_id, len(violations))
+        
+        # A storage failure is not an LLM failure; it propagates and process_file marks the file failed
+        await self._step_process(file_path, violations, analysis_metadata)
+        return violations, analysis_metadata
+    
+    async def process_file(self, file_path: str) -> WorkerResult:
+        """Process a single file: parse, retrieve context, analyze with the LLM and store the results."""
+        start_time = time.perf_counter()
+        file_hash = None
+        
+        try:
+            logger.debug("Worker %s: Starting analysis of %s", self.worker_id, file_path)
+            
+            code_analysis = await self._step_parse(file_path)
+            file_hash = code_analysis.file_hash
+            
+            # Content another worker already analyzed in this session skips RAG and the LLM
+            shared = await self._shared_violations(file_hash)
+            if shared is not None:
+                violations, analysis_metadata = shared
+                await self._step_process(file_path, violations, analysis_metadata)
+                logger.debug("Worker %s: Reused %d violations of identical content", self.worker_id, len(violations))
+            else:
+                try:
+                    shared = await self._step_analyze(file_path, code_analysis)
+                finally:
+                    self._publish_violations(file_hash, shared)
+                violations, _ = shared
             
             # Calculate processing time
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             
             # Create result
             result = WorkerResult(
@@ -505,20 +593,21 @@ class WorkerAgent:
                 success=True,
                 violations=violations,
                 processing_time=processing_time,
-                error_message=None
+                error_message=None,
+                file_hash=file_hash
             )
             
-            print(f"✅ Worker {self.worker_id}: Completed {file_path} in {processing_time:.2f}s")
+            logger.debug("Worker %s: Completed %s in %.2fs", self.worker_id, file_path, processing_time)
             return result
             
         except Exception as e:
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             error_msg = f"Worker processing failed: {str(e)}"
             logger.error(f"Worker {self.worker_id}: {error_msg}")
             
             # Update database with error
             try:
-                await self._update_file_status("failed", 0, error_msg)
+                await self._update_file_status(file_path, "failed", 0, error_msg)
             except:
                 pass
             
@@ -528,6 +617,7 @@ class WorkerAgent:
                 success=False,
                 violations=[],
                 processing_time=processing_time,
-                error_message=error_msg
+                error_message=error_msg,
+                file_hash=file_hash
             )
 
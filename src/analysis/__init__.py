@@ -0,0 +1,3 @@
+"""
+Code parsing and RAG-based analysis.
+"""
@@ -4,16 +4,83 @@ AST-based code parser for analyzing Python files.
 
 import ast
 import logging
-import hashlib
-from typing import Dict, List, Any, Optional, Tuple
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Union
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 import inspect
 
+from tqdm import tqdm
+
+from .file_hash import hash_bytes
+from .parse_cache import ParseCache
+from ..config.settings import settings
+
 logger = logging.getLogger(__name__)
 
+# Files per process-pool task; a directory with fewer files to parse is parsed inline,
+# since starting a pool would cost more than it saves
+PARSE_CHUNK_SIZE = 16
+
+# Files at least this large are memory-mapped rather than read into a bytes object
+MMAP_MIN_SIZE = 1024 * 1024
+
+# Docstrings up to this length are shared between elements with identical text
+INTERN_DOCSTRING_MAX_LENGTH = 200
+
+# Syntax trees kept per distinct source text; small, as trees take several times the source's memory
+AST_CACHE_SIZE = 32
+
+# Only sources up to this many characters are cached; duplicated content is typically small
+# (empty __init__.py files, generated stubs) and large trees would pin far more memory
+AST_CACHE_MAX_SOURCE_LENGTH = 16 * 1024
+
+# Decision points each node type adds to its enclosing scope's cyclomatic complexity;
+# ast.BoolOp adds one per extra operand and is handled separately
+_COMPLEXITY_DELTA: Dict[type, int] = {
+    ast.If: 1, ast.For: 1, ast.While: 1, ast.With: 1, ast.ExceptHandler: 1,
+    ast.ListComp: 1, ast.DictComp: 1, ast.SetComp: 1, ast.GeneratorExp: 1
+}
+
+
+class _SourceSpan:
+    """Lines start:end of a file's shared line list, joined into text only when read."""
+    
+    __slots__ = ("lines", "start", "end")
+    
+    def __init__(self, lines: List[str], start: int, end: int):
+        self.lines = lines
+        self.start = start
+        self.end = end
+    
+    def __str__(self) -> str:
+        return '\n'.join(self.lines[self.start:self.end])
+
+
+class _LazySource:
+    """Wraps a slot so a _SourceSpan stored in it is joined into a string on first read."""
+    
+    def __init__(self, slot):
+        self.slot = slot
+    
+    def __get__(self, instance, owner=None) -> Optional[str]:
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if isinstance(value, _SourceSpan):
+            value = str(value)
+            self.slot.__set__(instance, value)
+        return value
+    
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
 
-@dataclass
+
+@dataclass(slots=True)
 class CodeElement:
     """Represents a code element found in the AST."""
     element_type: str  # function, class, import, variable, etc.
@@ -24,19 +91,34 @@ class CodeElement:
     end_column_number: Optional[int] = None
     source_code: Optional[str] = None
     docstring: Optional[str] = None
-    decorators: List[str] = None
-    arguments: List[str] = None
+    decorators: List[str] = field(default_factory=list)
+    arguments: List[str] = field(default_factory=list)
     parent: Optional[str] = None
     complexity: int = 0
     
-    def __post_init__(self):
-        if self.decorators is None:
-            self.decorators = []
-        if self.arguments is None:
-            self.arguments = []
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'element_type': self.element_type,
+            'name': self.name,
+            'line_number': self.line_number,
+            'column_number': self.column_number,
+            'end_line_number': self.end_line_number,
+            'end_column_number': self.end_column_number,
+            'source_code': self.source_code,
+            'docstring': self.docstring,
+            'decorators': self.decorators,
+            'arguments': self.arguments,
+            'parent': self.parent,
+            'complexity': self.complexity
+        }
+
 
+# Elements from ASTAnalyzer share the file's lines and only build their source text when it is read
+CodeElement.source_code = _LazySource(CodeElement.source_code)
 
-@dataclass
+
+@dataclass(slots=True)
 class CodeAnalysis:
     """Contains the complete analysis of a code file."""
     file_path: str
@@ -49,6 +131,8 @@ class CodeAnalysis:
     imports: List[str]
     syntax_errors: List[str]
     complexity_score: int
+    # Number of elements per element type, in order of first appearance
+    element_counts: Dict[str, int] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -59,7 +143,7 @@ class CodeAnalysis:
             'code_lines': self.code_lines,
             'comment_lines': self.comment_lines,
             'blank_lines': self.blank_lines,
-            'elements': [asdict(elem) for elem in self.elements],
+            'elements': [elem.to_dict() for elem in self.elements],
             'imports': self.imports,
             'syntax_errors': self.syntax_errors,
             'complexity_score': self.complexity_score
@@ -69,7 +153,10 @@ class CodeAnalysis:
 class CodeParser:
     """AST-based code parser for Python files."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ParseCache] = None, capture_locals: bool = False):
+        # Cached results only hold module- and class-level variables, so local capture bypasses the cache
+        self.cache = cache if not capture_locals else None
+        self.capture_locals = capture_locals
         self.complexity_weights = {
             'if': 1, 'elif': 1, 'else': 0,
             'for': 1, 'while': 1,
@@ -81,34 +168,68 @@ class CodeParser:
         }
     
     def parse_file(self, file_path: str) -> CodeAnalysis:
+        """Parse a Python file and return code analysis, reusing the cached result for unchanged files."""
+        cached, stat = self._cached_parse(file_path)
+        if cached is not None:
+            return cached
+        
+        analysis = self._parse_file(file_path)
+        if stat is not None:
+            self.cache.put(file_path, stat, analysis)
+        return analysis
+    
+    def _cached_parse(self, file_path: str) -> Tuple[Optional[CodeAnalysis], Optional[os.stat_result]]:
+        """Return (cached analysis or None, stat to store a fresh result under); both None without a cache."""
+        if self.cache is None:
+            return None, None
+        
+        try:
+            stat = Path(file_path).stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        cached = self.cache.get(file_path, stat)
+        if cached is not None and cached.file_path != file_path:
+            # The cache is keyed by absolute path; keep the path spelling the caller used
+            cached = replace(cached, file_path=file_path)
+        return cached, stat
+    
+    def _parse_file(self, file_path: str) -> CodeAnalysis:
         """Parse a Python file and return code analysis."""
         try:
-            print(f"🔍 Parsing file: {file_path}")
+            logger.debug("Parsing file: %s", file_path)
             
             file_path_obj = Path(file_path)
             if not file_path_obj.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            # Read file content
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            file_hash, content = _read_source(file_path)
             
-            # Calculate file hash
-            file_hash = hashlib.sha256(content.encode()).hexdigest()
+            # Apply the same newline translation text mode would
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
             
-            # Analyze line counts
+            # Analyze line counts in one pass; the same line list is reused for source extraction
             lines = content.split('\n')
             total_lines = len(lines)
-            blank_lines = sum(1 for line in lines if not line.strip())
-            comment_lines = sum(1 for line in lines if line.strip().startswith('#'))
+            blank_lines = 0
+            comment_lines = 0
+            for line in lines:
+                stripped = line.lstrip()
+                if not stripped:
+                    blank_lines += 1
+                elif stripped[0] == '#':
+                    comment_lines += 1
             code_lines = total_lines - blank_lines - comment_lines
             
             # Parse AST
             try:
-                tree = ast.parse(content, filename=file_path)
+                tree = _parse_source(content)
                 syntax_errors = []
             except SyntaxError as e:
-                print(f"❌ Syntax error in {file_path}: {e}")
+                # Trees are cached by content alone, so the path is attached to the error here
+                e.filename = file_path
+                logger.warning("Syntax error in %s: %s", file_path, e)
                 return CodeAnalysis(
                     file_path=file_path,
                     file_hash=file_hash,
@@ -123,7 +244,7 @@ class CodeParser:
                 )
             
             # Analyze AST
-            analyzer = ASTAnalyzer(content.split('\n'))
+            analyzer = ASTAnalyzer(lines, capture_locals=self.capture_locals)
             analyzer.visit(tree)
             
             analysis = CodeAnalysis(
@@ -136,10 +257,11 @@ class CodeParser:
                 elements=analyzer.elements,
                 imports=analyzer.imports,
                 syntax_errors=[],
-                complexity_score=analyzer.total_complexity
+                complexity_score=analyzer.total_complexity,
+                element_counts=dict(analyzer.element_counts)
             )
             
-            print(f"✅ Parsed {file_path}: {len(analysis.elements)} elements, complexity: {analysis.complexity_score}")
+            logger.debug("Parsed %s: %d elements, complexity: %d", file_path, len(analysis.elements), analysis.complexity_score)
             return analysis
             
         except Exception as e:
@@ -155,23 +277,62 @@ class CodeParser:
             if not directory.exists():
                 raise FileNotFoundError(f"Directory not found: {directory_path}")
             
-            # Find Python files
-            if recursive:
-                python_files = list(directory.rglob("*.py"))
-            else:
-                python_files = list(directory.glob("*.py"))
+            # Walk lazily so parsing starts with the first files found rather than after the full walk
+            python_files = directory.rglob("*.py") if recursive else directory.glob("*.py")
             
-            print(f"📄 Found {len(python_files)} Python files")
+            # Cache hits are resolved here; files that need parsing are handed to a process pool
+            # (AST parsing holds the GIL) in chunks as soon as a chunk fills up
+            analyses: List[Optional[CodeAnalysis]] = []
+            pending: List[Tuple[int, str, Optional[os.stat_result]]] = []
+            submitted = []
+            executor = None
+            # One progress line for the whole directory instead of per-file output
+            progress = tqdm(desc="Parsing", unit="file", leave=False)
+            try:
+                for file_path in map(str, python_files):
+                    try:
+                        cached, stat = self._cached_parse(file_path)
+                    except FileNotFoundError as e:
+                        logger.warning(f"Failed to parse {file_path}: {e}")
+                        continue
+                    if cached is None:
+                        pending.append((len(analyses), file_path, stat))
+                    else:
+                        progress.update()
+                    analyses.append(cached)
+                    
+                    if len(pending) >= PARSE_CHUNK_SIZE:
+                        if executor is None:
+                            executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+                        paths = [path for _, path, _ in pending]
+                        submitted.append((pending, executor.submit(_parse_files_in_worker, paths, self.capture_locals)))
+                        pending = []
+                
+                progress.write(f"📄 Found {len(analyses)} Python files")
+                
+                # The remainder is parsed here while the pool works through the submitted chunks
+                batches = []
+                if pending:
+                    batches.append((pending, _parse_files_in_worker([path for _, path, _ in pending], self.capture_locals)))
+                    progress.update(len(pending))
+                for chunk, future in submitted:
+                    batches.append((chunk, future.result()))
+                    progress.update(len(chunk))
+            finally:
+                progress.close()
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
             
-            analyses = []
-            for file_path in python_files:
-                try:
-                    analysis = self.parse_file(str(file_path))
-                    analyses.append(analysis)
-                except Exception as e:
-                    logger.warning(f"Failed to parse {file_path}: {e}")
-                    continue
+            for chunk, results in batches:
+                for (index, file_path, stat), (analysis, error) in zip(chunk, results):
+                    if analysis is None:
+                        logger.warning(f"Failed to parse {file_path}: {error}")
+                        continue
+                    analyses[index] = analysis
+                    if stat is not None:
+                        self.cache.put(file_path, stat, analysis)
             
+            analyses = [analysis for analysis in analyses if analysis is not None]
             print(f"✅ Successfully parsed {len(analyses)} files")
             return analyses
             
@@ -183,31 +344,53 @@ class CodeParser:
 class ASTAnalyzer(ast.NodeVisitor):
     """AST node visitor for extracting code elements."""
     
-    def __init__(self, source_lines: List[str]):
+    def __init__(self, source_lines: List[str], capture_locals: bool = False):
         self.source_lines = source_lines
+        # Assignments inside functions are only recorded as variables when capture_locals is set
+        self.capture_locals = capture_locals
+        self._function_depth = 0
         self.elements: List[CodeElement] = []
         self.imports: List[str] = []
+        self.element_counts: Counter = Counter()
         self.current_class: Optional[str] = None
         self.total_complexity = 0
+        # Decision points counted so far in each enclosing class or function
+        self._complexity_stack: List[int] = []
+        # One shared string per distinct decorator or short docstring text in the file
+        self._interned: Dict[str, str] = {}
         
+    def _add_element(self, element: CodeElement):
+        self.elements.append(element)
+        self.element_counts[element.element_type] += 1
+    
     def _get_source_code(self, node: ast.AST) -> str:
         """Extract source code for a node."""
+        return str(self._source_span(node))
+    
+    def _source_span(self, node: ast.AST) -> Union[_SourceSpan, str]:
+        """Reference to the lines spanned by a node, or "" when they are unknown."""
         try:
             if hasattr(node, 'lineno') and hasattr(node, 'end_lineno'):
                 start_line = node.lineno - 1
                 end_line = node.end_lineno
                 
                 if 0 <= start_line < len(self.source_lines):
-                    if end_line and end_line <= len(self.source_lines):
-                        lines = self.source_lines[start_line:end_line]
-                    else:
-                        lines = [self.source_lines[start_line]]
+                    if not (end_line and end_line <= len(self.source_lines)):
+                        end_line = start_line + 1
                     
-                    return '\n'.join(lines)
+                    return _SourceSpan(self.source_lines, start_line, end_line)
             return ""
         except:
             return ""
     
+    def _intern(self, text: str) -> str:
+        """Return the first string seen with this text, so repeats share memory."""
+        return self._interned.setdefault(text, text)
+    
+    def _get_decorators(self, node: ast.AST) -> List[str]:
+        """Extract decorator source code, sharing repeated decorators such as @staticmethod."""
+        return [self._intern(self._get_source_code(decorator)) for decorator in node.decorator_list]
+    
     def _get_docstring(self, node: ast.AST) -> Optional[str]:
         """Extract docstring from a node."""
         try:
@@ -216,32 +399,35 @@ class ASTAnalyzer(ast.NodeVisitor):
                 isinstance(node.body[0], ast.Expr) and
                 isinstance(node.body[0].value, ast.Constant) and
                 isinstance(node.body[0].value.value, str)):
-                return node.body[0].value.value
+                docstring = node.body[0].value.value
+                if len(docstring) <= INTERN_DOCSTRING_MAX_LENGTH:
+                    docstring = self._intern(docstring)
+                return docstring
         except:
             pass
         return None
     
-    def _calculate_complexity(self, node: ast.AST) -> int:
-        """Calculate cyclomatic complexity for a node."""
-        complexity = 1  # Base complexity
+    def _visit_scope(self, node: ast.AST) -> int:
+        """Visit a class or function and return its cyclomatic complexity."""
+        self._complexity_stack.append(0)
+        self.generic_visit(node)
+        decisions = self._complexity_stack.pop()
         
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.For, ast.While, ast.With)):
-                complexity += 1
-            elif isinstance(child, ast.ExceptHandler):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
-            elif isinstance(child, ast.ListComp):
-                complexity += 1
-            elif isinstance(child, ast.DictComp):
-                complexity += 1
-            elif isinstance(child, ast.SetComp):
-                complexity += 1
-            elif isinstance(child, ast.GeneratorExp):
-                complexity += 1
+        # Decision points in a nested scope also count toward every enclosing one
+        if self._complexity_stack:
+            self._complexity_stack[-1] += decisions
         
-        return complexity
+        return 1 + decisions  # Base complexity
+    
+    def generic_visit(self, node: ast.AST):
+        """Add the node's decision points to the enclosing scope, then visit its children."""
+        if self._complexity_stack:
+            node_type = type(node)
+            if node_type is ast.BoolOp:
+                self._complexity_stack[-1] += len(node.values) - 1
+            else:
+                self._complexity_stack[-1] += _COMPLEXITY_DELTA.get(node_type, 0)
+        super().generic_visit(node)
     
     def visit_Import(self, node: ast.Import):
         """Visit import statements."""
@@ -254,9 +440,9 @@ class ASTAnalyzer(ast.NodeVisitor):
                 name=import_name,
                 line_number=node.lineno,
                 column_number=node.col_offset,
-                source_code=self._get_source_code(node)
+                source_code=self._source_span(node)
             )
-            self.elements.append(element)
+            self._add_element(element)
         
         self.generic_visit(node)
     
@@ -272,9 +458,9 @@ class ASTAnalyzer(ast.NodeVisitor):
                 name=import_name,
                 line_number=node.lineno,
                 column_number=node.col_offset,
-                source_code=self._get_source_code(node)
+                source_code=self._source_span(node)
             )
-            self.elements.append(element)
+            self._add_element(element)
         
         self.generic_visit(node)
     
@@ -284,11 +470,7 @@ class ASTAnalyzer(ast.NodeVisitor):
         self.current_class = node.name
         
         # Extract decorators
-        decorators = [self._get_source_code(decorator) for decorator in node.decorator_list]
-        
-        # Calculate complexity
-        complexity = self._calculate_complexity(node)
-        self.total_complexity += complexity
+        decorators = self._get_decorators(node)
         
         element = CodeElement(
             element_type="class",
@@ -297,15 +479,15 @@ class ASTAnalyzer(ast.NodeVisitor):
             column_number=node.col_offset,
             end_line_number=getattr(node, 'end_lineno', None),
             end_column_number=getattr(node, 'end_col_offset', None),
-            source_code=self._get_source_code(node),
+            source_code=self._source_span(node),
             docstring=self._get_docstring(node),
             decorators=decorators,
-            parent=prev_class,
-            complexity=complexity
+            parent=prev_class
         )
-        self.elements.append(element)
+        self._add_element(element)
         
-        self.generic_visit(node)
+        element.complexity = self._visit_scope(node)
+        self.total_complexity += element.complexity
         self.current_class = prev_class
     
     def visit_FunctionDef(self, node: ast.FunctionDef):
@@ -316,11 +498,7 @@ class ASTAnalyzer(ast.NodeVisitor):
             arguments.append(arg.arg)
         
         # Extract decorators
-        decorators = [self._get_source_code(decorator) for decorator in node.decorator_list]
-        
-        # Calculate complexity
-        complexity = self._calculate_complexity(node)
-        self.total_complexity += complexity
+        decorators = self._get_decorators(node)
         
         element = CodeElement(
             element_type="function",
@@ -329,16 +507,18 @@ class ASTAnalyzer(ast.NodeVisitor):
             column_number=node.col_offset,
             end_line_number=getattr(node, 'end_lineno', None),
             end_column_number=getattr(node, 'end_col_offset', None),
-            source_code=self._get_source_code(node),
+            source_code=self._source_span(node),
             docstring=self._get_docstring(node),
             decorators=decorators,
             arguments=arguments,
-            parent=self.current_class,
-            complexity=complexity
+            parent=self.current_class
         )
-        self.elements.append(element)
+        self._add_element(element)
         
-        self.generic_visit(node)
+        self._function_depth += 1
+        element.complexity = self._visit_scope(node)
+        self._function_depth -= 1
+        self.total_complexity += element.complexity
     
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
         """Visit async function definitions."""
@@ -348,11 +528,7 @@ class ASTAnalyzer(ast.NodeVisitor):
             arguments.append(arg.arg)
         
         # Extract decorators
-        decorators = [self._get_source_code(decorator) for decorator in node.decorator_list]
-        
-        # Calculate complexity
-        complexity = self._calculate_complexity(node)
-        self.total_complexity += complexity
+        decorators = self._get_decorators(node)
         
         element = CodeElement(
             element_type="async_function",
@@ -361,19 +537,25 @@ class ASTAnalyzer(ast.NodeVisitor):
             column_number=node.col_offset,
             end_line_number=getattr(node, 'end_lineno', None),
             end_column_number=getattr(node, 'end_col_offset', None),
-            source_code=self._get_source_code(node),
+            source_code=self._source_span(node),
             docstring=self._get_docstring(node),
             decorators=decorators,
             arguments=arguments,
-            parent=self.current_class,
-            complexity=complexity
+            parent=self.current_class
         )
-        self.elements.append(element)
+        self._add_element(element)
         
-        self.generic_visit(node)
+        self._function_depth += 1
+        element.complexity = self._visit_scope(node)
+        self._function_depth -= 1
+        self.total_complexity += element.complexity
     
     def visit_Assign(self, node: ast.Assign):
-        """Visit variable assignments."""
+        """Visit variable assignments at module and class level (and in functions with capture_locals)."""
+        if self._function_depth and not self.capture_locals:
+            self.generic_visit(node)
+            return
+        
         for target in node.targets:
             if isinstance(target, ast.Name):
                 element = CodeElement(
@@ -381,14 +563,55 @@ class ASTAnalyzer(ast.NodeVisitor):
                     name=target.id,
                     line_number=node.lineno,
                     column_number=node.col_offset,
-                    source_code=self._get_source_code(node),
+                    source_code=self._source_span(node),
                     parent=self.current_class
                 )
-                self.elements.append(element)
+                self._add_element(element)
         
         self.generic_visit(node)
 
 
+def _read_source(file_path: str) -> Tuple[str, str]:
+    """Return a file's content hash and UTF-8 text, reading its bytes once."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+            raw = f.read()
+            return hash_bytes(raw), raw.decode('utf-8')
+        
+        # Large files (generated models, protobuf stubs) are hashed and decoded straight from
+        # the page cache, so no full-size bytes copy sits in the heap next to the text
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hash_bytes(mapped), str(mapped, 'utf-8')
+
+
+def _parse_source(content: str) -> ast.Module:
+    """Parse source text, reusing the tree for identical small content such as empty __init__.py files."""
+    if len(content) <= AST_CACHE_MAX_SOURCE_LENGTH:
+        return _parse_cached_source(content)
+    return ast.parse(content)
+
+
+@lru_cache(maxsize=AST_CACHE_SIZE)
+def _parse_cached_source(content: str) -> ast.Module:
+    """Parse small source text; ASTAnalyzer only reads the tree, so cached trees are shared between analyses."""
+    return ast.parse(content)
+
+
+def _parse_files_in_worker(
+    file_paths: List[str],
+    capture_locals: bool = False
+) -> List[Tuple[Optional[CodeAnalysis], Optional[str]]]:
+    """Process-pool entry point: parse without the cache, returning (analysis, error) per file instead of raising."""
+    parser = CodeParser(capture_locals=capture_locals)
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((parser._parse_file(file_path), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
 # Global parser instance
-code_parser = CodeParser()
+code_parser = CodeParser(ParseCache(settings.app.parse_cache_path) if settings.app.parse_cache_path else None)
 
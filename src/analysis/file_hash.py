@@ -0,0 +1,33 @@
+"""
+Content hashing for change detection, shared by the parser and the fingerprint cache.
+"""
+
+import hashlib
+
+try:
+    from blake3 import blake3
+except ImportError:  # pragma: no cover - falls back to SHA-256 when blake3 is not installed
+    blake3 = None
+
+# Hashes only detect changed content and key caches, so the faster BLAKE3 is preferred;
+# caches record the algorithm id and drop hashes made with the other one
+HASH_ALGORITHM = "blake3" if blake3 is not None else "sha256"
+HASH_ALGORITHM_ID = 1 if blake3 is not None else 0
+
+
+def hash_bytes(data: bytes) -> str:
+    """Hex digest of data."""
+    if blake3 is not None:
+        return blake3(data).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    """Hex digest of a file's contents, equal to hash_bytes of the file's bytes."""
+    if blake3 is not None:
+        # Memory-maps the file and hashes large files on several threads
+        hasher = blake3(max_threads=blake3.AUTO)
+        hasher.update_mmap(file_path)
+        return hasher.hexdigest()
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
@@ -0,0 +1,107 @@
+"""
+Persistent file fingerprint cache keyed by path, modification time and size.
+"""
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ..config.settings import settings
+from .file_hash import HASH_ALGORITHM_ID, hash_file
+
+logger = logging.getLogger(__name__)
+
+# Paths per SQLite lookup, kept well under the bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+class FingerprintCache:
+    """SQLite-backed cache of file content hashes so unchanged files are never re-hashed."""
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.app.fingerprint_cache_path)
+        self._conn = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Hashing runs in worker threads, so the connection is not tied to one thread
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    hash TEXT NOT NULL
+                )
+            """)
+            # Hashes stored under another algorithm would never match fresh ones
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != HASH_ALGORITHM_ID:
+                with self._conn:
+                    self._conn.execute("DELETE FROM fingerprints")
+                self._conn.execute(f"PRAGMA user_version = {HASH_ALGORITHM_ID}")
+        return self._conn
+    
+    def hash_files(self, file_paths: Iterable[str]) -> Dict[str, str]:
+        """Return {path: content hash} for readable files, hashing only those whose mtime or size changed."""
+        stats = {}
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            stats[os.path.abspath(file_path)] = (file_path, stat.st_mtime_ns, stat.st_size)
+        
+        conn = self._connect()
+        keys = list(stats)
+        cached = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cached.update(
+                (path, (mtime_ns, size, file_hash))
+                for path, mtime_ns, size, file_hash in conn.execute(
+                    f"SELECT path, mtime_ns, size, hash FROM fingerprints WHERE path IN ({placeholders})",
+                    chunk
+                )
+            )
+        
+        hashes = {}
+        updates: List[tuple] = []
+        for key, (file_path, mtime_ns, size) in stats.items():
+            entry = cached.get(key)
+            if entry is not None and entry[:2] == (mtime_ns, size):
+                hashes[file_path] = entry[2]
+                continue
+            
+            try:
+                file_hash = hash_file(file_path)
+            except OSError:
+                continue
+            hashes[file_path] = file_hash
+            updates.append((key, mtime_ns, size, file_hash))
+        
+        if updates:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO fingerprints (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)",
+                    updates
+                )
+        
+        logger.debug(f"Fingerprinted {len(hashes)} files ({len(updates)} re-hashed)")
+        return hashes
+    
+    def close(self):
+        """Close the connection."""
+        try:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        except Exception as e:
+            logger.error(f"Error closing FingerprintCache: {e}")
+
+
+# Global fingerprint cache instance
+fingerprint_cache = FingerprintCache()
@@ -0,0 +1,85 @@
+"""
+Persistent cache of parsed files keyed by path, modification time and size.
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from .file_hash import HASH_ALGORITHM_ID
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the parser's output changes so results pickled by older code are ignored
+CACHE_VERSION = 5
+
+
+class ParseCache:
+    """SQLite-backed store of pickled parse results so unchanged files skip the AST walk."""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._conn = None
+        # Files are parsed in worker threads; the connection is shared, so access is serialized
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS parses (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    analysis BLOB NOT NULL
+                )
+            """)
+            # Cached results carry file hashes, which must come from the algorithm in use
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != HASH_ALGORITHM_ID:
+                with self._conn:
+                    self._conn.execute("DELETE FROM parses")
+                self._conn.execute(f"PRAGMA user_version = {HASH_ALGORITHM_ID}")
+        return self._conn
+    
+    def get(self, file_path: str, stat: os.stat_result) -> Optional[Any]:
+        """Return the cached result for a file if it has not changed since it was stored."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT analysis FROM parses WHERE path = ? AND mtime_ns = ? AND size = ? AND version = ?",
+                    (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, CACHE_VERSION)
+                ).fetchone()
+            return pickle.loads(row[0]) if row is not None else None
+        except Exception as e:
+            logger.warning(f"Parse cache lookup failed for {file_path}: {e}")
+            return None
+    
+    def put(self, file_path: str, stat: os.stat_result, analysis: Any):
+        """Store the result for a file as of the given stat."""
+        try:
+            blob = pickle.dumps(analysis, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO parses (path, mtime_ns, size, version, analysis) VALUES (?, ?, ?, ?, ?)",
+                        (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, CACHE_VERSION, blob)
+                    )
+        except Exception as e:
+            logger.warning(f"Failed to cache parse of {file_path}: {e}")
+    
+    def close(self):
+        """Close the connection."""
+        try:
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+        except Exception as e:
+            logger.error(f"Error closing ParseCache: {e}")
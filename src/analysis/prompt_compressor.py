@@ -0,0 +1,86 @@
+"""
+Lossless compression of RAG analysis prompts before they are sent to the LLM.
+"""
+
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Compressed prompts kept by content hash
+CACHE_SIZE = 1024
+
+_RULE_HEADER = re.compile(r"^\d+\. \*\*(?P<rule_id>.+?)\*\*")
+_RULE_DESCRIPTION = re.compile(r"^(?P<indent>\s*)Description: (?P<body>.+)$")
+
+
+class PromptCompressor:
+    """Strips whitespace padding and repeated rule text from analysis prompts, caching results by content hash."""
+    
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+    
+    def compress(self, prompt: str) -> str:
+        """Return the compressed prompt, reusing the cached result for identical input."""
+        key = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+        compressed = self._cache.get(key)
+        if compressed is not None:
+            self._cache.move_to_end(key)
+            return compressed
+        
+        compressed = self._compress(prompt)
+        self._cache[key] = compressed
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        
+        logger.debug(f"Compressed prompt from {len(prompt)} to {len(compressed)} characters")
+        return compressed
+    
+    def _compress(self, prompt: str) -> str:
+        lines = []
+        seen_descriptions: Dict[str, str] = {}
+        rule_id = None
+        previous_blank = True
+        in_code = False
+        
+        for line in prompt.splitlines():
+            line = line.rstrip()
+            
+            # Code excerpts are kept line for line so the model's line numbers stay correct
+            if line.startswith("```"):
+                in_code = not in_code
+            elif in_code:
+                lines.append(line)
+                continue
+            
+            # Collapse runs of blank lines (left by empty optional template fields) into one
+            if not line:
+                if not previous_blank:
+                    lines.append(line)
+                previous_blank = True
+                continue
+            previous_blank = False
+            
+            header = _RULE_HEADER.match(line.lstrip())
+            if header:
+                rule_id = header.group("rule_id")
+            
+            description = _RULE_DESCRIPTION.match(line)
+            if description and rule_id:
+                body = description.group("body")
+                if body in seen_descriptions:
+                    line = f"{description.group('indent')}Description: same as {seen_descriptions[body]}"
+                else:
+                    seen_descriptions[body] = rule_id
+            
+            lines.append(line)
+        
+        return "\n".join(lines).strip()
+
+
+# Global prompt compressor instance
+prompt_compressor = PromptCompressor()
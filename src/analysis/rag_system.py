@@ -2,7 +2,11 @@
 RAG (Retrieval-Augmented Generation) system for code analysis using cosine similarity.
 """
 
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import json
@@ -13,8 +17,131 @@ from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Cross-encoder scores kept per (query hash, rule_id)
+RERANK_CACHE_SIZE = 10_000
 
-@dataclass
+# Query strings memoized per distinct element or file shape
+QUERY_CACHE_SIZE = 4096
+
+# Headers opening the per-file sections of an analysis prompt
+RULES_SECTION_HEADER = "**RELEVANT CODING STANDARDS:**"
+CODE_SECTION_HEADER = "**CODE TO ANALYZE:**"
+
+# Instructions shared by every analysis prompt. They come first so providers that
+# cache prompt prefixes (OpenAI does so automatically) reuse them across files.
+ANALYSIS_PROMPT_PREFIX = """You are an expert code reviewer analyzing Python code for compliance with coding standards and best practices.
+
+**TASK:**
+Analyze the provided code and identify any violations of the given coding standards. For each violation found:
+1. Specify the exact line number and column (if applicable)
+2. Quote the problematic code
+3. Explain why it violates the standard
+4. Provide a specific fix with the corrected code
+5. Assign a confidence score (0.0-1.0)
+
+**OUTPUT FORMAT:**
+Provide your analysis as a JSON object with the following structure:
+{
+    "violations": [
+        {
+            "rule_id": "rule_identifier",
+            "line_number": 10,
+            "column_number": 5,
+            "violation_description": "Detailed description of the violation",
+            "problematic_code": "exact code that violates the standard",
+            "suggested_fix": "corrected code following the standard",
+            "severity": "high|medium|low",
+            "confidence_score": 0.85
+        }
+    ],
+    "summary": {
+        "total_violations": 2,
+        "high_severity": 1,
+        "medium_severity": 1,
+        "low_severity": 0,
+        "overall_assessment": "Brief overall assessment of code quality"
+    }
+}
+
+"""
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _element_query(
+    element_type: str,
+    name: str,
+    arguments: Tuple[str, ...],
+    decorators: Tuple[str, ...],
+    high_complexity: bool,
+    source_head: Optional[str],
+    docstring_head: Optional[str]
+) -> str:
+    """Query text for a code element, built from the parts of it the query uses."""
+    query_parts = []
+    
+    # Add element type and name
+    query_parts.append(f"{element_type} named {name}")
+    
+    # Add element details
+    if element_type == "function":
+        if arguments:
+            query_parts.append(f"with parameters {', '.join(arguments)}")
+        if decorators:
+            query_parts.append(f"decorated with {', '.join(decorators)}")
+        if high_complexity:
+            query_parts.append("with high complexity")
+    
+    elif element_type == "class":
+        if decorators:
+            query_parts.append(f"decorated with {', '.join(decorators)}")
+    
+    # Add source code snippet if available
+    if source_head is not None:
+        query_parts.append(f"source: {source_head}")
+    
+    # Add docstring if available
+    if docstring_head is not None:
+        query_parts.append(f"documented as: {docstring_head}")
+    
+    return " ".join(query_parts)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _file_query(
+    total_lines: int,
+    complexity_score: int,
+    element_counts: Tuple[Tuple[str, int], ...],
+    key_imports: Tuple[str, ...]
+) -> str:
+    """Query text for a whole file, built from its summary statistics."""
+    query_parts = []
+    
+    # Add file characteristics
+    query_parts.append(f"Python file with {total_lines} lines")
+    
+    # Add complexity information
+    if complexity_score > 20:
+        query_parts.append("high complexity")
+    elif complexity_score > 10:
+        query_parts.append("medium complexity")
+    else:
+        query_parts.append("low complexity")
+    
+    # Add element counts
+    if element_counts:
+        count_descriptions = [
+            f"{count} {elem_type}{'s' if count > 1 else ''}" for elem_type, count in element_counts
+        ]
+        query_parts.append(f"containing {', '.join(count_descriptions)}")
+    
+    # Mention key imports
+    if key_imports:
+        query_parts.append(f"importing {', '.join(key_imports)}")
+    
+    return " ".join(query_parts)
+
+
+@dataclass(slots=True)
 class RelevantRule:
     """Represents a relevant code standard rule."""
     rule_id: str
@@ -24,9 +151,21 @@ class RelevantRule:
     severity: str
     similarity: float
     context: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'rule_id': self.rule_id,
+            'title': self.title,
+            'description': self.description,
+            'category': self.category,
+            'severity': self.severity,
+            'similarity': self.similarity,
+            'context': self.context
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class RAGContext:
     """Contains the RAG context for code analysis."""
     file_analysis: CodeAnalysis
@@ -38,8 +177,8 @@ class RAGContext:
         """Convert to dictionary for JSON serialization."""
         return {
             'file_analysis': self.file_analysis.to_dict(),
-            'code_element': self.code_element.__dict__ if self.code_element else None,
-            'relevant_rules': [rule.__dict__ for rule in self.relevant_rules],
+            'code_element': self.code_element.to_dict() if self.code_element else None,
+            'relevant_rules': [rule.to_dict() for rule in self.relevant_rules],
             'analysis_prompt': self.analysis_prompt
         }
 
@@ -50,12 +189,18 @@ class RAGSystem:
     def __init__(self):
         self.vector_db = vector_db_manager
         self.settings = settings
+        self.reranker = None
+        # Concurrent first reranks would otherwise each load the cross-encoder
+        self._reranker_lock = asyncio.Lock()
+        self._rerank_scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
     
     async def initialize(self):
         """Initialize the RAG system."""
         try:
             print("🚀 Initializing RAG System...")
             await self.vector_db.initialize()
+            if self.settings.vector_db.rerank_model is not None:
+                await self._load_reranker()
             print("✅ RAG System initialized successfully")
             
         except Exception as e:
@@ -71,16 +216,17 @@ class RAGSystem:
     ) -> List[RelevantRule]:
         """Retrieve relevant code standards using cosine similarity."""
         try:
-            print(f"🔍 Retrieving relevant rules for: '{query_text[:50]}...'")
+            logger.debug("Retrieving relevant rules for: '%s...'", query_text[:50])
             
             max_rules = max_rules or self.settings.vector_db.max_similar_rules
+            rerank = self.settings.vector_db.rerank_model is not None
             
-            # Search for similar standards
+            # Search for similar standards, oversampling when a reranker picks the final set
             similar_standards = await self.vector_db.search_similar_standards(
                 query_text=query_text,
                 language=language,
                 category=category,
-                limit=max_rules
+                limit=max_rules * self.settings.vector_db.rerank_oversample if rerank else max_rules
             )
             
             # Convert to RelevantRule objects
@@ -96,13 +242,45 @@ class RAGSystem:
                 )
                 relevant_rules.append(rule)
             
-            print(f"✅ Found {len(relevant_rules)} relevant rules")
+            if rerank and relevant_rules:
+                relevant_rules = await self._rerank(query_text, relevant_rules, max_rules)
+            
+            logger.debug("Found %s relevant rules", len(relevant_rules))
             return relevant_rules
             
         except Exception as e:
             logger.error(f"Failed to get relevant rules: {e}")
             raise
     
+    async def _load_reranker(self):
+        """Load the cross-encoder once, however many callers need it at the same time."""
+        async with self._reranker_lock:
+            if self.reranker is None:
+                from sentence_transformers import CrossEncoder
+                
+                self.reranker = await asyncio.to_thread(CrossEncoder, self.settings.vector_db.rerank_model)
+    
+    async def _rerank(self, query_text: str, rules: List[RelevantRule], top_k: int) -> List[RelevantRule]:
+        """Order rules by cross-encoder relevance to the query and keep the top_k."""
+        if self.reranker is None:
+            await self._load_reranker()
+        
+        query_hash = hashlib.sha1(query_text.encode("utf-8")).hexdigest()
+        missing = [rule for rule in rules if (query_hash, rule.rule_id) not in self._rerank_scores]
+        if missing:
+            scores = await asyncio.to_thread(
+                self.reranker.predict,
+                [(query_text, f"{rule.title}. {rule.description}") for rule in missing],
+                batch_size=32
+            )
+            for rule, score in zip(missing, scores):
+                self._rerank_scores[(query_hash, rule.rule_id)] = float(score)
+            while len(self._rerank_scores) > RERANK_CACHE_SIZE:
+                self._rerank_scores.popitem(last=False)
+        
+        ranked = sorted(rules, key=lambda rule: self._rerank_scores[(query_hash, rule.rule_id)], reverse=True)
+        return ranked[:top_k]
+    
     async def generate_analysis_context(
         self,
         file_analysis: CodeAnalysis,
@@ -110,15 +288,15 @@ class RAGSystem:
     ) -> RAGContext:
         """Generate RAG context for code analysis."""
         try:
-            print(f"🧠 Generating analysis context for: {file_analysis.file_path}")
+            logger.debug("Generating analysis context for: %s", file_analysis.file_path)
             
             # Create query text based on file analysis and specific element
             if code_element:
                 query_text = self._create_element_query(code_element, file_analysis)
-                print(f"  📍 Analyzing element: {code_element.element_type} '{code_element.name}'")
+                logger.debug("Analyzing element: %s '%s'", code_element.element_type, code_element.name)
             else:
                 query_text = self._create_file_query(file_analysis)
-                print(f"  📄 Analyzing entire file")
+                logger.debug("Analyzing entire file")
             
             # Get relevant rules
             relevant_rules = await self.get_relevant_rules(query_text)
@@ -136,7 +314,7 @@ class RAGSystem:
                 analysis_prompt=analysis_prompt
             )
             
-            print(f"✅ Generated context with {len(relevant_rules)} relevant rules")
+            logger.debug("Generated context with %s relevant rules", len(relevant_rules))
             return context
             
         except Exception as e:
@@ -145,71 +323,25 @@ class RAGSystem:
     
     def _create_element_query(self, element: CodeElement, file_analysis: CodeAnalysis) -> str:
         """Create query text for a specific code element."""
-        query_parts = []
-        
-        # Add element type and name
-        query_parts.append(f"{element.element_type} named {element.name}")
-        
-        # Add element details
-        if element.element_type == "function":
-            if element.arguments:
-                query_parts.append(f"with parameters {', '.join(element.arguments)}")
-            if element.decorators:
-                query_parts.append(f"decorated with {', '.join(element.decorators)}")
-            if element.complexity > 5:
-                query_parts.append("with high complexity")
-        
-        elif element.element_type == "class":
-            if element.decorators:
-                query_parts.append(f"decorated with {', '.join(element.decorators)}")
-        
-        # Add source code snippet if available
-        if element.source_code:
-            # Limit source code to first few lines
-            source_lines = element.source_code.split('\n')[:3]
-            query_parts.append(f"source: {' '.join(source_lines)}")
-        
-        # Add docstring if available
-        if element.docstring:
-            # Limit docstring to first sentence
-            docstring_sentence = element.docstring.split('.')[0]
-            query_parts.append(f"documented as: {docstring_sentence}")
-        
-        return " ".join(query_parts)
+        return _element_query(
+            element.element_type,
+            element.name,
+            tuple(element.arguments),
+            tuple(element.decorators),
+            element.complexity > 5,
+            # Source limited to the first few lines, docstring to its first sentence
+            ' '.join(element.source_code.split('\n', 3)[:3]) if element.source_code else None,
+            element.docstring.split('.', 1)[0] if element.docstring else None
+        )
     
     def _create_file_query(self, file_analysis: CodeAnalysis) -> str:
         """Create query text for entire file analysis."""
-        query_parts = []
-        
-        # Add file characteristics
-        query_parts.append(f"Python file with {file_analysis.total_lines} lines")
-        
-        # Add complexity information
-        if file_analysis.complexity_score > 20:
-            query_parts.append("high complexity")
-        elif file_analysis.complexity_score > 10:
-            query_parts.append("medium complexity")
-        else:
-            query_parts.append("low complexity")
-        
-        # Add element counts
-        element_counts = {}
-        for element in file_analysis.elements:
-            element_counts[element.element_type] = element_counts.get(element.element_type, 0) + 1
-        
-        if element_counts:
-            count_descriptions = []
-            for elem_type, count in element_counts.items():
-                count_descriptions.append(f"{count} {elem_type}{'s' if count > 1 else ''}")
-            query_parts.append(f"containing {', '.join(count_descriptions)}")
-        
-        # Add import information
-        if file_analysis.imports:
-            # Mention key imports
-            key_imports = [imp for imp in file_analysis.imports[:5]]  # First 5 imports
-            query_parts.append(f"importing {', '.join(key_imports)}")
-        
-        return " ".join(query_parts)
+        return _file_query(
+            file_analysis.total_lines,
+            file_analysis.complexity_score,
+            tuple(file_analysis.element_counts.items()),
+            tuple(file_analysis.imports[:5])  # First 5 imports
+        )
     
     def _generate_analysis_prompt(
         self,
@@ -218,61 +350,13 @@ class RAGSystem:
         relevant_rules: List[RelevantRule]
     ) -> str:
         """Generate the analysis prompt for the LLM."""
-        
-        # Base prompt template
-        prompt_template = """You are an expert code reviewer analyzing Python code for compliance with coding standards and best practices.
-
-**TASK:**
-Analyze the provided code and identify any violations of the given coding standards. For each violation found:
-1. Specify the exact line number and column (if applicable)
-2. Quote the problematic code
-3. Explain why it violates the standard
-4. Provide a specific fix with the corrected code
-5. Assign a confidence score (0.0-1.0)
-
-**RELEVANT CODING STANDARDS:**
-{relevant_rules}
-
-**CODE TO ANALYZE:**
-
-File: {file_path}
-Total Lines: {total_lines}
-Complexity Score: {complexity_score}
-
-{code_section}
-
-**OUTPUT FORMAT:**
-Provide your analysis as a JSON object with the following structure:
-{{
-    "violations": [
-        {{
-            "rule_id": "rule_identifier",
-            "line_number": 10,
-            "column_number": 5,
-            "violation_description": "Detailed description of the violation",
-            "problematic_code": "exact code that violates the standard",
-            "suggested_fix": "corrected code following the standard",
-            "severity": "high|medium|low",
-            "confidence_score": 0.85
-        }}
-    ],
-    "summary": {{
-        "total_violations": 2,
-        "high_severity": 1,
-        "medium_severity": 1,
-        "low_severity": 0,
-        "overall_assessment": "Brief overall assessment of code quality"
-    }}
-}}
-
-**ANALYSIS:**"""
-        
         # Format relevant rules
-        rules_text = ""
-        for i, rule in enumerate(relevant_rules, 1):
-            rules_text += f"\n{i}. **{rule.rule_id}** ({rule.severity} severity, {rule.similarity:.2f} relevance)\n"
-            rules_text += f"   Title: {rule.title}\n"
-            rules_text += f"   Description: {rule.description}\n"
+        rules_text = "".join(
+            f"\n{i}. **{rule.rule_id}** ({rule.severity} severity, {rule.similarity:.2f} relevance)\n"
+            f"   Title: {rule.title}\n"
+            f"   Description: {rule.description}\n"
+            for i, rule in enumerate(relevant_rules, 1)
+        )
         
         if not rules_text:
             rules_text = "\nNo specific coding standards found. Apply general Python best practices."
@@ -293,33 +377,37 @@ Line: {code_element.line_number}
 ```
 """
         else:
-            # Show key elements of the file
-            code_section = f"""
-**File Elements:**
-"""
-            for element in file_analysis.elements[:10]:  # Show first 10 elements
-                code_section += f"- {element.element_type}: {element.name} (line {element.line_number})\n"
+            # Show key elements of the file (first 10)
+            parts = ["\n**File Elements:**\n"]
+            parts.extend(
+                f"- {element.element_type}: {element.name} (line {element.line_number})\n"
+                for element in file_analysis.elements[:10]
+            )
             
             if len(file_analysis.elements) > 10:
-                code_section += f"... and {len(file_analysis.elements) - 10} more elements\n"
+                parts.append(f"... and {len(file_analysis.elements) - 10} more elements\n")
             
-            code_section += f"""
+            parts.append(f"""
 **Imports:**
 {', '.join(file_analysis.imports[:10]) if file_analysis.imports else 'None'}
 
 **Note:** Full file analysis requested. Analyze the overall structure and patterns.
-"""
+""")
+            code_section = "".join(parts)
         
-        # Fill the prompt template
-        prompt = prompt_template.format(
-            relevant_rules=rules_text,
-            file_path=file_analysis.file_path,
-            total_lines=file_analysis.total_lines,
-            complexity_score=file_analysis.complexity_score,
-            code_section=code_section
-        )
-        
-        return prompt
+        # Per-file part of the prompt; the static instructions are a shared prefix
+        return f"""{ANALYSIS_PROMPT_PREFIX}{RULES_SECTION_HEADER}
+{rules_text}
+
+{CODE_SECTION_HEADER}
+
+File: {file_analysis.file_path}
+Total Lines: {file_analysis.total_lines}
+Complexity Score: {file_analysis.complexity_score}
+
+{code_section}
+
+**ANALYSIS:**"""
     
     async def close(self):
         """Close the RAG system."""
@@ -3,7 +3,13 @@ Configuration settings for the Enterprise Code Refactor system.
 """
 
 import os
-from typing import Optional, List
+import sys
+import copy
+import hashlib
+import pickle
+from functools import lru_cache
+from typing import Dict, Optional, List
+from dotenv import dotenv_values
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
@@ -39,6 +45,19 @@ class LLMSettings(BaseSettings):
     temperature: float = Field(0.1)
     max_tokens: int = Field(2048)
     timeout: int = Field(60)
+    semantic_cache_enabled: bool = Field(False)
+    semantic_cache_threshold: float = Field(0.95)
+    batch_window_ms: int = Field(50)
+    batch_max_size: int = Field(16)
+    stream_responses: bool = Field(False)
+    max_connections: int = Field(64)
+    max_keepalive_connections: int = Field(32)
+    light_model: Optional[str] = Field(None)
+    light_model_max_complexity: int = Field(10)
+    light_model_max_elements: int = Field(20)
+    retry_attempts: int = Field(3)
+    circuit_breaker_fail_max: int = Field(5)
+    circuit_breaker_reset_seconds: int = Field(30)
     
     @field_validator("default_provider")
     @classmethod
@@ -70,6 +89,12 @@ class VectorDatabaseSettings(BaseSettings):
     embedding_dimension: int = Field(384)
     similarity_threshold: float = Field(0.7)
     max_similar_rules: int = Field(10)
+    embedding_cache_path: str = Field(str(Path.home() / ".cache" / "code-refactor" / "embeddings.sqlite3"))
+    embedding_quantize: bool = Field(False)
+    embedding_batch_window_ms: int = Field(20)
+    embedding_dtype: str = Field("float32")
+    rerank_model: Optional[str] = Field(None)
+    rerank_oversample: int = Field(3)
     
     @field_validator("similarity_threshold")
     @classmethod
@@ -78,6 +103,13 @@ class VectorDatabaseSettings(BaseSettings):
             raise ValueError("Similarity threshold must be between 0 and 1")
         return v
     
+    @field_validator("embedding_dtype")
+    @classmethod
+    def validate_embedding_dtype(cls, v):
+        if v not in ["float32", "float16"]:
+            raise ValueError("Embedding dtype must be 'float32' or 'float16'")
+        return v
+    
     model_config = SettingsConfigDict(
         env_prefix="VECTOR_",
         env_file=".env",
@@ -104,6 +136,13 @@ class GitSettings(BaseSettings):
     )
 
 
+def _default_daemon_socket() -> str:
+    """Per-user daemon socket: in $XDG_RUNTIME_DIR when set, otherwise in the user cache directory."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    base = Path(runtime_dir) if runtime_dir else Path.home() / ".cache" / "code-refactor"
+    return str(base / "code-refactor.sock")
+
+
 class ApplicationSettings(BaseSettings):
     """Application configuration settings."""
     
@@ -112,6 +151,13 @@ class ApplicationSettings(BaseSettings):
     log_level: str = Field("INFO")
     output_dir: str = Field("./output")
     temp_dir: str = Field("./temp")
+    daemon_socket: str = Field(default_factory=_default_daemon_socket)
+    clone_tmpfs_path: Optional[str] = Field(None)
+    clone_tmpfs_min_free_mb: int = Field(1024)
+    fingerprint_cache_path: str = Field(str(Path.home() / ".cache" / "code-refactor" / "fingerprints.sqlite3"))
+    # Empty disables the parse cache
+    parse_cache_path: str = Field(str(Path.home() / ".cache" / "code-refactor" / "parses.sqlite3"))
+    reuse_prior_analyses: bool = Field(True)
     
     @field_validator("log_level")
     @classmethod
@@ -153,9 +199,103 @@ class Settings:
         Path(self.app.temp_dir).mkdir(parents=True, exist_ok=True)
 
 
+# Environment variable prefixes read by the settings sections above
+_ENV_PREFIXES = ("DATABASE_", "LLM_", "VECTOR_", "GIT_", "APP_")
+
+SETTINGS_CACHE_DIR = Path.home() / ".cache" / "code-refactor"
+
+# Credentials are never written to the snapshot; they are read again from the environment or .env on load
+_SECRET_FIELDS = (
+    ("database", "url"),
+    ("database", "password"),
+    ("llm", "openai_api_key"),
+    ("llm", "anthropic_api_key"),
+    ("git", "token")
+)
+
+
+def _settings_cache_key() -> str:
+    """Build a cache key from everything that can change the validated settings."""
+    from .. import __version__
+    
+    hasher = hashlib.sha1()
+    hasher.update(f"{sys.version_info[:3]}|{__version__}".encode())
+    # Field definitions live in this module, so editing it invalidates the snapshot
+    hasher.update(Path(__file__).read_bytes())
+    
+    env_file = Path(".env")
+    if env_file.exists():
+        hasher.update(env_file.read_bytes())
+    
+    for key in sorted(os.environ):
+        if key.upper().startswith(_ENV_PREFIXES):
+            hasher.update(f"{key}={os.environ[key]}".encode())
+    # The default daemon socket lives in the runtime directory
+    hasher.update(f"XDG_RUNTIME_DIR={os.environ.get('XDG_RUNTIME_DIR', '')}".encode())
+    
+    return hasher.hexdigest()
+
+
+def _secret_values() -> Dict[str, str]:
+    """Environment and .env values by upper-cased name, the environment taking precedence like pydantic-settings."""
+    values = {}
+    env_file = Path(".env")
+    if env_file.exists():
+        values.update({key.upper(): value for key, value in dotenv_values(env_file).items() if value is not None})
+    values.update({key.upper(): value for key, value in os.environ.items()})
+    return values
+
+
+def _strip_secrets(settings_obj: Settings) -> Settings:
+    """Copy of the settings with every credential field cleared, safe to write to disk."""
+    snapshot = copy.copy(settings_obj)
+    for section, field in _SECRET_FIELDS:
+        setattr(snapshot, section, getattr(snapshot, section).model_copy(update={field: None}))
+    return snapshot
+
+
+def _restore_secrets(settings_obj: Settings):
+    """Fill the credential fields of a loaded snapshot from the environment or .env."""
+    values = _secret_values()
+    for section, field in _SECRET_FIELDS:
+        section_obj = getattr(settings_obj, section)
+        env_name = f"{section_obj.model_config['env_prefix']}{field}".upper()
+        setattr(section_obj, field, values.get(env_name, type(section_obj).model_fields[field].default))
+
+
+def _load_cached_settings() -> Settings:
+    """Load settings from the on-disk snapshot, validating and caching them on a miss."""
+    cache_file = SETTINGS_CACHE_DIR / f"settings-{_settings_cache_key()}.pkl"
+    
+    try:
+        cached = pickle.loads(cache_file.read_bytes())
+        _restore_secrets(cached)
+        cached._ensure_directories()
+        return cached
+    except Exception:
+        pass
+    
+    settings_obj = Settings()
+    
+    try:
+        SETTINGS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for stale in SETTINGS_CACHE_DIR.glob("settings-*.pkl"):
+            stale.unlink()
+        fd = os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(_strip_secrets(settings_obj), f)
+    except OSError:
+        pass
+    
+    return settings_obj
+
+
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings instance."""
-    return Settings()
+    """Get application settings instance, built once per process."""
+    if os.environ.get("CODE_REFACTOR_NO_SETTINGS_CACHE"):
+        return Settings()
+    return _load_cached_settings()
 
 
 # Global settings instance
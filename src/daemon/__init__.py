@@ -0,0 +1,3 @@
+"""
+Local daemon for serving CLI commands.
+"""
@@ -0,0 +1,146 @@
+"""
+Local daemon that keeps the orchestrator and database connections warm between CLI invocations.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import socket
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Awaitable[None]]
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a wire message."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize a wire message."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class DaemonServer:
+    """Unix-socket JSON-RPC server that dispatches CLI commands to already initialized systems."""
+    
+    def __init__(self, socket_path: str, handlers: Dict[str, Handler]):
+        self.socket_path = socket_path
+        self.handlers = handlers
+        # Commands share stdout and orchestrator state, so run them one at a time
+        self._lock = asyncio.Lock()
+    
+    async def serve_forever(self):
+        """Listen on the Unix socket until cancelled; refuses to start if another daemon answers on it."""
+        path = Path(self.socket_path)
+        if not path.parent.exists():
+            path.parent.mkdir(mode=0o700, parents=True)
+        if path.exists():
+            if _is_listening(str(path)):
+                raise RuntimeError(f"Another daemon is already listening on: {path}")
+            # Stale socket file left behind by a daemon that is no longer running
+            path.unlink()
+        
+        # Commands run with this user's credentials, so no other user may connect; the umask keeps the
+        # socket private from the moment it is bound, before the chmod
+        old_umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self._handle_client, path=str(path))
+        finally:
+            os.umask(old_umask)
+        os.chmod(path, 0o600)
+        print(f"🛰️  Daemon listening on: {path}")
+        
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if path.exists():
+                path.unlink()
+            print("✅ Daemon stopped")
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle a single request/response exchange."""
+        try:
+            try:
+                line = await reader.readline()
+                # An empty request is a starting daemon checking whether this socket is in use
+                if not line:
+                    return
+                
+                request = _loads(line)
+                response = await self._dispatch(request.get("method"), request.get("params") or {})
+            except Exception as e:
+                logger.error(f"Daemon request failed: {e}")
+                response = {"ok": False, "output": "", "error": str(e)}
+            
+            writer.write(_dumps(response) + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    
+    async def _dispatch(self, method: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the handler for a method and capture everything it writes to stdout."""
+        handler = self.handlers.get(method)
+        if handler is None:
+            return {"ok": False, "output": "", "error": f"Unknown method: {method}"}
+        
+        async with self._lock:
+            error = None
+            output = io.StringIO()
+            with redirect_stdout(output):
+                try:
+                    await handler(**params)
+                except Exception as e:
+                    error = str(e)
+        
+        return {"ok": error is None, "output": output.getvalue(), "error": error}
+
+
+def _is_listening(socket_path: str) -> bool:
+    """Whether a process accepts connections on the Unix socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+    except OSError:
+        return False
+    return True
+
+
+def send_request(socket_path: str, method: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Send a request to a running daemon, returning None if no daemon is listening."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall(_dumps({"method": method, "params": params}) + b"\n")
+            
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Stale socket file left behind by a daemon that is no longer running
+        return None
+    
+    return _loads(b"".join(chunks))
@@ -0,0 +1,3 @@
+"""
+Vector database and embedding storage.
+"""
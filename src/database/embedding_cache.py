@@ -0,0 +1,127 @@
+"""
+Persistent embedding cache keyed by provider, model and content hash.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """SQLite-backed cache of embedding vectors so unchanged texts are never re-embedded."""
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.vector_db.embedding_cache_path)
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        # Embeddings are looked up in worker threads while close() runs on the event loop thread,
+        # so the connection is shared across threads and access is serialized; close() re-enters via flush_stats()
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def key(provider: str, model: str, text: str) -> str:
+        """Content hash identifying an embedding."""
+        return hashlib.sha256(f"{provider}|{model}|{text}".encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    hash TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    vec BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+            """)
+        return self._conn
+    
+    def get(self, h: str) -> Optional[List[float]]:
+        """Return the cached vector for a hash, counting the hit or miss."""
+        with self._lock:
+            row = self._connect().execute("SELECT vec FROM embeddings WHERE hash = ?", (h,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+    
+    def put(self, h: str, provider: str, model: str, vec: List[float]):
+        """Store a single vector."""
+        self.put_many([(h, provider, model, vec)])
+    
+    def put_many(self, items: Iterable[Tuple[str, str, str, List[float]]]):
+        """Store vectors in a single transaction."""
+        rows = [
+            (h, provider, model, np.asarray(vec, dtype=np.float32).tobytes())
+            for h, provider, model, vec in items
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, provider, model, vec) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+    
+    def flush_stats(self):
+        """Add this process's hit/miss counts to the persisted totals."""
+        with self._lock:
+            if not (self.hits or self.misses):
+                return
+            
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    [("hits", self.hits), ("misses", self.misses)]
+                )
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Return entry count and cumulative hit/miss counts."""
+        if not self.path.exists():
+            return {"entries": 0, "hits": self.hits, "misses": self.misses}
+        
+        with self._lock:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            totals = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        return {
+            "entries": entries,
+            "hits": totals.get("hits", 0) + self.hits,
+            "misses": totals.get("misses", 0) + self.misses
+        }
+    
+    def close(self):
+        """Persist counters and close the connection."""
+        try:
+            with self._lock:
+                if self._conn is not None:
+                    self.flush_stats()
+                    self._conn.close()
+                    self._conn = None
+        except Exception as e:
+            logger.error(f"Error closing EmbeddingCache: {e}")
+
+
+# Global embedding cache instance
+embedding_cache = EmbeddingCache()
@@ -3,22 +3,145 @@ Vector Database Manager for storing and retrieving code standards as embeddings.
 """
 
 import asyncio
+import csv
 import logging
 import json
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple, Any
 from uuid import UUID, uuid4
 import numpy as np
+from pgvector.asyncpg import register_vector
 from sentence_transformers import SentenceTransformer
-from sqlalchemy import create_engine, text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 import asyncpg
 
 from ..config.settings import settings
+from .embedding_cache import embedding_cache
+from ..utils.micro_batcher import MicroBatcher
 
 
 logger = logging.getLogger(__name__)
 
+# Statements used by the CLI on every invocation are built once at import time;
+# asyncpg additionally caches their server-side prepared statements per connection.
+_SYSTEM_STATS_QUERY = text("""
+    WITH standards AS (
+        SELECT COUNT(*) AS total,
+               COALESCE(array_agg(DISTINCT category ORDER BY category), '{}') AS categories
+        FROM code_refactor.code_standards
+    ),
+    sessions AS (
+        SELECT COALESCE(json_object_agg(status, count), '{}'::json) AS stats
+        FROM (
+            SELECT status, COUNT(*) AS count
+            FROM code_refactor.analysis_sessions
+            GROUP BY status
+        ) s
+    )
+    SELECT standards.total, standards.categories, sessions.stats
+    FROM standards, sessions
+""")
+
+_UPSERT_STANDARD_QUERY = text("""
+    INSERT INTO code_refactor.code_standards 
+    (rule_id, title, description, category, severity, language, embedding, metadata)
+    VALUES (:rule_id, :title, :description, :category, :severity, :language, :embedding, :metadata)
+    ON CONFLICT (rule_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        category = EXCLUDED.category,
+        severity = EXCLUDED.severity,
+        language = EXCLUDED.language,
+        embedding = EXCLUDED.embedding,
+        metadata = EXCLUDED.metadata,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+_STORE_STANDARD_QUERY = text("""
+    INSERT INTO code_refactor.code_standards 
+    (rule_id, title, description, category, severity, language, embedding, metadata)
+    VALUES (:rule_id, :title, :description, :category, :severity, :language, :embedding, :metadata)
+    ON CONFLICT (rule_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        category = EXCLUDED.category,
+        severity = EXCLUDED.severity,
+        language = EXCLUDED.language,
+        embedding = EXCLUDED.embedding,
+        metadata = EXCLUDED.metadata,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING id
+""")
+
+_SELECT_CATEGORIES_QUERY = text("""
+    SELECT DISTINCT category 
+    FROM code_refactor.code_standards 
+    ORDER BY category
+""")
+
+_COUNT_STANDARDS_QUERY = text("SELECT COUNT(*) FROM code_refactor.code_standards")
+
+# Search function and vector type per settings.vector_db.embedding_dtype; float16 searches the
+# halfvec index, halving the memory read per comparison at a negligible cost in ranking
+_SEARCH_FUNCTIONS = {
+    "float32": ("code_refactor.find_similar_standards", "vector"),
+    "float16": ("code_refactor.find_similar_standards_half", "halfvec")
+}
+
+# The query embedding is bound as a binary vector parameter (see _register_vector_codec);
+# halfvec searches convert it on the server
+_SEARCH_SIMILAR_QUERIES = {
+    dtype: text(f"""
+        SELECT * FROM {function}(
+            CAST(CAST(:query_embedding AS vector) AS {vector_type}),
+            :match_threshold,
+            :match_count,
+            :filter_language,
+            :filter_category
+        )
+    """)
+    for dtype, (function, vector_type) in _SEARCH_FUNCTIONS.items()
+}
+
+# Query texts encoded per model call when batching concurrent searches
+QUERY_BATCH_MAX_SIZE = 64
+
+# Number of standards embedded and written per round-trip when loading files
+DEFAULT_LOAD_BATCH_SIZE = 64
+
+# LIMIT NULL is LIMIT ALL in PostgreSQL
+_LIST_SESSIONS_QUERY = text("""
+    SELECT id, session_name, source_type, source_path, status,
+           total_files, processed_files, failed_files, created_at
+    FROM code_refactor.analysis_sessions
+    ORDER BY created_at DESC
+    LIMIT :limit
+""").execution_options(yield_per=50)
+
+
+def _register_vector_codec(dbapi_connection, connection_record):
+    """Exchange pgvector values with new connections as binary float32 instead of '[...]' text."""
+    dbapi_connection.run_async(register_vector)
+
+
+def _quantize_int8(model: SentenceTransformer):
+    """Dynamically quantize the model's Linear layers to int8 in place (CPU inference)."""
+    import torch
+    
+    torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+@lru_cache(maxsize=None)
+def _load_embedding_model(model_name: str, quantize: bool) -> SentenceTransformer:
+    """Load an embedding model once per process, however many managers initialize."""
+    model = SentenceTransformer(model_name)
+    if quantize:
+        _quantize_int8(model)
+        logger.info("Embedding model quantized to int8")
+    return model
+
 
 class VectorDBManager:
     """Manages vector database operations for code standards."""
@@ -26,51 +149,130 @@ class VectorDBManager:
     def __init__(self):
         self.settings = settings
         self.embedding_model = None
-        self.engine = None
         self.async_engine = None
         self.session_factory = None
-        
-    async def initialize(self):
-        """Initialize the vector database manager."""
+        self.embedding_cache = embedding_cache
+        # Query embeddings from concurrent workers are encoded together
+        self.query_batcher = MicroBatcher(
+            lambda texts: asyncio.to_thread(self._encode_batch, texts),
+            window_ms=self.settings.vector_db.embedding_batch_window_ms,
+            max_batch=QUERY_BATCH_MAX_SIZE
+        )
+        # The orchestrator and RAG system share this instance and may initialize it concurrently
+        self._init_lock = asyncio.Lock()
+    
+    async def initialize(self, pool_size: Optional[int] = None):
+        """Initialize the vector database manager; pool_size caps connections for short-lived commands."""
+        async with self._init_lock:
+            if self.session_factory is not None:
+                return
+            await self._initialize(pool_size)
+    
+    async def _initialize(self, pool_size: Optional[int] = None):
         try:
             print("🚀 Initializing Vector Database Manager...")
             
-            # Initialize embedding model
-            print("📊 Loading embedding model...")
-            self.embedding_model = SentenceTransformer(
-                self.settings.vector_db.embedding_model
-            )
-            print(f"✅ Embedding model loaded: {self.settings.vector_db.embedding_model}")
+            # Initialize embedding model off the event loop; loading weights is blocking
+            if self.embedding_model is None:
+                print("📊 Loading embedding model...")
+                self.embedding_model = await asyncio.to_thread(
+                    _load_embedding_model,
+                    self.settings.vector_db.embedding_model,
+                    self.settings.vector_db.embedding_quantize
+                )
+                print(f"✅ Embedding model loaded: {self.settings.vector_db.embedding_model}")
             
             # Initialize database connections
-            self.engine = create_engine(self.settings.database.url)
+            engine_options = {}
+            if pool_size is not None:
+                engine_options = {"pool_size": pool_size, "max_overflow": 0, "pool_pre_ping": False}
             self.async_engine = create_async_engine(
-                self.settings.database.url.replace("postgresql://", "postgresql+asyncpg://")
+                self.settings.database.url.replace("postgresql://", "postgresql+asyncpg://"),
+                **engine_options
             )
+            event.listen(self.async_engine.sync_engine, "connect", _register_vector_codec)
             self.session_factory = sessionmaker(
                 self.async_engine, class_=AsyncSession, expire_on_commit=False
             )
             
             print("✅ Vector Database Manager initialized successfully")
-            
+        
         except Exception as e:
             logger.error(f"Failed to initialize VectorDBManager: {e}")
             raise
     
+    @property
+    def embedding_model_key(self) -> str:
+        """Model identifier for cached embeddings; quantized vectors are cached separately."""
+        model = self.settings.vector_db.embedding_model
+        model = f"{model}:int8" if self.settings.vector_db.embedding_quantize else model
+        # Embeddings are L2-normalized; unnormalized vectors cached by older versions are not reused
+        return f"{model}:unit"
+    
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Encode texts with a single model call."""
+        if self.embedding_model is None:
+            raise RuntimeError("Embedding model not initialized")
+        
+        encoded = self.embedding_model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_tensor=False,
+            normalize_embeddings=True
+        )
+        return [vector.tolist() for vector in encoded]
+    
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for given text."""
         try:
             if self.embedding_model is None:
                 raise RuntimeError("Embedding model not initialized")
             
-            # Generate embedding
-            embedding = self.embedding_model.encode(text, convert_to_tensor=False)
+            # Generate a unit-length embedding so similarity search can use the inner product
+            embedding = self.embedding_model.encode(text, convert_to_tensor=False, normalize_embeddings=True)
             return embedding.tolist()
-            
+        
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise
     
+    def generate_cached_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts, encoding only cache misses in a single model call."""
+        model = self.embedding_model_key
+        hashes = [self.embedding_cache.key("sentence-transformers", model, t) for t in texts]
+        embeddings = [self.embedding_cache.get(h) for h in hashes]
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            if self.embedding_model is None:
+                raise RuntimeError("Embedding model not initialized")
+            
+            encoded = self.embedding_model.encode(
+                [texts[i] for i in missing],
+                batch_size=len(missing),
+                convert_to_tensor=False,
+                normalize_embeddings=True
+            )
+            new_entries = []
+            for i, vector in zip(missing, encoded):
+                embeddings[i] = vector.tolist()
+                new_entries.append((hashes[i], "sentence-transformers", model, embeddings[i]))
+            self.embedding_cache.put_many(new_entries)
+        
+        return embeddings
+    
+    def generate_cached_embedding(self, text: str) -> List[float]:
+        """Generate an embedding, reusing the cached vector for unchanged text."""
+        model = self.embedding_model_key
+        h = self.embedding_cache.key("sentence-transformers", model, text)
+        
+        embedding = self.embedding_cache.get(h)
+        if embedding is None:
+            embedding = self.generate_embedding(text)
+            self.embedding_cache.put(h, "sentence-transformers", model, embedding)
+        
+        return embedding
+    
     async def store_code_standard(
         self,
         rule_id: str,
@@ -87,31 +289,12 @@ class VectorDBManager:
             
             # Generate embedding for the combined text
             combined_text = f"{title}. {description}"
-            embedding = self.generate_embedding(combined_text)
+            embedding = self.generate_cached_embedding(combined_text)
             
             # Store in database
             async with self.session_factory() as session:
-                query = text("""
-                    INSERT INTO code_refactor.code_standards 
-                    (rule_id, title, description, category, severity, language, embedding, metadata)
-                    VALUES (:rule_id, :title, :description, :category, :severity, :language, :embedding, :metadata)
-                    ON CONFLICT (rule_id) DO UPDATE SET
-                        title = EXCLUDED.title,
-                        description = EXCLUDED.description,
-                        category = EXCLUDED.category,
-                        severity = EXCLUDED.severity,
-                        language = EXCLUDED.language,
-                        embedding = EXCLUDED.embedding,
-                        metadata = EXCLUDED.metadata,
-                        updated_at = CURRENT_TIMESTAMP
-                    RETURNING id
-                """)
-                
-                # Convert embedding list to string format for pgvector
-                embedding_str = str(embedding.tolist() if hasattr(embedding, 'tolist') else embedding)
-                
                 result = await session.execute(
-                    query,
+                    _STORE_STANDARD_QUERY,
                     {
                         "rule_id": rule_id,
                         "title": title,
@@ -119,7 +302,7 @@ class VectorDBManager:
                         "category": category,
                         "severity": severity,
                         "language": language,
-                        "embedding": embedding_str,
+                        "embedding": embedding,
                         "metadata": json.dumps(metadata) if metadata else None
                     }
                 )
@@ -129,7 +312,7 @@ class VectorDBManager:
                 
                 print(f"✅ Code standard stored: {rule_id}")
                 return record_id
-                
+        
         except Exception as e:
             logger.error(f"Failed to store code standard {rule_id}: {e}")
             raise
@@ -144,10 +327,10 @@ class VectorDBManager:
     ) -> List[Dict[str, Any]]:
         """Search for similar code standards using cosine similarity."""
         try:
-            print(f"🔍 Searching for similar standards to: '{query_text[:50]}...'")
+            logger.debug("Searching for similar standards to: '%s...'", query_text[:50])
             
-            # Generate embedding for query
-            query_embedding = self.generate_embedding(query_text)
+            # Generate embedding for query, batched with other workers' queries off the event loop
+            query_embedding = await self.query_batcher.submit(query_text)
             
             # Use default values if not provided
             threshold = threshold or self.settings.vector_db.similarity_threshold
@@ -155,24 +338,10 @@ class VectorDBManager:
             
             # Search in database
             async with self.session_factory() as session:
-                # Convert embedding to string for pgvector
-                embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else query_embedding
-                embedding_str = str(embedding_list)
-                
-                # Use f-string for embedding since asyncpg doesn't support ::vector casting with bind parameters
-                query = text(f"""
-                    SELECT * FROM code_refactor.find_similar_standards(
-                        '{embedding_str}'::vector,
-                        :match_threshold,
-                        :match_count,
-                        :filter_language,
-                        :filter_category
-                    )
-                """)
-                
                 result = await session.execute(
-                    query,
+                    _SEARCH_SIMILAR_QUERIES[self.settings.vector_db.embedding_dtype],
                     {
+                        "query_embedding": np.asarray(query_embedding, dtype=np.float32),
                         "match_threshold": threshold,
                         "match_count": limit,
                         "filter_language": language,
@@ -191,19 +360,57 @@ class VectorDBManager:
                         "similarity": row.similarity
                     })
                 
-                print(f"✅ Found {len(results)} similar standards")
+                logger.debug("Found %s similar standards", len(results))
                 return results
-                
+        
         except Exception as e:
             logger.error(f"Failed to search similar standards: {e}")
             raise
     
-    async def load_standards_from_file(self, file_path: str) -> int:
+    async def store_code_standards(
+        self,
+        standards: List[Dict[str, Any]],
+        batch_size: int = DEFAULT_LOAD_BATCH_SIZE
+    ) -> int:
+        """Store many code standards, embedding and upserting them in batches."""
+        stored = 0
+        
+        for start in range(0, len(standards), batch_size):
+            batch = standards[start:start + batch_size]
+            print(f"💾 Storing code standards {start + 1}-{start + len(batch)} of {len(standards)}")
+            
+            embeddings = await asyncio.to_thread(
+                self.generate_cached_embeddings,
+                [f"{item['title']}. {item['description']}" for item in batch]
+            )
+            
+            params = [
+                {
+                    "rule_id": item["rule_id"],
+                    "title": item["title"],
+                    "description": item["description"],
+                    "category": item["category"],
+                    "severity": item["severity"],
+                    "language": item["language"],
+                    "embedding": embedding,
+                    "metadata": json.dumps(item["metadata"]) if item["metadata"] else None
+                }
+                for item, embedding in zip(batch, embeddings)
+            ]
+            
+            async with self.session_factory() as session:
+                await session.execute(_UPSERT_STANDARD_QUERY, params)
+                await session.commit()
+            
+            stored += len(batch)
+        
+        return stored
+    
+    async def load_standards_from_file(self, file_path: str, batch_size: int = DEFAULT_LOAD_BATCH_SIZE) -> int:
         """Load code standards from a file (JSON, CSV, or text)."""
         try:
             print(f"📁 Loading standards from file: {file_path}")
             
-            import pandas as pd
             from pathlib import Path
             
             file_path = Path(file_path)
@@ -211,7 +418,7 @@ class VectorDBManager:
             if not file_path.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            standards_loaded = 0
+            standards = []
             
             if file_path.suffix.lower() == '.json':
                 # Load from JSON file
@@ -220,33 +427,30 @@ class VectorDBManager:
                 
                 if isinstance(data, list):
                     for item in data:
-                        await self.store_code_standard(
-                            rule_id=item.get('rule_id', f"rule_{uuid4().hex[:8]}"),
-                            title=item.get('title', ''),
-                            description=item.get('description', ''),
-                            category=item.get('category', 'general'),
-                            severity=item.get('severity', 'medium'),
-                            language=item.get('language', 'python'),
-                            metadata=item.get('metadata')
-                        )
-                        standards_loaded += 1
-                        
+                        standards.append({
+                            'rule_id': item.get('rule_id', f"rule_{uuid4().hex[:8]}"),
+                            'title': item.get('title', ''),
+                            'description': item.get('description', ''),
+                            'category': item.get('category', 'general'),
+                            'severity': item.get('severity', 'medium'),
+                            'language': item.get('language', 'python'),
+                            'metadata': item.get('metadata')
+                        })
+            
             elif file_path.suffix.lower() == '.csv':
-                # Load from CSV file
-                df = pd.read_csv(file_path)
-                
-                for _, row in df.iterrows():
-                    await self.store_code_standard(
-                        rule_id=row.get('rule_id', f"rule_{uuid4().hex[:8]}"),
-                        title=row.get('title', ''),
-                        description=row.get('description', ''),
-                        category=row.get('category', 'general'),
-                        severity=row.get('severity', 'medium'),
-                        language=row.get('language', 'python'),
-                        metadata={'source_file': str(file_path)}
-                    )
-                    standards_loaded += 1
-                    
+                # Load from CSV file, streaming rows as dicts; all fields are text, so pandas is not needed
+                with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        standards.append({
+                            'rule_id': row.get('rule_id') or f"rule_{uuid4().hex[:8]}",
+                            'title': row.get('title') or '',
+                            'description': row.get('description') or '',
+                            'category': row.get('category') or 'general',
+                            'severity': row.get('severity') or 'medium',
+                            'language': row.get('language') or 'python',
+                            'metadata': {'source_file': str(file_path)}
+                        })
+            
             elif file_path.suffix.lower() == '.txt':
                 # Load from text file (assume each line is a rule)
                 with open(file_path, 'r', encoding='utf-8') as f:
@@ -255,27 +459,28 @@ class VectorDBManager:
                 for i, line in enumerate(lines):
                     line = line.strip()
                     if line:
-                        await self.store_code_standard(
-                            rule_id=f"rule_{i+1:04d}",
-                            title=f"Rule {i+1}",
-                            description=line,
-                            category='general',
-                            severity='medium',
-                            language='python',
-                            metadata={'source_file': str(file_path), 'line_number': i+1}
-                        )
-                        standards_loaded += 1
+                        standards.append({
+                            'rule_id': f"rule_{i+1:04d}",
+                            'title': f"Rule {i+1}",
+                            'description': line,
+                            'category': 'general',
+                            'severity': 'medium',
+                            'language': 'python',
+                            'metadata': {'source_file': str(file_path), 'line_number': i+1}
+                        })
             else:
                 raise ValueError(f"Unsupported file format: {file_path.suffix}")
             
+            standards_loaded = await self.store_code_standards(standards, batch_size)
+            
             print(f"✅ Loaded {standards_loaded} standards from {file_path}")
             return standards_loaded
-            
+        
         except Exception as e:
             logger.error(f"Failed to load standards from file {file_path}: {e}")
             raise
     
-    async def load_standards_from_url(self, url: str) -> int:
+    async def load_standards_from_url(self, url: str, batch_size: int = DEFAULT_LOAD_BATCH_SIZE) -> int:
         """Load code standards from a web URL."""
         try:
             print(f"🌐 Loading standards from URL: {url}")
@@ -307,11 +512,11 @@ class VectorDBManager:
                         temp_path = f.name
                     
                     try:
-                        standards_loaded = await self.load_standards_from_file(temp_path)
+                        standards_loaded = await self.load_standards_from_file(temp_path, batch_size)
                         return standards_loaded
                     finally:
                         Path(temp_path).unlink()  # Clean up temp file
-                        
+        
         except Exception as e:
             logger.error(f"Failed to load standards from URL {url}: {e}")
             raise
@@ -320,17 +525,11 @@ class VectorDBManager:
         """Get all unique categories from stored standards."""
         try:
             async with self.session_factory() as session:
-                query = text("""
-                    SELECT DISTINCT category 
-                    FROM code_refactor.code_standards 
-                    ORDER BY category
-                """)
-                
-                result = await session.execute(query)
+                result = await session.execute(_SELECT_CATEGORIES_QUERY)
                 categories = [row[0] for row in result]
                 
                 return categories
-                
+        
         except Exception as e:
             logger.error(f"Failed to get categories: {e}")
             raise
@@ -339,23 +538,57 @@ class VectorDBManager:
         """Get total count of stored standards."""
         try:
             async with self.session_factory() as session:
-                query = text("SELECT COUNT(*) FROM code_refactor.code_standards")
-                result = await session.execute(query)
+                result = await session.execute(_COUNT_STANDARDS_QUERY)
                 count = result.scalar()
                 
                 return count
-                
+        
         except Exception as e:
             logger.error(f"Failed to get standards count: {e}")
             raise
     
+    async def get_system_stats(self) -> Dict[str, Any]:
+        """Get standards count, categories and session status counts in one round-trip."""
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(_SYSTEM_STATS_QUERY)
+                row = result.one()
+                
+                session_stats = row.stats
+                if isinstance(session_stats, str):
+                    session_stats = json.loads(session_stats)
+                
+                return {
+                    "standards_count": row.total,
+                    "categories": list(row.categories),
+                    "session_stats": session_stats
+                }
+        
+        except Exception as e:
+            logger.error(f"Failed to get system stats: {e}")
+            raise
+    
+    async def iter_sessions(self, limit: Optional[int] = None):
+        """Stream analysis sessions, newest first, using a server-side cursor."""
+        try:
+            async with self.session_factory() as session:
+                result = await session.stream(_LIST_SESSIONS_QUERY, {"limit": limit})
+                async for row in result:
+                    yield row
+        
+        except Exception as e:
+            logger.error(f"Failed to list sessions: {e}")
+            raise
+    
     async def close(self):
         """Close database connections."""
         try:
             if self.async_engine:
                 await self.async_engine.dispose()
+            self.session_factory = None
+            self.embedding_cache.close()
             print("✅ Vector Database Manager closed")
-            
+        
         except Exception as e:
             logger.error(f"Error closing VectorDBManager: {e}")
 
@@ -0,0 +1,3 @@
+"""
+Diff generation for code fixes.
+"""
@@ -2,9 +2,12 @@
 Diff generator for creating code update files based on violations.
 """
 
+import asyncio
 import logging
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -12,11 +15,29 @@ from datetime import datetime
 import difflib
 import ast
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 from ..agents.worker_agent import WorkerResult
 from ..config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Fewer files than this are diffed in-process; starting worker processes would cost more than it saves
+PARALLEL_DIFF_MIN_FILES = 8
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a report to indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
 
 @dataclass
 class CodeFix:
@@ -54,6 +75,8 @@ class DiffGenerator:
     
     def __init__(self):
         self.settings = settings
+        # Created on first use and kept for later runs in the same process (e.g. the daemon)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         
     def generate_diffs(
         self,
@@ -70,16 +93,13 @@ class DiffGenerator:
             
             all_diff_files = []
             
-            for result in worker_results:
-                if result.success and result.violations:
-                    print(f"📝 Processing {result.file_path}: {len(result.violations)} violations")
-                    
-                    diff_file = self.generate_file_diff(result, str(output_path))
-                    if diff_file:
-                        all_diff_files.append(diff_file)
-                        print(f"✅ Generated diff for {result.file_path}")
-                else:
-                    print(f"⏭️  Skipping {result.file_path}: {'no violations' if result.success else 'failed analysis'}")
+            for result in self._diffable_results(worker_results):
+                print(f"📝 Processing {result.file_path}: {len(result.violations)} violations")
+                
+                diff_file = self.generate_file_diff(result, str(output_path))
+                if diff_file:
+                    all_diff_files.append(diff_file)
+                    print(f"✅ Generated diff for {result.file_path}")
             
             print(f"🎉 Generated {len(all_diff_files)} diff files")
             return all_diff_files
@@ -88,6 +108,62 @@ class DiffGenerator:
             logger.error(f"Failed to generate diffs: {e}")
             raise
     
+    async def generate_diffs_async(
+        self,
+        worker_results: List[WorkerResult],
+        output_dir: Optional[str] = None
+    ) -> List[DiffFile]:
+        """Generate diff files off the event loop, across a process pool once there are enough files."""
+        try:
+            print("🔧 Generating diff files...")
+            
+            output_dir = output_dir or self.settings.app.output_dir
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            
+            pending = self._diffable_results(worker_results)
+            if len(pending) < PARALLEL_DIFF_MIN_FILES:
+                results = await asyncio.to_thread(
+                    lambda: [self.generate_file_diff(result, output_dir) for result in pending]
+                )
+            else:
+                # Diffing is CPU-bound per file
+                loop = asyncio.get_running_loop()
+                pool = self._get_process_pool()
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(pool, generate_one, result, output_dir)
+                    for result in pending
+                ])
+            
+            diff_files = [diff_file for diff_file in results if diff_file is not None]
+            print(f"🎉 Generated {len(diff_files)} diff files")
+            return diff_files
+            
+        except Exception as e:
+            logger.error(f"Failed to generate diffs: {e}")
+            raise
+    
+    def _diffable_results(self, worker_results: List[WorkerResult]) -> List[WorkerResult]:
+        """Results with violations to diff; the others are reported as skipped."""
+        pending = []
+        for result in worker_results:
+            if result.success and result.violations:
+                pending.append(result)
+            else:
+                print(f"⏭️  Skipping {result.file_path}: {'no violations' if result.success else 'failed analysis'}")
+        return pending
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Process pool shared by every parallel diff run."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return self._process_pool
+    
+    def close(self):
+        """Shut down the process pool, if one was started."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+    
     def generate_file_diff(
         self,
         worker_result: WorkerResult,
@@ -142,8 +218,7 @@ class DiffGenerator:
             
             # Also write metadata
             metadata_file = diff_file_path.with_suffix('.json')
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(diff_file.to_dict(), f, indent=2, ensure_ascii=False)
+            metadata_file.write_bytes(_dumps(diff_file.to_dict()))
             
             return diff_file
             
@@ -485,8 +560,7 @@ class DiffGenerator:
                 summary['files'].append(file_summary)
             
             # Write summary report
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            Path(output_path).write_bytes(_dumps(summary))
             
             print(f"✅ Summary report created: {output_path}")
             return summary
@@ -499,3 +573,8 @@ class DiffGenerator:
 # Global diff generator instance
 diff_generator = DiffGenerator()
 
+
+
+def generate_one(worker_result: WorkerResult, output_dir: str) -> Optional[DiffFile]:
+    """Generate the diff for a single worker result (module-level so process pools can pickle it)."""
+    return diff_generator.generate_file_diff(worker_result, output_dir)
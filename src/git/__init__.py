@@ -0,0 +1,3 @@
+"""
+Git repository operations.
+"""
@@ -5,6 +5,8 @@ Git integration for branch creation, diff generation, and pull request managemen
 import os
 import logging
 import json
+import re
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
@@ -12,6 +14,11 @@ import git
 from git import Repo
 import requests
 
+try:
+    import pygit2
+except ImportError:  # pragma: no cover - optional in-process libgit2 backend
+    pygit2 = None
+
 from ..config.settings import settings
 from ..database.vector_db_manager import vector_db_manager
 
@@ -26,6 +33,10 @@ class GitManager:
         self.repo: Optional[Repo] = None
         self.original_branch: Optional[str] = None
         self.refactor_branch: Optional[str] = None
+        # libgit2 handle used to avoid spawning git processes; None falls back to GitPython
+        self._pygit2_repo = None
+        # libgit2 repository handles are not safe for concurrent use across threads
+        self._pygit2_lock = threading.Lock()
         
     def initialize_repo(self, repo_path: str) -> bool:
         """Initialize Git repository."""
@@ -43,6 +54,13 @@ class GitManager:
             self.original_branch = self.repo.active_branch.name
             print(f"📍 Current branch: {self.original_branch}")
             
+            if pygit2 is not None:
+                try:
+                    self._pygit2_repo = pygit2.Repository(repo_path)
+                except pygit2.GitError as e:
+                    logger.warning(f"pygit2 unavailable for {repo_path}, using git commands: {e}")
+                    self._pygit2_repo = None
+            
             return True
             
         except Exception as e:
@@ -65,8 +83,14 @@ class GitManager:
             print(f"🌿 Creating refactor branch: {branch_name}")
             
             # Create new branch
-            new_branch = self.repo.create_head(branch_name)
-            new_branch.checkout()
+            if self._pygit2_repo is not None:
+                with self._pygit2_lock:
+                    head_commit = self._pygit2_repo.head.peel(pygit2.Commit)
+                    new_branch = self._pygit2_repo.branches.local.create(branch_name, head_commit)
+                    self._pygit2_repo.checkout(new_branch)
+            else:
+                new_branch = self.repo.create_head(branch_name)
+                new_branch.checkout()
             
             self.refactor_branch = branch_name
             
@@ -97,6 +121,11 @@ class GitManager:
             with open(diff_file_path, 'r', encoding='utf-8') as f:
                 diff_content = f.read()
             
+            # Apply in-process with libgit2 when available
+            if self._pygit2_repo is not None and self._apply_diff_pygit2(diff_content):
+                print(f"✅ Diff applied successfully: {diff_file_path}")
+                return True
+            
             # Apply the diff using git apply
             try:
                 self.repo.git.apply('--whitespace=fix', '--', diff_file_path)
@@ -112,6 +141,26 @@ class GitManager:
             logger.error(f"Failed to apply diff file {diff_file_path}: {e}")
             return False
     
+    def _apply_diff_pygit2(self, diff_content: str) -> bool:
+        """Apply diff content to the working tree with libgit2."""
+        try:
+            # libgit2 only parses git-style patches; plain unified diffs need a "diff --git" header per file
+            if not diff_content.startswith('diff --git '):
+                diff_content = re.sub(
+                    r'^--- a/(.+)$',
+                    lambda m: f"diff --git a/{m.group(1)} b/{m.group(1)}\n{m.group(0)}",
+                    diff_content,
+                    flags=re.MULTILINE
+                )
+            diff = pygit2.Diff.parse_diff(diff_content)
+            with self._pygit2_lock:
+                self._pygit2_repo.apply(diff, pygit2.GIT_APPLY_LOCATION_WORKDIR)
+            return True
+            
+        except (pygit2.GitError, ValueError) as e:
+            logger.warning(f"libgit2 apply failed, falling back to git apply: {e}")
+            return False
+    
     def _apply_diff_manually(self, diff_content: str) -> bool:
         """Manually apply diff content."""
         try:
@@ -251,22 +300,25 @@ class GitManager:
                 raise RuntimeError("Repository not initialized")
             
             # Check if there are changes to commit
-            if not self.repo.is_dirty():
+            if not self._is_dirty():
                 print("ℹ️  No changes to commit")
                 return ""
             
             print("📝 Committing changes...")
             
-            # Add all changes
-            self.repo.git.add('--all')
-            
             # Create commit message
             if not message:
                 message = f"{self.settings.git.default_commit_message} - Session: {session_id}"
             
-            # Commit changes
-            commit = self.repo.index.commit(message)
-            commit_hash = commit.hexsha
+            if self._pygit2_repo is not None:
+                commit_hash = self._commit_pygit2(message)
+            else:
+                # Add all changes
+                self.repo.git.add('--all')
+                
+                # Commit changes
+                commit = self.repo.index.commit(message)
+                commit_hash = commit.hexsha
             
             # Store git operation in database
             asyncio.run(self._store_git_operation(
@@ -280,6 +332,28 @@ class GitManager:
             logger.error(f"Failed to commit changes: {e}")
             raise
     
+    def _is_dirty(self) -> bool:
+        """Check for modified tracked files, ignoring untracked ones like GitPython's is_dirty()."""
+        if self._pygit2_repo is None:
+            return self.repo.is_dirty()
+        
+        with self._pygit2_lock:
+            return any(
+                flags != pygit2.GIT_STATUS_WT_NEW
+                for flags in self._pygit2_repo.status().values()
+            )
+    
+    def _commit_pygit2(self, message: str) -> str:
+        """Stage all changes and commit them on HEAD with libgit2."""
+        with self._pygit2_lock:
+            repo = self._pygit2_repo
+            repo.index.add_all()
+            repo.index.write()
+            tree = repo.index.write_tree()
+            signature = repo.default_signature
+            commit_id = repo.create_commit('HEAD', signature, signature, message, tree, [repo.head.target])
+            return str(commit_id)
+    
     def create_pull_request(
         self,
         session_id: str,
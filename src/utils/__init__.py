@@ -0,0 +1,3 @@
+"""
+Shared helpers used across packages.
+"""
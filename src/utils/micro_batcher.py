@@ -0,0 +1,88 @@
+"""
+Micro-batching of concurrent requests into batched calls.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Receives one group's items and returns a result, or an exception to raise, per item in order
+BatchFunction = Callable[[List[T]], Awaitable[List[Any]]]
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects items for a short window and passes each group of items to one batch call."""
+    
+    def __init__(
+        self,
+        run_batch: BatchFunction,
+        window_ms: int,
+        max_batch: int,
+        key: Optional[Callable[[T], Hashable]] = None
+    ):
+        self.run_batch = run_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        # Items with different keys are never sent in the same call
+        self.key = key
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+    
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for its result; with no window the item is sent on its own."""
+        if self.window <= 0:
+            return _unwrap((await self.run_batch([item]))[0])
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        groups: Dict[Hashable, List[Tuple[T, asyncio.Future]]] = {}
+        for entry in batch:
+            groups.setdefault(self.key(entry[0]) if self.key is not None else None, []).append(entry)
+        
+        for entries in groups.values():
+            task = asyncio.create_task(self._run(entries))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, entries: List[Tuple[T, asyncio.Future]]):
+        logger.debug(f"Sending batch of {len(entries)} requests")
+        try:
+            results = await self.run_batch([item for item, _ in entries])
+        except Exception as e:
+            results = [e] * len(entries)
+        
+        for (_, future), result in zip(entries, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def _unwrap(result: Any) -> Any:
+    """Raise a per-item exception returned by a batch call, otherwise return the result."""
+    if isinstance(result, BaseException):
+        raise result
+    return result
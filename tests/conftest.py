@@ -10,8 +10,8 @@ from pathlib import Path
 import os
 import sys
 
-# Add src to Python path for testing
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Make the project root importable when pytest is run without installing the package
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.settings import Settings
 from src.database.vector_db_manager import VectorDBManager
@@ -190,6 +190,13 @@ async def mock_vector_db():
         async def get_all_categories(self):
             return list(set(s["category"] for s in self.standards))
         
+        async def get_system_stats(self):
+            return {
+                "standards_count": len(self.standards),
+                "categories": sorted(set(s["category"] for s in self.standards)),
+                "session_stats": {}
+            }
+        
         async def close(self):
             pass
     
@@ -5,7 +5,10 @@ Tests for the code parser module.
 import pytest
 from pathlib import Path
 
+from src.analysis import code_parser
 from src.analysis.code_parser import CodeParser, CodeElement, CodeAnalysis
+from src.analysis.file_hash import hash_bytes
+from src.analysis.parse_cache import ParseCache
 
 
 class TestCodeParser:
@@ -31,6 +34,18 @@ class TestCodeParser:
         with pytest.raises(FileNotFoundError):
             parser.parse_file("non_existent_file.py")
     
+    def test_parse_file_cached(self, sample_python_file, temp_dir, monkeypatch):
+        """Test unchanged files are served from the parse cache."""
+        cache = ParseCache(str(Path(temp_dir) / "parses.sqlite3"))
+        parser = CodeParser(cache)
+        first = parser.parse_file(sample_python_file)
+        
+        monkeypatch.setattr(parser, "_parse_file", lambda file_path: pytest.fail("file was re-parsed"))
+        second = parser.parse_file(sample_python_file)
+        cache.close()
+        
+        assert second == first
+    
     def test_parse_file_syntax_error(self, temp_dir):
         """Test parsing file with syntax errors."""
         # Create file with syntax error
@@ -44,6 +59,47 @@ class TestCodeParser:
         assert analysis.elements == []
         assert analysis.complexity_score == 0
     
+    def test_parse_file_local_variables(self, temp_dir):
+        """Test variables inside functions are only captured with capture_locals."""
+        source_file = Path(temp_dir) / "variables.py"
+        source_file.write_text("LIMIT = 10\n\nclass Config:\n    debug = False\n\ndef run():\n    count = 0\n    return count\n")
+        
+        variables = [e.name for e in CodeParser().parse_file(str(source_file)).elements if e.element_type == "variable"]
+        assert variables == ["LIMIT", "debug"]
+        
+        analysis = CodeParser(capture_locals=True).parse_file(str(source_file))
+        variables = [e.name for e in analysis.elements if e.element_type == "variable"]
+        assert variables == ["LIMIT", "debug", "count"]
+    
+    def test_memory_mapped_read_matches_small_file_read(self, sample_python_file, monkeypatch):
+        """Test files read through mmap get the same hash and content as files read whole."""
+        expected = code_parser._read_source(sample_python_file)
+        assert expected == (hash_bytes(Path(sample_python_file).read_bytes()), Path(sample_python_file).read_text())
+        
+        monkeypatch.setattr(code_parser, "MMAP_MIN_SIZE", 0)
+        assert code_parser._read_source(sample_python_file) == expected
+        
+        analysis = CodeParser().parse_file(sample_python_file)
+        assert analysis.file_hash == expected[0]
+        assert len(analysis.elements) > 0
+    
+    def test_only_small_sources_cached(self, temp_dir, monkeypatch):
+        """Test syntax trees are only cached for sources up to AST_CACHE_MAX_SOURCE_LENGTH."""
+        monkeypatch.setattr(code_parser, "AST_CACHE_MAX_SOURCE_LENGTH", 100)
+        code_parser._parse_cached_source.cache_clear()
+        small_file = Path(temp_dir) / "small.py"
+        small_file.write_text("x = 1\n")
+        large_file = Path(temp_dir) / "large.py"
+        large_file.write_text("".join(f"value_{i} = {i}\n" for i in range(50)))
+        
+        parser = CodeParser()
+        parser.parse_file(str(small_file))
+        assert code_parser._parse_cached_source.cache_info().currsize == 1
+        
+        analysis = parser.parse_file(str(large_file))
+        assert code_parser._parse_cached_source.cache_info().currsize == 1
+        assert len([e for e in analysis.elements if e.element_type == "variable"]) == 50
+    
     def test_parse_directory(self, temp_dir):
         """Test directory parsing."""
         # Create multiple Python files
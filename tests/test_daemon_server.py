@@ -0,0 +1,91 @@
+"""
+Tests for the local daemon's socket handling.
+"""
+
+import asyncio
+import stat
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import ApplicationSettings
+from src.daemon import daemon_server
+from src.daemon.daemon_server import DaemonServer, send_request
+
+
+async def echo(message: str = ""):
+    print(message)
+
+
+async def start_server(socket_path: Path):
+    """Start a daemon in the background and wait until it accepts connections."""
+    task = asyncio.create_task(DaemonServer(str(socket_path), {"echo": echo}).serve_forever())
+    for _ in range(100):
+        if task.done() or await asyncio.to_thread(daemon_server._is_listening, str(socket_path)):
+            break
+        await asyncio.sleep(0.01)
+    return task
+
+
+async def stop_server(task):
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+class TestDaemonServer:
+    """Test cases for DaemonServer."""
+    
+    @pytest.mark.asyncio
+    async def test_socket_is_private(self, tmp_path):
+        """Test the socket is only accessible to its owner and answers requests."""
+        socket_path = tmp_path / "daemon" / "code-refactor.sock"
+        task = await start_server(socket_path)
+        try:
+            assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+            response = await asyncio.to_thread(send_request, str(socket_path), "echo", {"message": "hi"})
+            assert response == {"ok": True, "output": "hi\n", "error": None}
+        finally:
+            await stop_server(task)
+        
+        assert not socket_path.exists()
+    
+    @pytest.mark.asyncio
+    async def test_refuses_socket_in_use(self, tmp_path):
+        """Test a second daemon does not take over a socket another daemon answers on."""
+        socket_path = tmp_path / "code-refactor.sock"
+        task = await start_server(socket_path)
+        try:
+            with pytest.raises(RuntimeError, match="already listening"):
+                await DaemonServer(str(socket_path), {}).serve_forever()
+            response = await asyncio.to_thread(send_request, str(socket_path), "echo", {"message": "still here"})
+            assert response["output"] == "still here\n"
+        finally:
+            await stop_server(task)
+    
+    @pytest.mark.asyncio
+    async def test_replaces_stale_socket(self, tmp_path):
+        """Test a socket file nobody listens on is replaced."""
+        socket_path = tmp_path / "code-refactor.sock"
+        socket_path.touch()
+        
+        task = await start_server(socket_path)
+        try:
+            response = await asyncio.to_thread(send_request, str(socket_path), "echo", {"message": "fresh"})
+            assert response["output"] == "fresh\n"
+        finally:
+            await stop_server(task)
+
+
+class TestDaemonSocketSetting:
+    """Test cases for the default daemon socket path."""
+    
+    def test_defaults_to_runtime_dir(self, monkeypatch, tmp_path):
+        """Test the socket lives in $XDG_RUNTIME_DIR when it is set."""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        assert ApplicationSettings().daemon_socket == str(tmp_path / "code-refactor.sock")
+    
+    def test_falls_back_to_user_cache_dir(self, monkeypatch):
+        """Test the socket is kept out of shared /tmp without a runtime directory."""
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        assert ApplicationSettings().daemon_socket == str(Path.home() / ".cache" / "code-refactor" / "code-refactor.sock")
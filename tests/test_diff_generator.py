@@ -7,7 +7,8 @@ import json
 from pathlib import Path
 from datetime import datetime
 
-from src.diff.diff_generator import DiffGenerator, CodeFix, DiffFile
+from src.diff import diff_generator as diff_generator_module
+from src.diff.diff_generator import DiffGenerator, CodeFix, DiffFile, generate_one
 from src.agents.worker_agent import WorkerResult
 
 
@@ -95,6 +96,60 @@ class TestDiffGenerator:
         assert len(diff_files) == 3
         assert all(isinstance(df, DiffFile) for df in diff_files)
     
+    def test_generate_one_in_process_pool(self, sample_python_file, sample_violations, temp_dir):
+        """Test that generate_one can be dispatched to a process pool."""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        worker_result = WorkerResult(
+            worker_id="test_worker",
+            file_path=sample_python_file,
+            success=True,
+            violations=sample_violations,
+            processing_time=1.0
+        )
+        
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            diff_file = pool.submit(generate_one, worker_result, temp_dir).result()
+        
+        assert isinstance(diff_file, DiffFile)
+        assert Path(diff_file.file_path).exists()
+    
+    @pytest.mark.asyncio
+    async def test_generate_diffs_async_in_process_for_few_files(self, sample_python_file, sample_violations, temp_dir):
+        """Test a handful of files is diffed without starting a process pool and skipped results are left out."""
+        worker_results = [
+            WorkerResult("worker_1", sample_python_file, True, sample_violations, 1.0),
+            WorkerResult("worker_2", sample_python_file, True, [], 1.0),
+            WorkerResult("worker_3", sample_python_file, False, [], 1.0, error_message="Analysis failed")
+        ]
+        
+        generator = DiffGenerator()
+        diff_files = await generator.generate_diffs_async(worker_results, temp_dir)
+        
+        assert len(diff_files) == 1
+        assert generator._process_pool is None
+    
+    @pytest.mark.asyncio
+    async def test_generate_diffs_async_reuses_process_pool(self, sample_python_file, sample_violations, temp_dir, monkeypatch):
+        """Test larger runs are diffed in one process pool shared across runs until closed."""
+        monkeypatch.setattr(diff_generator_module, "PARALLEL_DIFF_MIN_FILES", 2)
+        worker_results = [
+            WorkerResult(f"worker_{i}", sample_python_file, True, sample_violations, 1.0) for i in range(2)
+        ]
+        
+        generator = DiffGenerator()
+        try:
+            assert len(await generator.generate_diffs_async(worker_results, temp_dir)) == 2
+            pool = generator._process_pool
+            assert pool is not None
+            
+            assert len(await generator.generate_diffs_async(worker_results, temp_dir)) == 2
+            assert generator._process_pool is pool
+        finally:
+            generator.close()
+        
+        assert generator._process_pool is None
+    
     def test_create_combined_diff(self, sample_python_file, sample_violations, temp_dir):
         """Test creating combined diff file."""
         # Create diff files
@@ -0,0 +1,35 @@
+"""
+Tests for the persistent embedding cache.
+"""
+
+import threading
+from pathlib import Path
+
+from src.database.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    """Test cases for EmbeddingCache."""
+    
+    def test_close_after_lookup_on_worker_thread(self, temp_dir):
+        """Test a connection opened on a worker thread is closed and its stats flushed from the main thread."""
+        path = Path(temp_dir) / "embeddings.sqlite3"
+        cache = EmbeddingCache(str(path))
+        key = cache.key("sentence-transformers", "model", "text")
+        
+        def lookup():
+            cache.put(key, "sentence-transformers", "model", [0.5, 0.25])
+            cache.get(key)
+            cache.get(cache.key("sentence-transformers", "model", "other"))
+        
+        worker = threading.Thread(target=lookup)
+        worker.start()
+        worker.join()
+        
+        cache.close()
+        assert cache._conn is None
+        
+        reopened = EmbeddingCache(str(path))
+        assert reopened.stats() == {"entries": 1, "hits": 1, "misses": 1}
+        assert reopened.get(key) == [0.5, 0.25]
+        reopened.close()
@@ -0,0 +1,97 @@
+"""
+Tests for content hashing and hash-keyed cache invalidation.
+"""
+
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.analysis import file_hash
+from src.analysis.file_hash import HASH_ALGORITHM_ID, hash_bytes, hash_file
+from src.analysis.fingerprint_cache import FingerprintCache
+from src.analysis.parse_cache import ParseCache
+
+
+def set_user_version(path: Path, version: int):
+    """Mark a cache database as written by another hash algorithm."""
+    conn = sqlite3.connect(str(path))
+    conn.execute(f"PRAGMA user_version = {version}")
+    conn.close()
+
+
+def row_count(path: Path, table: str) -> int:
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestFileHash:
+    """Test cases for hash_file and hash_bytes."""
+    
+    @pytest.mark.parametrize("size", [0, 100, 3 * 1024 * 1024 + 7])
+    def test_hash_file_matches_hash_bytes(self, tmp_path, size):
+        """Test hashing a file equals hashing its bytes, including large multi-threaded hashes."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(os.urandom(size))
+        
+        assert hash_file(str(path)) == hash_bytes(path.read_bytes())
+    
+    def test_sha256_fallback(self, tmp_path, monkeypatch):
+        """Test both functions fall back to SHA-256 without blake3."""
+        monkeypatch.setattr(file_hash, "blake3", None)
+        path = tmp_path / "module.py"
+        path.write_bytes(b"x = 1\n")
+        
+        expected = hashlib.sha256(b"x = 1\n").hexdigest()
+        assert hash_file(str(path)) == hash_bytes(path.read_bytes()) == expected
+
+
+class TestHashAlgorithmInvalidation:
+    """Test cases for clearing caches written with another hash algorithm."""
+    
+    def test_fingerprint_cache_cleared_on_mismatch(self, tmp_path):
+        """Test fingerprints are dropped when user_version names another algorithm and kept otherwise."""
+        source = tmp_path / "module.py"
+        source.write_text("x = 1\n")
+        db_path = tmp_path / "fingerprints.sqlite3"
+        
+        cache = FingerprintCache(str(db_path))
+        cache.hash_files([str(source)])
+        cache.close()
+        
+        cache = FingerprintCache(str(db_path))
+        cache._connect()
+        cache.close()
+        assert row_count(db_path, "fingerprints") == 1
+        
+        set_user_version(db_path, HASH_ALGORITHM_ID + 1)
+        cache = FingerprintCache(str(db_path))
+        cache._connect()
+        cache.close()
+        assert row_count(db_path, "fingerprints") == 0
+    
+    def test_parse_cache_cleared_on_mismatch(self, tmp_path):
+        """Test cached parses are dropped when user_version names another algorithm."""
+        source = tmp_path / "module.py"
+        source.write_text("x = 1\n")
+        stat = source.stat()
+        db_path = tmp_path / "parses.sqlite3"
+        
+        cache = ParseCache(str(db_path))
+        cache.put(str(source), stat, {"file_hash": "abc"})
+        cache.close()
+        
+        set_user_version(db_path, HASH_ALGORITHM_ID + 1)
+        cache = ParseCache(str(db_path))
+        assert cache.get(str(source), stat) is None
+        cache.close()
+        assert row_count(db_path, "parses") == 0
+        
+        conn = sqlite3.connect(str(db_path))
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == HASH_ALGORITHM_ID
+        conn.close()
@@ -0,0 +1,92 @@
+"""
+Tests for the LLM circuit breaker.
+"""
+
+import asyncio
+
+import pytest
+
+from src.agents.llm_resilience import CircuitOpenError, LLMCircuitBreaker
+
+
+async def fail_with(error):
+    raise error
+
+
+async def half_open_breaker():
+    """Breaker opened by a timeout whose reset timeout has already passed."""
+    breaker = LLMCircuitBreaker(fail_max=1, reset_timeout=0.01, max_attempts=1)
+    with pytest.raises(TimeoutError):
+        await breaker.call(lambda: fail_with(TimeoutError()))
+    await asyncio.sleep(0.02)
+    # Closed-circuit calls would retry; the probe must not
+    breaker.max_attempts = 3
+    return breaker
+
+
+class TestLLMCircuitBreaker:
+    """Test cases for LLMCircuitBreaker."""
+    
+    @pytest.mark.asyncio
+    async def test_non_transient_errors_do_not_open(self):
+        """Test errors other than transient ones never open the circuit."""
+        breaker = LLMCircuitBreaker(fail_max=1, reset_timeout=60, max_attempts=1)
+        
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await breaker.call(lambda: fail_with(ValueError("bad request")))
+        
+        assert not breaker.is_open
+        assert breaker.failures == 0
+    
+    @pytest.mark.asyncio
+    async def test_transient_errors_open(self):
+        """Test repeated timeouts open the circuit and later calls fail fast."""
+        breaker = LLMCircuitBreaker(fail_max=2, reset_timeout=60, max_attempts=1)
+        
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await breaker.call(lambda: fail_with(TimeoutError()))
+        
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(lambda: pytest.fail("called while open"))
+    
+    @pytest.mark.asyncio
+    async def test_half_open_admits_single_probe(self):
+        """Test only one probe runs after the reset timeout and its success closes the circuit."""
+        breaker = await half_open_breaker()
+        
+        release = asyncio.Event()
+        
+        async def slow_success():
+            await release.wait()
+            return "ok"
+        
+        probe = asyncio.create_task(breaker.call(slow_success))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(lambda: pytest.fail("second call during probe"))
+        
+        release.set()
+        assert await probe == "ok"
+        assert not breaker.is_open
+        assert breaker.failures == 0
+    
+    @pytest.mark.asyncio
+    async def test_failed_probe_reopens_without_retrying(self):
+        """Test a failed probe is not retried and re-opens the circuit for another reset timeout."""
+        breaker = await half_open_breaker()
+        
+        calls = []
+        
+        async def timeout():
+            calls.append(1)
+            raise TimeoutError()
+        
+        with pytest.raises(TimeoutError):
+            await breaker.call(timeout)
+        
+        assert len(calls) == 1
+        assert breaker.is_open
+        assert not breaker.probing
@@ -0,0 +1,53 @@
+"""
+Tests for the master orchestrator's repository cloning.
+"""
+
+import git
+import pytest
+
+from src.agents.master_orchestrator import MasterOrchestrator
+
+
+@pytest.fixture
+def remote_repo(tmp_path):
+    """Local repository with a 'main' and a 'feature' branch, reachable over file://."""
+    path = tmp_path / "remote"
+    repo = git.Repo.init(path, initial_branch="main")
+    (path / "module.py").write_text("x = 1\n")
+    repo.index.add(["module.py"])
+    repo.index.commit("Initial commit", author=git.Actor("Test", "test@example.com"))
+    repo.create_head("feature")
+    return path.as_uri()
+
+
+class TestShallowClone:
+    """Test cases for MasterOrchestrator._shallow_clone."""
+    
+    def test_clones_requested_branch(self, remote_repo, tmp_path):
+        """Test an existing branch is cloned."""
+        target = tmp_path / "clone"
+        MasterOrchestrator()._shallow_clone(remote_repo, target, "feature")
+        
+        assert git.Repo(target).active_branch.name == "feature"
+    
+    def test_missing_branch_falls_back_to_default(self, remote_repo, tmp_path):
+        """Test a branch the remote does not have falls back to the default branch."""
+        target = tmp_path / "clone"
+        MasterOrchestrator()._shallow_clone(remote_repo, target, "does-not-exist")
+        
+        assert git.Repo(target).active_branch.name == "main"
+    
+    def test_other_clone_errors_are_raised(self, tmp_path, monkeypatch):
+        """Test failures other than a missing branch are not retried on the default branch."""
+        calls = []
+        
+        def clone_from(url, to_path, **kwargs):
+            calls.append(kwargs.get("branch"))
+            raise git.exc.GitCommandError("clone", 128, "Authentication failed")
+        
+        monkeypatch.setattr(git.Repo, "clone_from", clone_from)
+        monkeypatch.setattr(MasterOrchestrator, "_remote_has_ref", lambda self, url, ref: True)
+        
+        with pytest.raises(git.exc.GitCommandError):
+            MasterOrchestrator()._shallow_clone("https://example.com/repo.git", tmp_path / "clone", "main")
+        assert calls == ["main"]
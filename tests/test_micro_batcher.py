@@ -0,0 +1,82 @@
+"""
+Tests for the generic micro-batcher.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.micro_batcher import MicroBatcher
+
+
+class RecordingBatch:
+    """Batch function that doubles numbers, fails on negatives and records every call."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def __call__(self, items):
+        self.calls.append(list(items))
+        return [ValueError(item) if item < 0 else item * 2 for item in items]
+
+
+class TestMicroBatcher:
+    """Test cases for MicroBatcher."""
+    
+    @pytest.mark.asyncio
+    async def test_items_within_window_share_one_call(self):
+        """Test concurrent submissions are sent together and each caller gets its own result."""
+        run_batch = RecordingBatch()
+        batcher = MicroBatcher(run_batch, window_ms=10, max_batch=100)
+        
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        
+        assert results == [0, 2, 4, 6, 8]
+        assert run_batch.calls == [[0, 1, 2, 3, 4]]
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self):
+        """Test reaching max_batch flushes at once instead of waiting for the window."""
+        run_batch = RecordingBatch()
+        batcher = MicroBatcher(run_batch, window_ms=60_000, max_batch=3)
+        
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(3))), timeout=1)
+        
+        assert results == [0, 2, 4]
+        assert run_batch.calls == [[0, 1, 2]]
+    
+    @pytest.mark.asyncio
+    async def test_items_grouped_by_key(self):
+        """Test items with different keys go to separate calls."""
+        run_batch = RecordingBatch()
+        batcher = MicroBatcher(run_batch, window_ms=10, max_batch=100, key=lambda item: item % 2)
+        
+        await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+        
+        assert sorted(run_batch.calls) == [[0, 2], [1, 3]]
+    
+    @pytest.mark.asyncio
+    async def test_errors_reach_their_callers(self):
+        """Test per-item errors only fail their own caller and a failed call fails every caller."""
+        batcher = MicroBatcher(RecordingBatch(), window_ms=10, max_batch=100)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(-1), return_exceptions=True)
+        assert results[0] == 2
+        assert isinstance(results[1], ValueError)
+        
+        async def broken(items):
+            raise RuntimeError("model unavailable")
+        
+        batcher = MicroBatcher(broken, window_ms=10, max_batch=100)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_zero_window_sends_each_item_alone(self):
+        """Test a zero window disables batching."""
+        run_batch = RecordingBatch()
+        batcher = MicroBatcher(run_batch, window_ms=0, max_batch=100)
+        
+        assert await asyncio.gather(batcher.submit(1), batcher.submit(2)) == [2, 4]
+        assert run_batch.calls == [[1], [2]]
+        with pytest.raises(ValueError):
+            await batcher.submit(-1)
@@ -0,0 +1,43 @@
+"""
+Tests for the RAG system's reranking.
+"""
+
+import asyncio
+
+import pytest
+import sentence_transformers
+
+from src.analysis.rag_system import RAGSystem, RelevantRule
+
+
+class FakeCrossEncoder:
+    """Cross-encoder scoring pairs by description length, counting how often it is loaded."""
+    
+    loads = 0
+    
+    def __init__(self, model_name):
+        FakeCrossEncoder.loads += 1
+    
+    def predict(self, pairs, batch_size=32):
+        return [len(description) for _, description in pairs]
+
+
+def make_rule(rule_id: str, description: str) -> RelevantRule:
+    return RelevantRule(rule_id, rule_id, description, "style", "low", 0.5)
+
+
+class TestRerank:
+    """Test cases for RAGSystem reranking."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_reranks_load_model_once(self, monkeypatch):
+        """Test concurrent first reranks share one cross-encoder load."""
+        monkeypatch.setattr(sentence_transformers, "CrossEncoder", FakeCrossEncoder)
+        monkeypatch.setattr(FakeCrossEncoder, "loads", 0)
+        rag = RAGSystem()
+        rules = [make_rule("A", "x"), make_rule("B", "xxx"), make_rule("C", "xx")]
+        
+        ranked = await asyncio.gather(*(rag._rerank(f"query {i}", rules, 2) for i in range(8)))
+        
+        assert FakeCrossEncoder.loads == 1
+        assert all([rule.rule_id for rule in result] == ["B", "C"] for result in ranked)
@@ -0,0 +1,85 @@
+"""
+Tests for the semantic LLM response cache.
+"""
+
+import zlib
+
+import numpy as np
+import pytest
+
+from src.agents import semantic_cache
+from src.agents.semantic_cache import SemanticPromptCache
+from src.analysis.rag_system import ANALYSIS_PROMPT_PREFIX, CODE_SECTION_HEADER, RULES_SECTION_HEADER
+
+
+class FakeEmbedder:
+    """Deterministic unit vectors per text, nearly orthogonal for different texts."""
+    
+    def __init__(self):
+        self.texts = []
+    
+    def generate_embedding(self, text):
+        self.texts.append(text)
+        vector = np.random.default_rng(zlib.crc32(text.encode())).standard_normal(64)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    fake = FakeEmbedder()
+    monkeypatch.setattr(semantic_cache, "vector_db_manager", fake)
+    return fake
+
+
+def make_prompt(code: str, rules: str = "1. **PEP8-E225** Missing whitespace") -> str:
+    return f"{ANALYSIS_PROMPT_PREFIX}{RULES_SECTION_HEADER}\n{rules}\n\n{CODE_SECTION_HEADER}\n{code}"
+
+
+class TestSemanticPromptCache:
+    """Test cases for SemanticPromptCache."""
+    
+    @pytest.mark.asyncio
+    async def test_embeds_per_file_part_only(self, embedder):
+        """Test the shared instructions are not embedded and the code section comes first."""
+        cache = SemanticPromptCache(threshold=0.95)
+        await cache.lookup("session:model", make_prompt("def a(): pass"))
+        
+        text = embedder.texts[-1]
+        assert ANALYSIS_PROMPT_PREFIX not in text
+        assert text.startswith(CODE_SECTION_HEADER)
+        assert RULES_SECTION_HEADER in text
+    
+    @pytest.mark.asyncio
+    async def test_different_files_do_not_share_responses(self, embedder):
+        """Test prompts that only differ in their code miss the cache."""
+        cache = SemanticPromptCache(threshold=0.95)
+        response, vector = await cache.lookup("session:model", make_prompt("def a(): pass"))
+        assert response is None
+        cache.store("session:model", vector, "first")
+        
+        response, _ = await cache.lookup("session:model", make_prompt("class B: pass"))
+        assert response is None
+        
+        response, _ = await cache.lookup("session:model", make_prompt("def a(): pass"))
+        assert response == "first"
+        assert (cache.hits, cache.misses) == (1, 2)
+    
+    def test_explicit_zero_threshold_is_kept(self):
+        """Test a threshold of 0.0 is not replaced by the configured default."""
+        assert SemanticPromptCache(threshold=0.0).threshold == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_clear_session(self, embedder):
+        """Test clearing a session drops its scopes and keeps other sessions."""
+        cache = SemanticPromptCache(threshold=0.95)
+        prompt = make_prompt("def a(): pass")
+        for scope in ("s1:model", "s1:light", "s2:model"):
+            _, vector = await cache.lookup(scope, prompt)
+            cache.store(scope, vector, scope)
+        
+        cache.clear_session("s1")
+        
+        assert list(cache._vectors) == ["s2:model"]
+        assert all(scope == "s2:model" for scope, _ in cache._buckets)
+        assert (await cache.lookup("s1:model", prompt))[0] is None
+        assert (await cache.lookup("s2:model", prompt))[0] == "s2:model"
@@ -0,0 +1,33 @@
+"""
+Tests for the on-disk settings snapshot.
+"""
+
+from pathlib import Path
+
+from src.config import settings as settings_module
+
+
+class TestSettingsSnapshot:
+    """Test cases for the cached settings snapshot."""
+    
+    def test_snapshot_excludes_secrets(self, temp_dir, monkeypatch):
+        """Test credentials are kept out of the pickle and read again from the environment and .env on load."""
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.setattr(settings_module, "SETTINGS_CACHE_DIR", Path(temp_dir) / "cache")
+        monkeypatch.setenv("LLM_OPENAI_API_KEY", "sk-env-secret")
+        monkeypatch.setenv("DATABASE_PASSWORD", "db-env-secret")
+        Path(temp_dir, ".env").write_text("GIT_TOKEN=git-dotenv-secret\n")
+        
+        built = settings_module._load_cached_settings()
+        snapshot, = (Path(temp_dir) / "cache").glob("settings-*.pkl")
+        data = snapshot.read_bytes()
+        for secret in (b"sk-env-secret", b"db-env-secret", b"git-dotenv-secret", b"coderefactor123"):
+            assert secret not in data
+        
+        loaded = settings_module._load_cached_settings()
+        assert loaded is not built
+        assert loaded.llm.openai_api_key == built.llm.openai_api_key == "sk-env-secret"
+        assert loaded.database.password == "db-env-secret"
+        assert loaded.git.token == "git-dotenv-secret"
+        assert loaded.database.url == built.database.url
+        assert loaded.llm.anthropic_api_key is None
@@ -0,0 +1,97 @@
+"""
+Tests for the vector database manager's embedding and loading helpers.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.database.embedding_cache import EmbeddingCache
+from src.database.vector_db_manager import VectorDBManager
+
+
+class StubModel:
+    """SentenceTransformer stand-in embedding every text as (3, 4), or (0.6, 0.8) when normalizing."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def encode(self, texts, **kwargs):
+        self.calls.append(kwargs)
+        vectors = np.array([[3.0, 4.0]] * (1 if isinstance(texts, str) else len(texts)))
+        if kwargs.get("normalize_embeddings"):
+            vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if isinstance(texts, str) else vectors
+
+
+@pytest.fixture
+def manager(temp_dir):
+    """Manager with a stub model and an empty embedding cache."""
+    manager = VectorDBManager()
+    manager.embedding_model = StubModel()
+    manager.embedding_cache = EmbeddingCache(str(Path(temp_dir) / "embeddings.sqlite3"))
+    yield manager
+    manager.embedding_cache.close()
+
+
+class TestEmbeddings:
+    """Test cases for unit-length embeddings."""
+    
+    def test_every_encode_path_normalizes(self, manager):
+        """Test single, batched and cached encoding all request unit-length vectors."""
+        assert manager.generate_embedding("text") == pytest.approx([0.6, 0.8])
+        assert manager._encode_batch(["a", "b"]) == [pytest.approx([0.6, 0.8])] * 2
+        assert manager.generate_cached_embeddings(["c"]) == [pytest.approx([0.6, 0.8])]
+        
+        assert len(manager.embedding_model.calls) == 3
+        assert all(call["normalize_embeddings"] is True for call in manager.embedding_model.calls)
+    
+    def test_cache_key_excludes_unnormalized_vectors(self, manager):
+        """Test vectors cached under the plain model name before normalization are not reused."""
+        model_name = manager.settings.vector_db.embedding_model
+        assert manager.embedding_model_key.endswith(":unit")
+        
+        stale_key = manager.embedding_cache.key("sentence-transformers", model_name, "text")
+        manager.embedding_cache.put(stale_key, "sentence-transformers", model_name, [3.0, 4.0])
+        
+        assert manager.generate_cached_embeddings(["text"]) == [pytest.approx([0.6, 0.8])]
+        assert len(manager.embedding_model.calls) == 1
+
+
+class TestLoadStandards:
+    """Test cases for loading standards files."""
+    
+    @pytest.mark.asyncio
+    async def test_load_csv_fills_blank_cells_with_defaults(self, tmp_path, monkeypatch):
+        """Test blank and missing CSV cells get the same defaults as absent JSON keys."""
+        csv_path = tmp_path / "standards.csv"
+        csv_path.write_text(
+            "rule_id,title,description,category,severity\n"
+            "PEP8-E225,Whitespace,\"Missing whitespace, around operator\",style,high\n"
+            ",Blank id,Some rule,,\n",
+            encoding="utf-8"
+        )
+        stored = []
+        
+        async def store_code_standards(standards, batch_size):
+            stored.extend(standards)
+            return len(standards)
+        
+        manager = VectorDBManager()
+        monkeypatch.setattr(manager, "store_code_standards", store_code_standards)
+        
+        assert await manager.load_standards_from_file(str(csv_path)) == 2
+        
+        first, second = stored
+        assert first == {
+            "rule_id": "PEP8-E225",
+            "title": "Whitespace",
+            "description": "Missing whitespace, around operator",
+            "category": "style",
+            "severity": "high",
+            "language": "python",
+            "metadata": {"source_file": str(csv_path)}
+        }
+        assert second["rule_id"].startswith("rule_")
+        assert (second["category"], second["severity"], second["language"]) == ("general", "medium", "python")
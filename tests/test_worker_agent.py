@@ -0,0 +1,143 @@
+"""
+Tests for the worker agent's result persistence.
+"""
+
+import json
+
+import pytest
+from types import SimpleNamespace
+
+from src.agents import worker_agent
+from src.agents.worker_agent import WorkerAgent
+
+
+class FakeSession:
+    """Session that only keeps statements in the database once committed."""
+    
+    def __init__(self, database):
+        self.database = database
+        self.pending = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def execute(self, statement, params=None):
+        if statement is self.database.fail_on:
+            raise RuntimeError("insert failed")
+        self.pending.append(statement)
+        self.database.params.append(params)
+        return SimpleNamespace(scalar=lambda: 1)
+    
+    async def commit(self):
+        self.database.committed.extend(self.pending)
+        self.pending = []
+    
+    async def rollback(self):
+        self.pending = []
+
+
+class FakeDatabase:
+    """Stand-in for vector_db_manager's session factory."""
+    
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.committed = []
+        self.params = []
+    
+    def session_factory(self):
+        return FakeSession(self)
+
+
+@pytest.fixture
+def failing_violations_db(monkeypatch):
+    """Database whose violations insert always fails."""
+    database = FakeDatabase(fail_on=worker_agent._INSERT_VIOLATIONS_QUERY)
+    monkeypatch.setattr(worker_agent, "vector_db_manager", database)
+    return database
+
+
+VIOLATIONS = [{"rule_id": "PEP8-E225", "violation_description": "Missing whitespace", "severity": "medium"}]
+
+
+def stub_steps(worker, monkeypatch, llm_error=None):
+    """Replace parsing, retrieval and the LLM call with stubs returning VIOLATIONS."""
+    async def parse(file_path):
+        return SimpleNamespace(file_hash="abc", elements=[])
+    
+    async def context(code_analysis):
+        return SimpleNamespace(relevant_rules=[])
+    
+    async def analyze(code_analysis, rag_context):
+        if llm_error is not None:
+            raise llm_error
+        return VIOLATIONS
+    
+    monkeypatch.setattr(worker, "_step_parse", parse)
+    monkeypatch.setattr(worker, "_step_context", context)
+    monkeypatch.setattr(worker, "_step_llm", analyze)
+    return worker
+
+
+class TestWorkerPersistence:
+    """Test cases for storing a file's results."""
+    
+    @pytest.mark.asyncio
+    async def test_step_process_rolls_back_when_insert_fails(self, failing_violations_db):
+        """Test a failed violations insert leaves neither write in the database."""
+        worker = WorkerAgent("worker_1", "session_1")
+        
+        with pytest.raises(RuntimeError):
+            await worker._step_process("example.py", VIOLATIONS)
+        
+        assert failing_violations_db.committed == []
+        assert worker._current_session is None
+    
+    @pytest.mark.asyncio
+    async def test_process_file_marks_file_failed_when_insert_fails(self, failing_violations_db, monkeypatch):
+        """Test the file is marked failed, not completed, when its violations cannot be stored."""
+        worker = stub_steps(WorkerAgent("worker_1", "session_1"), monkeypatch)
+        
+        result = await worker.process_file("example.py")
+        
+        assert not result.success
+        # Only the separate "failed" status update was committed
+        assert failing_violations_db.committed == [worker_agent._UPDATE_FILE_STATUS_BY_PATH_QUERY]
+    
+    @pytest.mark.asyncio
+    async def test_step_process_commits_both_writes(self, monkeypatch):
+        """Test violations and the completed status are committed together."""
+        database = FakeDatabase()
+        monkeypatch.setattr(worker_agent, "vector_db_manager", database)
+        worker = WorkerAgent("worker_1", "session_1")
+        
+        await worker._step_process("example.py", VIOLATIONS)
+        
+        assert database.committed == [
+            worker_agent._INSERT_VIOLATIONS_QUERY,
+            worker_agent._UPDATE_FILE_STATUS_BY_PATH_QUERY
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_llm_result_records_fingerprint(self, monkeypatch):
+        """Test completed LLM analyses record the analysis fingerprint for reuse."""
+        database = FakeDatabase()
+        monkeypatch.setattr(worker_agent, "vector_db_manager", database)
+        worker = stub_steps(WorkerAgent("worker_1", "session_1", analysis_fingerprint="fp"), monkeypatch)
+        
+        assert (await worker.process_file("example.py")).success
+        assert json.loads(database.params[-1]["analysis_metadata"]) == {"fingerprint": "fp"}
+    
+    @pytest.mark.asyncio
+    async def test_rule_based_fallback_records_no_fingerprint(self, monkeypatch):
+        """Test rule-based fallback results are stored without a fingerprint so they are never reused."""
+        database = FakeDatabase()
+        monkeypatch.setattr(worker_agent, "vector_db_manager", database)
+        worker = WorkerAgent("worker_1", "session_1", analysis_fingerprint="fp")
+        stub_steps(worker, monkeypatch, llm_error=RuntimeError("LLM unavailable"))
+        
+        assert (await worker.process_file("example.py")).success
+        assert database.committed[-1] is worker_agent._UPDATE_FILE_STATUS_BY_PATH_QUERY
+        assert database.params[-1]["analysis_metadata"] is None